@@ -0,0 +1,83 @@
+"""
+Generator for synthetic agent catalogs.
+"""
+
+WORDS = (
+    "order", "invoice", "weather", "ticket", "balance", "shipment", "profile", "holiday",
+    "payroll", "stock", "meeting", "refund", "flight", "report", "contract", "device",
+)
+
+
+def generate_catalog(agents: int, tools: int, base_url: str, intents: int = 3, templates: bool = False) -> dict[str, dict]:
+    """
+    Build `agents` agent files with `tools` tools each, all pointing at `base_url`.
+
+    Args:
+        agents (int): Number of agents.
+        tools (int): Number of tools per agent.
+        base_url (str): Base URL of the tool endpoints, e.g. the mock server URL.
+        intents (int): Intent examples per tool. Defaults to 3.
+        templates (bool): Give every tool a `response_template` for the mock server's
+            responses, so answers are rendered without the LLM. Defaults to False.
+
+    Returns:
+        dict[str, dict]: Agent name to agent JSON document (valid `AgentSchema`).
+    """
+    catalog = {}
+    for a in range(agents):
+        name = f"bench_agent_{a}"
+        catalog[name] = {
+            "agent_name": name,
+            "requiredAuth": False,
+            "authType": None,
+            "tools": [_tool(name, a, t, base_url, intents, templates) for t in range(tools)],
+        }
+    return catalog
+
+
+def intent_examples(catalog: dict[str, dict]) -> list[str]:
+    """
+    Every intent example in a catalog, usable as benchmark queries that hit a tool.
+
+    Args:
+        catalog (dict[str, dict]): A catalog from `generate_catalog`.
+
+    Returns:
+        list[str]: The intent examples.
+    """
+    return [
+        intent
+        for agent in catalog.values()
+        for tool in agent["tools"]
+        for intent in tool["intent_examples"]
+    ]
+
+
+def _tool(agent_name: str, a: int, t: int, base_url: str, intents: int, templates: bool = False) -> dict:
+    topic = WORDS[(a + t) % len(WORDS)]
+    name = f"{agent_name}_tool_{t}"
+    tool = {
+        "name": name,
+        "description": f"Look up {topic} records of agent {a}, variant {t}",
+        "intent_examples": [f"show my {topic} for agent {a} tool {t} case {i}" for i in range(intents)],
+        "tags": [topic],
+        "schema": {
+            "name": name,
+            "description": f"Parameters of {name}",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Search text", "default": topic},
+                    "limit": {"type": "integer", "description": "Maximum results", "default": 5},
+                },
+                "required": ["query"],
+            },
+        },
+        "http": {"method": "GET", "url": f"{base_url}/tools/{name}"},
+    }
+    if templates:
+        tool["response_template"] = {
+            "default": "{{ tool }}: {{ items | map(attribute='title') | join(', ') }}",
+            "id": "Hasil {{ tool }}: {{ items | map(attribute='title') | join(', ') }}",
+        }
+    return tool
@@ -0,0 +1,151 @@
+"""
+Helpers shared by the offline benchmarks.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.fakes import FakeLLM
+from benchmarks.mock_server import MockToolServer
+
+
+@contextlib.contextmanager
+def isolated(args: argparse.Namespace):
+    """
+    Fresh working directory, fake LLM and in-memory Qdrant for one benchmark phase.
+
+    Args:
+        args (argparse.Namespace): Needs `dimension`, `search_dimension`, `ask_latency`, `embed_latency` and `context_cache`.
+
+    Yields:
+        FakeLLM: The fake LLM the orchestrator will use.
+    """
+    from llm_orchestrator.core.llms.factory import LLMFactory
+    from llm_orchestrator.shared.helpers.qdrant_helper import QdrantHelper
+    from llm_orchestrator.types.base_llm import LLMClientType
+    from llm_orchestrator.types.collection_config import CollectionConfig
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="llmo-bench-") as directory:
+        os.chdir(directory)
+        try:
+            llm = FakeLLM(
+                dimension=args.dimension,
+                ask_latency=args.ask_latency,
+                embed_latency=args.embed_latency,
+                context_cache=args.context_cache,
+            )
+            LLMFactory.set_instance(LLMClientType.GEMINI, llm)
+            QdrantHelper().configure(
+                CollectionConfig(size=args.dimension, search_size=args.search_dimension),
+                location=":memory:"
+            )
+            yield llm
+        finally:
+            os.chdir(cwd)
+
+
+async def warm_orchestrator(catalog: dict, server: MockToolServer):
+    """
+    Create an orchestrator, register every agent of the catalog and warm it up.
+
+    Args:
+        catalog (dict): Agent name to agent JSON document, served by `server`.
+        server (MockToolServer): The running mock server.
+
+    Returns:
+        tuple: The orchestrator and the warm_up duration in seconds.
+    """
+    from llm_orchestrator import LLMOrchestrator
+    from llm_orchestrator.types.agents import Agent
+
+    orchestrator = LLMOrchestrator()
+    await orchestrator.register_agents([
+        Agent(name=name, urlAgentFile=f"{server.url}/agents/{name}.json") for name in catalog
+    ])
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        await orchestrator.warm_up()
+    return orchestrator, time.perf_counter() - started
+
+
+def add_fake_arguments(parser: argparse.ArgumentParser, ask_latency: float = 0.0, embed_latency: float = 0.0, tool_latency: float = 0.0):
+    """
+    Add the options of the fake LLM and the mock tool server.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+        ask_latency (float): Default seconds per fake LLM call.
+        embed_latency (float): Default seconds per fake embedding call.
+        tool_latency (float): Default seconds per mock tool request.
+    """
+    parser.add_argument("--dimension", type=int, default=1536, help="Embedding dimension")
+    parser.add_argument("--search-dimension", type=int, default=None, help="Compact search dimension (two-stage mode)")
+    parser.add_argument("--ask-latency", type=float, default=ask_latency, help="Seconds per fake LLM call")
+    parser.add_argument("--embed-latency", type=float, default=embed_latency, help="Seconds per fake embedding call")
+    parser.add_argument("--context-cache", action="store_true", help="Pass tool schemas as a cached prefix")
+    parser.add_argument("--tool-latency", type=float, default=tool_latency, help="Seconds per mock tool request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write the JSON results to this file")
+
+
+def summary(values: list[float], scale: float = 1000) -> dict:
+    """
+    Count, mean, percentiles and max of a list of durations.
+
+    Args:
+        values (list[float]): Durations in seconds.
+        scale (float): Multiplier of the reported values. Defaults to 1000 (milliseconds).
+
+    Returns:
+        dict: The summary; all values are 0 for an empty list.
+    """
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * scale, 3),
+        "p50": round(percentile(ordered, 50) * scale, 3),
+        "p95": round(percentile(ordered, 95) * scale, 3),
+        "p99": round(percentile(ordered, 99) * scale, 3),
+        "max": round(ordered[-1] * scale, 3),
+    }
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """
+    Linearly interpolated percentile of a sorted list.
+
+    Args:
+        ordered (list[float]): The sorted values.
+        percent (float): The percentile, 0 to 100.
+
+    Returns:
+        float: The percentile.
+    """
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * percent / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def write_results(results: dict, out: str | None):
+    """
+    Print the results as JSON and optionally write them to a file.
+
+    Args:
+        results (dict): The benchmark results.
+        out (str | None): Destination file, if any.
+    """
+    text = json.dumps(results, indent=2)
+    if out:
+        with open(out, "w") as f:
+            f.write(text)
+    print(text)
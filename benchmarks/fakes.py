@@ -0,0 +1,155 @@
+"""
+Deterministic stand-ins for Gemini used by the offline benchmarks.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from types import SimpleNamespace
+
+from llm_orchestrator.types.base_llm import BaseLLM
+
+_TOOL_NAME = re.compile(r"Tool Name: ([^,]+),")
+_TOOL_INTENTS = re.compile(r"Tool Intents: (.*)$")
+
+
+class FakeLLM(BaseLLM):
+    """
+    A `BaseLLM` with configurable latencies and deterministic embeddings.
+
+    Embeddings are unit vectors seeded by a topic key. A tool prompt's key is its tool
+    name, and the tool's intent examples are remembered so that a query equal to one of
+    them maps to the same key (cosine ~1.0); any other text gets its own random vector.
+    A text that contains known intent examples (a compound query) gets the normalized sum
+    of their vectors. Tool selection picks the first candidate tool found in the prompt, or
+    in plan mode every candidate whose intent example occurs in the user query, and fills
+    the parameters with their defaults.
+    """
+
+    def __init__(
+        self,
+        dimension: int = 1536,
+        ask_latency: float = 0.0,
+        embed_latency: float = 0.0,
+        stream_chunks: int = 8,
+        context_cache: bool = False,
+    ):
+        """
+        Args:
+            dimension (int): Embedding size. Defaults to 1536.
+            ask_latency (float): Seconds each `ask` call takes. Defaults to 0.
+            embed_latency (float): Seconds each `embeddings` call takes. Defaults to 0.
+            stream_chunks (int): How many chunks a streamed answer has. Defaults to 8.
+            context_cache (bool): Whether tool schemas are passed as a cached prefix. Defaults to False.
+        """
+        self.embedding_dimension = dimension
+        self.ask_latency = ask_latency
+        self.embed_latency = embed_latency
+        self.stream_chunks = stream_chunks
+        self.context_cache = context_cache
+        self.context = {}
+        self.intents: dict[str, str] = {}
+        self.ask_calls = 0
+        self.embedded_texts = 0
+
+    def set_context(self, context: dict):
+        self.context = context
+
+    async def ask(self, prompt, config=None, stream=False, cached_prefix=None):
+        self.ask_calls += 1
+        if cached_prefix is not None:
+            prompt = f"{cached_prefix.text}\n{prompt}"
+
+        if self.ask_latency:
+            await asyncio.sleep(self.ask_latency)
+        config = config or {}
+        usage = SimpleNamespace(prompt_token_count=len(str(prompt)) // 4, candidates_token_count=32)
+        schema = config.get("response_schema")
+        if schema is not None:
+            parsed = self._select_tool(str(prompt), schema)
+            return SimpleNamespace(text=parsed.model_dump_json(), parsed=parsed, usage_metadata=usage)
+
+        answer = f"Here is what I found: {str(prompt).strip()[-120:]}"
+        if stream:
+            return self._stream(answer, usage)
+        return SimpleNamespace(text=answer, parsed=None, usage_metadata=usage)
+
+    def can_cache(self, prefix: str) -> bool:
+        return self.context_cache
+
+    async def embeddings(self, texts: list[str]) -> list[list[float]]:
+        if self.embed_latency:
+            await asyncio.sleep(self.embed_latency)
+        self.embedded_texts += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> list[float]:
+        key = text
+        tool_name = _TOOL_NAME.search(text)
+        if tool_name:
+            key = tool_name.group(1)
+            intents = _TOOL_INTENTS.search(text)
+            if intents:
+                for intent in intents.group(1).split(", "):
+                    self.intents[intent] = key
+        elif text in self.intents:
+            key = self.intents[text]
+        else:
+            keys = {tool for intent, tool in self.intents.items() if intent in text}
+            if keys:
+                vector = [sum(values) for values in zip(*[self._random_vector(k) for k in sorted(keys)])]
+                norm = math.sqrt(sum(v * v for v in vector))
+                return [v / norm for v in vector]
+        return self._random_vector(key)
+
+    def _random_vector(self, key: str) -> list[float]:
+        rng = random.Random(hashlib.md5(key.encode()).digest())
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.embedding_dimension)]
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector]
+
+    def _select_tool(self, prompt: str, schema):
+        from llm_orchestrator.types.response_tool import ResponseTool
+
+        planning = "calls" in schema.model_fields
+        query = prompt.rsplit("User Query:", 1)[-1].strip()
+        # Prompt dengan cached prefix menyebut kandidat by nama, urut dari yang terbaik
+        listed = re.search(r"best match first: (.+)", prompt)
+        order = listed.group(1).strip().split(", ") if listed else None
+        tools = []
+        for line in prompt.splitlines():
+            try:
+                tool = json.loads(line.strip())
+            except json.JSONDecodeError:
+                continue
+            if isinstance(tool, dict) and "http" in tool:
+                tools.append(tool)
+        if order is not None:
+            by_name = {f"{tool['agent_name']}/{tool['name']}": tool for tool in tools}
+            tools = [by_name[name] for name in order if name in by_name]
+
+        candidates, matched = [], []
+        for tool in tools:
+            properties = tool.get("schema_model", tool.get("schema", {}))["parameters"]["properties"]
+            call = ResponseTool(
+                url=tool["http"]["url"],
+                method=tool["http"]["method"],
+                payload={name: prop.get("default") or "value" for name, prop in properties.items()},
+                additional_prompt_to_ai=tool.get("additional_prompt_to_ai"),
+            )
+            if not planning:
+                return call
+            candidates.append(call)
+            if any(intent in query for intent in tool.get("intent_examples", [])):
+                matched.append(call)
+        if planning:
+            return schema(calls=matched or candidates[:1])
+        return schema(url="", method="GET", payload="No matching tool")
+
+    def _stream(self, answer: str, usage):
+        size = max(1, math.ceil(len(answer) / self.stream_chunks))
+        for start in range(0, len(answer), size):
+            last = start + size >= len(answer)
+            yield SimpleNamespace(text=answer[start:start + size], usage_metadata=usage if last else None)
@@ -0,0 +1,214 @@
+"""
+Concurrent load generator for `LLMOrchestrator.invoke_query`.
+
+Replays a query trace against a warmed orchestrator with stubbed Gemini and tool latencies
+(see `benchmarks.suite`) at several concurrency levels. Without `--rate` every level is a
+closed loop of `concurrency` users sending queries back to back; with `--rate` queries
+arrive as a Poisson process at that many per second, with at most `concurrency` in flight
+(queueing time counts towards latency). For each level it reports latency percentiles,
+throughput and the event-loop lag, which grows when something blocks the loop.
+
+The trace defaults to the intent examples of a synthetic catalog; `--agents-file` uses
+real agent files (their tool URLs are pointed at the mock server) and `--queries-file`
+replays one query per line.
+
+Usage:
+    python -m benchmarks.load [--concurrency 1,8,32,128] [--duration 10] [--rate 50] [--deadline 2] [--out load.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import os
+import random
+import sys
+import time
+import warnings
+
+from benchmarks.catalog import generate_catalog, intent_examples
+from benchmarks.common import add_fake_arguments, isolated, summary, warm_orchestrator, write_results
+from benchmarks.mock_server import MockToolServer
+from llm_orchestrator.core.executor.executor import SpeculationMetrics
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how much later than requested a short sleep wakes up.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Args:
+            interval (float): Seconds between two probes. Defaults to 0.01.
+        """
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task = None
+
+    async def __aenter__(self) -> 'LoopLagMonitor':
+        self._task = asyncio.create_task(self._probe())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+    async def _probe(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+
+def load_trace(args: argparse.Namespace, base_url: str) -> tuple[dict, list[str]]:
+    """
+    Build the catalog served by the mock server and the queries to replay.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+        base_url (str): The mock server URL.
+
+    Returns:
+        tuple[dict, list[str]]: The catalog and the queries.
+    """
+    if args.agents_file:
+        catalog = {}
+        for pattern in args.agents_file:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                with open(path) as f:
+                    agent = json.load(f)
+                for tool in agent["tools"]:
+                    tool["http"]["url"] = f"{base_url}/tools/{tool['name']}"
+                catalog[agent["agent_name"]] = agent
+        if not catalog:
+            raise SystemExit(f"No agent files match {args.agents_file}")
+    else:
+        catalog = generate_catalog(args.agents, args.tools, base_url, templates=args.templates)
+
+    if args.queries_file:
+        with open(args.queries_file) as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = intent_examples(catalog)
+    return catalog, queries
+
+
+async def run_level(orchestrator, queries: list[str], concurrency: int, args: argparse.Namespace) -> dict:
+    """
+    Drive one concurrency level for `args.duration` seconds.
+
+    Args:
+        orchestrator (LLMOrchestrator): The warmed orchestrator.
+        queries (list[str]): The trace to replay.
+        concurrency (int): Maximum queries in flight.
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        dict: Completed and failed queries, throughput, latency and loop lag.
+    """
+    rng = random.Random(args.seed)
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async def one(query: str, arrived: float):
+        try:
+            await orchestrator.invoke_query(query, speculative=args.speculative, deadline=args.deadline, raw=args.raw)
+            latencies.append(time.perf_counter() - arrived)
+        except Exception as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    orchestrator.speculation_metrics = SpeculationMetrics()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    async with LoopLagMonitor() as monitor:
+        if args.rate:
+            semaphore = asyncio.Semaphore(concurrency)
+            tasks = []
+
+            async def limited(query: str, arrived: float):
+                async with semaphore:
+                    await one(query, arrived)
+
+            next_arrival = started
+            while next_arrival < deadline:
+                await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+                tasks.append(asyncio.create_task(limited(rng.choice(queries), next_arrival)))
+                next_arrival += rng.expovariate(args.rate)
+            await asyncio.gather(*tasks)
+        else:
+            async def user():
+                while time.perf_counter() < deadline:
+                    await one(rng.choice(queries), time.perf_counter())
+
+            await asyncio.gather(*[user() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    level = {
+        "concurrency": concurrency,
+        "rate": args.rate,
+        "completed": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_qps": round(len(latencies) / elapsed, 2),
+        "latency_ms": summary(latencies),
+        "loop_lag_ms": summary(monitor.samples),
+    }
+    if args.speculative:
+        level["speculation"] = orchestrator.speculation_metrics.as_dict()
+    return level
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with MockToolServer(latency=args.tool_latency) as server:
+        catalog, queries = load_trace(args, server.url)
+        server.agents = catalog
+        levels = []
+        with isolated(args):
+            orchestrator, _ = await warm_orchestrator(catalog, server)
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                for concurrency in args.concurrency:
+                    levels.append(await run_level(orchestrator, queries, concurrency, args))
+                    print(json.dumps(levels[-1]), file=sys.stderr)
+            await orchestrator.aclose()
+
+    return {
+        "benchmark": "load",
+        "python": sys.version.split()[0],
+        "config": {
+            "agents": len(catalog),
+            "tools": sum(len(agent["tools"]) for agent in catalog.values()),
+            "queries": len(queries),
+            **{
+                key: getattr(args, key)
+                for key in ("duration", "rate", "speculative", "deadline", "templates", "raw", "ask_latency", "embed_latency", "tool_latency", "seed")
+            },
+        },
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=lambda value: [int(v) for v in value.split(",")], default=[1, 8, 32, 128],
+                        help="Comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--rate", type=float, default=None, help="Open loop arrival rate in queries per second")
+    parser.add_argument("--agents", type=int, default=10)
+    parser.add_argument("--tools", type=int, default=20, help="Tools per agent")
+    parser.add_argument("--agents-file", nargs="*", default=None, help="Agent JSON files (globs) to replay")
+    parser.add_argument("--queries-file", default=None, help="Text file with one query per line")
+    parser.add_argument("--speculative", action="store_true", help="Start predictable tool requests during tool selection")
+    parser.add_argument("--deadline", type=float, default=None, help="Latency budget per query in seconds")
+    parser.add_argument("--templates", action="store_true", help="Give the generated tools response templates")
+    parser.add_argument("--raw", action="store_true", help="Return tool results without explaining them")
+    add_fake_arguments(parser, ask_latency=0.3, embed_latency=0.05, tool_latency=0.1)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="Payload indexes have no effect in the local Qdrant")
+    write_results(asyncio.run(run(args)), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+In-process HTTP server that serves generated agent files and answers tool calls.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockToolServer:
+    """
+    Serves `/agents/<name>.json` from a catalog and answers `/tools/<tool>` with a small
+    JSON document after `latency` seconds. Use it as a context manager.
+    """
+
+    def __init__(self, agents: dict[str, dict] | None = None, latency: float = 0.0, status: int = 200):
+        """
+        Args:
+            agents (dict[str, dict] | None): Agent name to agent JSON document.
+            latency (float): Seconds each tool call takes. Defaults to 0.
+            status (int): Status code of tool calls. Defaults to 200.
+        """
+        self.agents = agents or {}
+        self.latency = latency
+        self.status = status
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self) -> 'MockToolServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._respond()
+
+            def do_POST(self):
+                self._respond()
+
+            def _respond(self):
+                server.requests += 1
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if url.path.startswith("/agents/"):
+                    agent = server.agents.get(url.path.removeprefix("/agents/").removesuffix(".json"))
+                    if agent is None:
+                        return self._send(404, {"error": "agent not found"})
+                    return self._send(200, agent)
+                if url.path.startswith("/tools/"):
+                    if server.latency:
+                        time.sleep(server.latency)
+                    return self._send(server.status, {
+                        "tool": url.path.removeprefix("/tools/"),
+                        "params": {k: v[0] for k, v in parse_qs(url.query).items()},
+                        "body": body.decode() or None,
+                        "items": [{"id": i, "title": f"Item {i}"} for i in range(5)],
+                    })
+                self._send(404, {"error": "not found"})
+
+            def _send(self, status: int, document: dict):
+                payload = json.dumps(document).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client membatalkan request, mis. speculative request yang di-cancel
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
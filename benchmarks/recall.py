@@ -0,0 +1,144 @@
+"""
+Recall vs latency vs memory of Qdrant collection settings on a synthetic tool catalog.
+
+Every variant (a `CollectionConfig`: quantization, rescoring, HNSW `m`/`ef_construct`/`ef`,
+on-disk vectors, two-stage compact search) gets its own collection filled with the same
+clustered vectors: tools of one agent are close to each other, like real tool descriptions. Queries are perturbed tool
+vectors and recall@k is measured against exact (brute force) neighbours. The synthetic
+vectors spread their information evenly over all dimensions, unlike Gemini embeddings, so
+the two-stage recall here is a lower bound.
+
+Indexing and quantization only exist on a Qdrant server; without `--url` the benchmark
+runs in qdrant-client's local mode, where every search is exact and only the memory
+estimates differ between variants.
+
+Usage:
+    python -m benchmarks.recall [--url http://localhost:6333] [--agents 100] [--tools 50] [--out recall.json]
+"""
+import argparse
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from benchmarks.common import summary, write_results
+from llm_orchestrator.shared.helpers.qdrant_helper import create_collection, search_points
+from llm_orchestrator.types.collection_config import CollectionConfig
+
+VARIANTS = {
+    "baseline": {},
+    "hnsw_ef_16": {"hnsw_ef": 16},
+    "hnsw_ef_128": {"hnsw_ef": 128},
+    "hnsw_m_32": {"hnsw_m": 32, "hnsw_ef_construct": 200},
+    "scalar_rescore": {"quantization": "scalar", "rescore": True, "oversampling": 2.0},
+    "scalar_no_rescore": {"quantization": "scalar", "rescore": False},
+    "binary_rescore": {"quantization": "binary", "rescore": True, "oversampling": 3.0},
+    "binary_no_rescore": {"quantization": "binary", "rescore": False},
+    "scalar_on_disk": {"quantization": "scalar", "on_disk": True, "rescore": True, "oversampling": 2.0},
+    "two_stage_256": {"search_size": 256, "on_disk": True},
+    "two_stage_256_scalar": {"search_size": 256, "on_disk": True, "quantization": "scalar", "oversampling": 2.0},
+}
+
+
+def make_catalog(agents: int, tools: int, queries: int, dimension: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Clustered unit vectors for `agents * tools` tools and perturbed copies as queries.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The tool vectors and the query vectors.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(agents, dimension))
+    vectors = np.repeat(centers, tools, axis=0) + rng.normal(scale=0.8, size=(agents * tools, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    picked = vectors[rng.integers(0, len(vectors), size=queries)]
+    query_vectors = picked + rng.normal(scale=0.03, size=picked.shape)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32), query_vectors.astype(np.float32)
+
+
+def run_variant(client, name: str, config: CollectionConfig, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, limit: int, local: bool) -> dict:
+    """
+    Fill a collection with `config`, search every query and compare with the exact neighbours.
+    """
+    from qdrant_client.models import HnswConfigDiff, OptimizersConfigDiff, PointStruct
+
+    collection = f"bench_recall_{name}"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    started = time.perf_counter()
+    create_collection(client, collection, config)
+    # Paksa index HNSW walaupun katalognya kecil
+    client.update_collection(
+        collection_name=collection,
+        hnsw_config=HnswConfigDiff(full_scan_threshold=1),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=1),
+    )
+    ids = [str(uuid.UUID(int=i)) for i in range(len(vectors))]
+    for start in range(0, len(vectors), 512):
+        client.upsert(collection_name=collection, points=[
+            PointStruct(id=ids[i], vector=config.point_vector(vectors[i].tolist()))
+            for i in range(start, min(start + 512, len(vectors)))
+        ])
+    if not local:
+        while client.get_collection(collection).status.value != "green":
+            time.sleep(0.2)
+    index_seconds = time.perf_counter() - started
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        result = search_points(client, collection, config, query.tolist(), limit)
+        latencies.append(time.perf_counter() - started)
+        hits += len({uuid.UUID(str(point.id)).int for point in result} & set(expected.tolist()))
+    client.delete_collection(collection)
+
+    return {
+        "variant": name,
+        "config": config.model_dump(exclude_defaults=True),
+        f"recall_at_{limit}": round(hits / (len(queries) * limit), 4),
+        "search_ms": summary(latencies),
+        "index_seconds": round(index_seconds, 3),
+        "estimated_ram_bytes": config.estimated_ram_bytes(len(vectors)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="Qdrant server URL; local mode when omitted")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--tools", type=int, default=50, help="Tools per agent")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--limit", type=int, default=5, help="k of recall@k, like invoke_query's top_k")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="Comma separated variants to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    from qdrant_client import QdrantClient
+
+    local = args.url is None
+    client = QdrantClient(location=":memory:") if local else QdrantClient(url=args.url, api_key=args.api_key)
+    vectors, queries = make_catalog(args.agents, args.tools, args.queries, args.dimension, args.seed)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.limit]
+
+    results = []
+    for name in args.variants.split(","):
+        config = CollectionConfig(size=args.dimension, **VARIANTS[name])
+        results.append(run_variant(client, name, config, vectors, queries, truth, args.limit, local))
+        print(f"{name}: recall {results[-1][f'recall_at_{args.limit}']}", file=sys.stderr)
+
+    write_results({
+        "benchmark": "recall",
+        "mode": "local" if local else "server",
+        "python": sys.version.split()[0],
+        "config": {key: getattr(args, key) for key in ("agents", "tools", "queries", "dimension", "limit", "seed")},
+        "variants": results,
+    }, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Startup benchmark for the orchestrator.
+
+Measures, in fresh interpreters, how long `import llm_orchestrator` takes and how long
+constructing an `LLMOrchestrator` takes. Neither should touch the network or import
+google-genai / qdrant-client.
+
+Usage:
+    python -m benchmarks.startup [--runs 10] [--out startup.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = """
+import time
+t = time.perf_counter()
+import llm_orchestrator
+print(time.perf_counter() - t)
+"""
+
+CONSTRUCT_SNIPPET = """
+import sys, time
+t = time.perf_counter()
+from llm_orchestrator import LLMOrchestrator
+LLMOrchestrator()
+elapsed = time.perf_counter() - t
+heavy = [m for m in ("google.genai", "qdrant_client") if m in sys.modules]
+assert not heavy, f"eagerly imported: {heavy}"
+print(elapsed)
+"""
+
+
+def run_snippet(snippet: str, runs: int) -> dict:
+    """
+    Run a snippet in `runs` fresh interpreters and summarize the in-process timings.
+
+    Args:
+        snippet (str): Python source that prints a single elapsed time in seconds.
+        runs (int): Number of fresh interpreters to start.
+
+    Returns:
+        dict: min/median/max of the in-process timing and of the whole process wall time, in ms.
+    """
+    inner, wall = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", snippet],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        wall.append(time.perf_counter() - start)
+        inner.append(float(output.strip().splitlines()[-1]))
+    return {
+        "in_process_ms": _summary(inner),
+        "process_wall_ms": _summary(wall),
+    }
+
+
+def _summary(values: list[float]) -> dict:
+    return {
+        "min": round(min(values) * 1000, 2),
+        "median": round(statistics.median(values) * 1000, 2),
+        "max": round(max(values) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--out", default=None, help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "startup",
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "import": run_snippet(IMPORT_SNIPPET, args.runs),
+        "construct": run_snippet(CONSTRUCT_SNIPPET, args.runs),
+    }
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
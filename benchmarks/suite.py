@@ -0,0 +1,168 @@
+"""
+Offline benchmark suite for the orchestrator.
+
+Runs without Gemini or a Qdrant server: the LLM is a `FakeLLM`, Qdrant runs in
+qdrant-client's local (in-memory) mode and agent files and tool endpoints are served by
+an in-process `MockToolServer`. Measures warm_up throughput for N agents x M tools,
+per-stage latency of single queries and the memory footprint of the warmed state, and
+checks that queries still work when each one runs on a new event loop.
+Everything runs in a temporary directory, so storage/ of the working tree is untouched.
+
+Usage:
+    python -m benchmarks [--agents 10] [--tools 20] [--queries 50] [--out results.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tracemalloc
+import warnings
+from collections import defaultdict
+
+from benchmarks.catalog import generate_catalog, intent_examples
+from benchmarks.common import add_fake_arguments, isolated, summary, warm_orchestrator, write_results
+from benchmarks.mock_server import MockToolServer
+
+
+async def bench_warm_up(args: argparse.Namespace, catalog: dict, server: MockToolServer) -> dict:
+    """
+    Time a cold warm_up (fetch, validate, embed, upsert) of the whole catalog.
+    """
+    tool_count = sum(len(agent["tools"]) for agent in catalog.values())
+    durations = []
+    for _ in range(args.warmup_runs):
+        with isolated(args) as llm:
+            orchestrator, elapsed = await warm_orchestrator(catalog, server)
+            assert len(orchestrator.registry) == tool_count, "not every tool was registered"
+            assert llm.embedded_texts == tool_count, "not every tool was embedded"
+            durations.append(elapsed)
+    return {
+        "agents": len(catalog),
+        "tools": tool_count,
+        "runs": args.warmup_runs,
+        "seconds": summary(durations, scale=1),
+        "tools_per_second": round(tool_count / statistics.median(durations), 1),
+    }
+
+
+async def bench_queries(args: argparse.Namespace, catalog: dict, server: MockToolServer) -> dict:
+    """
+    Run single queries one after another and report the latency of every stage.
+    """
+    from llm_orchestrator.shared.helpers.telemetry import Telemetry
+
+    stages = defaultdict(list)
+    telemetry = Telemetry()
+    hook = lambda span: stages[span.name].append(span.duration)
+
+    with isolated(args):
+        orchestrator, _ = await warm_orchestrator(catalog, server)
+        queries = random.Random(args.seed).choices(intent_examples(catalog), k=args.queries)
+        telemetry.add_hook(hook)
+        try:
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                for query in queries[:min(5, len(queries))]:
+                    await orchestrator.invoke_query(query)  # warm caches and connections
+                stages.clear()
+                for query in queries:
+                    await orchestrator.invoke_query(query)
+        finally:
+            telemetry.hooks.remove(hook)
+
+    return {
+        "queries": args.queries,
+        "tool_requests": server.requests,
+        "stages_ms": {stage: summary(values) for stage, values in sorted(stages.items())},
+    }
+
+
+async def check_event_loops(args: argparse.Namespace, catalog: dict, server: MockToolServer) -> dict:
+    """
+    Query one orchestrator under a new event loop per query, like an app that sets it up
+    with `asyncio.run(...)` and queries on another loop (Streamlit). Runs in a thread, its
+    `asyncio.run` calls can't be nested in the running loop.
+    """
+    with isolated(args):
+        orchestrator, _ = await warm_orchestrator(catalog, server)
+        query = intent_examples(catalog)[0]
+
+        def run_queries():
+            with contextlib.redirect_stdout(open(os.devnull, "w")):
+                for _ in range(args.loops):
+                    asyncio.run(orchestrator.invoke_query(query))
+
+        requests = server.requests
+        await asyncio.to_thread(run_queries)
+    assert server.requests - requests == args.loops, "not every query called its tool"
+    return {"loops": args.loops}
+
+
+async def bench_memory(args: argparse.Namespace, catalog: dict, server: MockToolServer) -> dict:
+    """
+    Measure allocations of a warm_up with tracemalloc (timings of this run are not reported).
+    """
+    with isolated(args):
+        tracemalloc.start()
+        try:
+            orchestrator, _ = await warm_orchestrator(catalog, server)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        tool_count = len(orchestrator.registry)
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        maxrss *= 1024  # Linux melaporkan dalam KiB
+    return {
+        "warm_up_retained_bytes": current,
+        "warm_up_peak_bytes": peak,
+        "retained_bytes_per_tool": round(current / max(tool_count, 1)),
+        "process_max_rss_bytes": maxrss,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    catalog_server = MockToolServer(latency=args.tool_latency)
+    with catalog_server as server:
+        catalog = generate_catalog(args.agents, args.tools, server.url)
+        server.agents = catalog
+        results = {
+            "benchmark": "suite",
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "config": {
+                key: getattr(args, key)
+                for key in ("agents", "tools", "queries", "dimension", "ask_latency", "embed_latency", "tool_latency", "seed")
+            },
+            "warm_up": await bench_warm_up(args, catalog, server),
+        }
+        server.requests = 0
+        results["query"] = await bench_queries(args, catalog, server)
+        results["event_loops"] = await check_event_loops(args, catalog, server)
+        if not args.skip_memory:
+            results["memory"] = await bench_memory(args, catalog, server)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=10)
+    parser.add_argument("--tools", type=int, default=20, help="Tools per agent")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--warmup-runs", type=int, default=3)
+    parser.add_argument("--skip-memory", action="store_true")
+    parser.add_argument("--loops", type=int, default=2, help="Queries in the per-query event loop check")
+    add_fake_arguments(parser)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", message="Payload indexes have no effect in the local Qdrant")
+    write_results(asyncio.run(run(args)), args.out)
+
+
+if __name__ == "__main__":
+    main()
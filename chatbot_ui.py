@@ -24,33 +24,11 @@ def init_orchestrator():
 
 
 def get_available_tools(llm_orchestrator):
-    """Ambil daftar tools dari semua agent, support instance atau dict."""
-    tools_list = []
-
-    agents_obj = llm_orchestrator.agents
-
-    # Kalau dict of object → loop .values()
-    if isinstance(agents_obj, dict):
-        for agent in agents_obj.values():
-            # agent bisa object atau dict
-            if hasattr(agent, "tools"):  # Agent instance
-                for tool in agent.tools:
-                    tools_list.append(f"**{tool.name}** — {tool.description}")
-            elif isinstance(agent, dict):  # dict biasa
-                for tool in agent.get("tools", []):
-                    tools_list.append(f"**{tool['name']}** — {tool['description']}")
-
-    # Kalau list
-    elif isinstance(agents_obj, list):
-        for agent in agents_obj:
-            if hasattr(agent, "tools"):
-                for tool in agent.tools:
-                    tools_list.append(f"**{tool.name}** — {tool.description}")
-            elif isinstance(agent, dict):
-                for tool in agent.get("tools", []):
-                    tools_list.append(f"**{tool['name']}** — {tool['description']}")
-
-    return tools_list
+    """Ambil daftar tools dari semua agent yang ada di registry."""
+    return [
+        f"**{tool.name}** — {tool.definition['description']}"
+        for tool in llm_orchestrator.registry.tools()
+    ]
 
 
 def main():
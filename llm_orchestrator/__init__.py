@@ -1,18 +1,23 @@
+import importlib
+
 from llm_orchestrator.decorators.private import PrivateMethod
-from .main import LLMOrchestrator
-from .core.agent.loader import AgentLoader
-from .core.agent.validator import AgentValidator
-from .exceptions.agent_loader_exception import AgentLoaderException
-from .exceptions.base_agent_exception import BaseAgentException
-from .schemas import (
-    AgentSchema,
-    HTTPConfig,
-    ParameterProperty,
-    Parameters,
-    SchemaModel,
-    Tool,
-)
-PrivateMethod.allowed_classes.add(LLMOrchestrator.__name__)
+
+# Public names are resolved on first access so `import llm_orchestrator` does not
+# pull google-genai / qdrant-client (and their transitive imports) into every process.
+_LAZY_IMPORTS = {
+    "LLMOrchestrator": ".main",
+    "AgentLoader": ".core.agent.loader",
+    "AgentValidator": ".core.agent.validator",
+    "AgentLoaderException": ".exceptions.agent_loader_exception",
+    "BaseAgentException": ".exceptions.base_agent_exception",
+    "AgentSchema": ".schemas",
+    "HTTPConfig": ".schemas",
+    "ParameterProperty": ".schemas",
+    "Parameters": ".schemas",
+    "SchemaModel": ".schemas",
+    "Tool": ".schemas",
+}
+PrivateMethod.allowed_classes.add("LLMOrchestrator")
 __all__ = [
     "LLMOrchestrator",
     "AgentLoader",
@@ -26,4 +31,28 @@ __all__ = [
     "SchemaModel",
     "Tool",
 ]
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    """
+    Lazily import the public API of the package on first attribute access.
+
+    Args:
+        name (str): The attribute being looked up on the package.
+
+    Returns:
+        Any: The requested class, cached on the package afterwards.
+
+    Raises:
+        AttributeError: If the name is not part of the public API.
+    """
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
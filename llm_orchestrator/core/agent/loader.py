@@ -1,9 +1,9 @@
+import asyncio
 import hashlib
 import json
 import os
 import traceback
 from typing import List
-import uuid
 
 import aiofiles
 import httpx
@@ -12,36 +12,116 @@ from llm_orchestrator.exceptions.agent_loader_exception import AgentLoaderExcept
 from llm_orchestrator.schemas.agent import AgentSchema
 from llm_orchestrator.types.agents import Agent
 from llm_orchestrator.core.agent.validator import AgentValidator
+from llm_orchestrator.core.agent.warmup import WarmUpJob
 from llm_orchestrator.decorators.private import PrivateMethod
 from llm_orchestrator.core.memory.factory import MemoryFactory
 from llm_orchestrator.types.base_llm import LLMClientType
-from llm_orchestrator.types.memory import MemoryType
 from llm_orchestrator.core.llms.factory import LLMFactory
+from llm_orchestrator.core.embeddings.factory import EmbeddingFactory
+from llm_orchestrator.types.base_embedding import EmbeddingClientType
+from llm_orchestrator.core.llms.rate_limiter import Priority, llm_priority
 from llm_orchestrator.shared.helpers.qdrant_helper import QdrantHelper
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+from llm_orchestrator.core.registry.registry import AgentDiff, AgentRegistry, ToolRecord, is_tool_point_id
 class AgentLoader:
-    def __init__(self, llm_client: LLMClientType = LLMClientType.GEMINI):
+    def __init__(self, llm_client: LLMClientType = LLMClientType.GEMINI, embedding_client: EmbeddingClientType | None = None):
         """
         Initialize AgentLoader with a default LLM client of GEMINI, unless otherwise specified.
 
         Args:
             llm_client (LLMClientType): The type of LLM client to use. Defaults to LLMClientType.GEMINI.
+            embedding_client (EmbeddingClientType | None): The provider that embeds tools and
+                queries. Defaults to EMBEDDING_PROVIDER (GEMINI when unset).
         """
-        self.in_memory_manager = MemoryFactory.get(MemoryType.InMemory)
+        self.in_memory_manager = MemoryFactory.get()
+        self.llm_client_type = llm_client
         self.llm_client = LLMFactory.get(llm_client)
+        self.embedding_client_type = embedding_client or EmbeddingFactory.default_type()
+        self.embedding_client = EmbeddingFactory.get(self.embedding_client_type)
         self.qdrant_helper = QdrantHelper()
+        self.telemetry = Telemetry()
         
-        # Agents yang sudah di-load dan valid
-        self.agents: list[AgentSchema] = []
+        # Agents yang sudah di-load dan valid, beserta tools-nya
+        self.registry = AgentRegistry()
+        # Point tools yang sudah dihapus dari agent-nya, dihapus dari Qdrant saat _vectorize
+        self.stale_point_ids: set[str] = set()
+        # Tools yang hanya payload-nya berubah (mis. tenant), payload di Qdrant diganti saat _vectorize
+        self.relabeled_tools: dict[str, ToolRecord] = {}
+        # Point lama dengan ID random (sebelum ID deterministik) dihapus sekali per proses
+        self._legacy_points_removed = False
+
+    @property
+    def agents(self) -> list[AgentSchema]:
+        """
+        The loaded and validated agents.
+
+        Returns:
+            list[AgentSchema]: One entry per agent name, the latest loaded version.
+        """
+        return self.registry.agents()
     
     async def register_agents(self, agents: List[Agent]):
         """
         Registers a list of agents in memory.
 
+        An agent with a `tenant` is only visible to queries of that tenant, see
+        `invoke_query`; registering it again without one shares it with every tenant.
+        The `name` must be the `agent_name` of its agent file, see `check_agent_name`.
+
         Args:
             agents (List[Agent]): A list of agents to register.
         """
         for agent in agents:
             await self.in_memory_manager.set_memory("REGISTERED_AGENTS", agent, append=True)
+            # Per field, supaya worker lain yang mendaftarkan agent bersamaan tidak tertimpa
+            await self.in_memory_manager.set_field("AGENT_SOURCES", agent.name, agent.urlAgentFile)
+            await self.in_memory_manager.set_field("AGENT_TENANTS", agent.name, agent.tenant)
+            self.registry.set_tenant(agent.name, agent.tenant)
+
+    @staticmethod
+    def check_agent_name(name: str, agent: AgentSchema):
+        """
+        Reject an agent file whose `agent_name` differs from the name it was registered under.
+        The registry keys agents by `agent_name`, while sources and tenants are stored under
+        the registered name, so the tenant would never be applied to the agent.
+
+        Args:
+            name (str): The registered name.
+            agent (AgentSchema): The validated agent file.
+
+        Raises:
+            AgentLoaderException: When the names differ.
+        """
+        if agent.agent_name != name:
+            raise AgentLoaderException(
+                f"Agent {name} was registered with the file of agent {agent.agent_name}, the names must match"
+            )
+
+    async def get_agent_sources(self) -> dict[str, str]:
+        """
+        Retrieves every agent ever registered, unlike `get_agents` which is cleared after warm up.
+
+        Returns:
+            dict[str, str]: Agent name to agent file URL.
+        """
+        return await self.in_memory_manager.get_fields("AGENT_SOURCES")
+
+    async def get_agent_tenants(self) -> dict[str, str | None]:
+        """
+        Retrieves the tenant of every registered agent.
+
+        Returns:
+            dict[str, str | None]: Agent name to tenant, None for shared agents.
+        """
+        return await self.in_memory_manager.get_fields("AGENT_TENANTS")
+
+    async def load_agent_tenants(self):
+        """
+        Apply the tenants stored in memory to the registry, so agents registered by another
+        process sharing the memory manager get the same tenant here.
+        """
+        for agent_name, tenant in (await self.get_agent_tenants()).items():
+            self.registry.set_tenant(agent_name, tenant)
         
     async def get_agents(self)->List[Agent]:
         """
@@ -73,21 +153,30 @@ class AgentLoader:
         Raises:
             AgentLoaderException: If any error occurs while fetching the agent.
         """
-        agents = await self.get_agents()
+        agents = await self.get_agents() or []
         async with httpx.AsyncClient() as client:
             for agent in agents:
                 try:
                     file_path = f'storage/agents/{agent.name}.json'
                     checksum_path = f'storage/agents/{agent.name}.checksum'
 
-                    agent_file_resp = await client.get(agent.urlAgentFile)
-                    agent_file_resp.raise_for_status()
+                    with self.telemetry.span("fetch_agent"):
+                        agent_file_resp = await client.get(agent.urlAgentFile)
+                        agent_file_resp.raise_for_status()
                     agent_json = agent_file_resp.text
                     is_agent_valid = AgentValidator.run(json.loads(agent_json))
                     if not is_agent_valid:
                         raise AgentLoaderException(f"Agent {agent.name} is not valid schema, please check it out.")
-                    self.agents.append(is_agent_valid.model_dump())
+                    self.check_agent_name(agent.name, is_agent_valid)
                     new_checksum = hashlib.md5(agent_json.encode()).hexdigest()
+                    previous_checksum = self.registry.get_checksum(is_agent_valid.agent_name)
+                    diff = self.registry.set_agent(is_agent_valid, new_checksum)
+                    self.stale_point_ids.update(tool.point_id for tool in diff.removed)
+                    self.relabeled_tools.update((tool.point_id, tool) for tool in diff.relabeled)
+                    # _vectorize melewati agent ini (checksum sudah di registry), jadi cache
+                    # prompt lama dihapus di sini
+                    if diff.added or diff.changed or diff.removed or previous_checksum != new_checksum:
+                        await self.llm_client.invalidate_cache(is_agent_valid.agent_name)
 
                     if os.path.exists(checksum_path):
                         async with aiofiles.open(checksum_path, 'r') as f:
@@ -113,48 +202,143 @@ class AgentLoader:
         await self.in_memory_manager.clear_memory("REGISTERED_AGENTS")
         
     @PrivateMethod
-    async def _vectorize(self):
+    async def _vectorize(self, workers: int = 1):
         """
         Private method to vectorize all agents in storage/agents folder.
 
-        This method reads all agent files in storage/agents folder and vectorizes
-        each tool in the agent using the LLMClient. The vectorized data is then
-        stored in the Qdrant database.
+        Agents in storage/agents folder that are not in the registry yet are loaded
+        into it first. Then every registry tool without a vector (new, or changed
+        since it was last vectorized) is embedded using the LLMClient and upserted
+        into the Qdrant database under its deterministic point ID, by a resumable
+        `WarmUpJob` that checkpoints its progress under storage/warmup. Tools whose
+        payload changed but not their prompt (e.g. a new tenant) only get their
+        payload overwritten. Points of tools that were removed from their agent are
+        deleted, and on the first call
+        also the points left by versions that stored tools under random IDs (they
+        would take `top_k` slots of every search without matching a tool).
+
+        Args:
+            workers (int): Number of worker processes for the embedding job. Defaults to 1.
 
         Raises:
-            AgentLoaderException: If any error occurs while vectorizing the agents.
+            AgentLoaderException: If the LLM's embedding dimension doesn't match the collection,
+                any error occurs while vectorizing the agents, or some tools still failed after
+                retrying. Progress is kept, so calling it again resumes.
         """
+        collection_size = self.qdrant_helper.collection_config.size
+        if self.embedding_client.embedding_dimension != collection_size:
+            raise AgentLoaderException(
+                f"Embedding dimension {self.embedding_client.embedding_dimension} doesn't match the "
+                f"collection size {collection_size}, set EMBEDDING_DIMENSION for both"
+            )
         try:
+            await self.load_agent_tenants()
             directory = 'storage/agents/'
+            # Server bisa start tanpa agent, folder baru dibuat saat agent pertama disimpan
+            os.makedirs(directory, exist_ok=True)
             files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f)) and f.endswith('.json')]
+            known_checksums = {self.registry.get_checksum(agent.agent_name) for agent in self.registry.agents()}
             for file in files:
                 async with aiofiles.open(f'storage/agents/{file}', 'r') as f:
                     agent_json = await f.read()
-                    agent_data: AgentSchema = AgentValidator.run(json.loads(agent_json)).model_dump()
-                    for tool in agent_data['tools']:
-                        concated_text = (
-                            f"Agent Name: {agent_data['agent_name']}, "
-                            f"Tool Name: {tool['name']}, "
-                            f"Tool Description: {tool['description']}, "
-                            f"Tool Intents: {', '.join(tool['intent_examples'])}"
-                        )
-
-                        embedding = self.llm_client.embeddings([concated_text])[0]
-                        print(tool)
-                        self.qdrant_helper.upsert_with_filter(
-                            collection_name="llm_orchestrator",
-                            payload_filter={
-                                "agent_name": agent_data["agent_name"],
-                                "name": tool["name"]
-                            },
-                            vector=embedding,
-                            payload={
-                                **tool,
-                                "agent_name": agent_data["agent_name"],
-                                "requiredAuth": agent_data.get("requiredAuth", False),
-                                "authType": agent_data.get("authType", "Individual")
-                            }
-                        )
+                checksum = hashlib.md5(agent_json.encode()).hexdigest()
+                if checksum in known_checksums:
+                    continue
+                agent = AgentValidator.run(json.loads(agent_json))
+                diff = self.registry.set_agent(agent, checksum)
+                self.stale_point_ids.update(tool.point_id for tool in diff.removed)
+                self.relabeled_tools.update((tool.point_id, tool) for tool in diff.relabeled)
+                # Schema tools agent berubah, cache prompt lamanya tidak terpakai lagi
+                await self.llm_client.invalidate_cache(agent.agent_name)
+
+            job = await WarmUpJob(self, workers=workers).run()
+
+            # Hanya record yang masih terdaftar, versi agent yang lebih baru bisa sudah menggantinya
+            relabeled = [
+                tool for point_id, tool in self.relabeled_tools.items()
+                if self.registry.get_by_point_id(point_id) is tool and tool.vector is not None
+            ]
+            if relabeled:
+                self.qdrant_helper.overwrite_payloads(
+                    "llm_orchestrator",
+                    [{"id": tool.point_id, "payload": tool.point_payload} for tool in relabeled]
+                )
+                print(f"Updated the payload of {len(relabeled)} tools")
+            self.relabeled_tools.clear()
+
+            if not self._legacy_points_removed:
+                legacy = [
+                    point_id for point_id in self.qdrant_helper.point_ids("llm_orchestrator")
+                    if not is_tool_point_id(point_id)
+                ]
+                if legacy:
+                    print(f"Removing {len(legacy)} points with non-deterministic IDs")
+                self.stale_point_ids.update(legacy)
+            if self.stale_point_ids:
+                self.qdrant_helper.delete_points("llm_orchestrator", list(self.stale_point_ids))
+                print(f"Removed {len(self.stale_point_ids)} stale tools")
+                self.stale_point_ids.clear()
+            self._legacy_points_removed = True
         except Exception as e:
             traceback.print_exc()
-            raise AgentLoaderException(f"Error when vectorizing: {str(e)}")
\ No newline at end of file
+            raise AgentLoaderException(f"Error when vectorizing: {str(e)}")
+
+        if job.failed:
+            raise AgentLoaderException(
+                f"Failed to vectorize {len(job.failed)} tools: "
+                + ", ".join(f"{tool.agent_name}/{tool.name}" for tool in job.failed)
+                + ". Call warm_up again to resume."
+            )
+
+    async def sync_agent(self, agent: AgentSchema, checksum: str | None = None, batch_size: int = 100) -> AgentDiff:
+        """
+        Apply a new version of an agent without pausing queries.
+
+        Only added or changed tools are embedded and upserted, in batches of `batch_size`;
+        relabeled tools (same prompt, new payload) only get their payload overwritten. The
+        registry entry is swapped afterwards in a single step, then the LLM's cached
+        prompt prefixes built from the agent and the points of removed tools are deleted.
+        Embedding calls run at background priority so they yield to queries; blocking
+        Qdrant calls run in worker threads.
+
+        Args:
+            agent (AgentSchema): The validated agent.
+            checksum (str | None): Checksum of the agent file.
+            batch_size (int): How many tools to embed per request. Defaults to 100.
+
+        Returns:
+            AgentDiff: The added, changed and removed tools.
+        """
+        diff = self.registry.diff(agent)
+        pending = diff.pending
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            with self.telemetry.span("embed_batch", phase="reload"), llm_priority(Priority.BACKGROUND):
+                embeddings = await self.embedding_client.embeddings([tool.prompt for tool in batch])
+            with self.telemetry.span("upsert_batch", phase="reload"):
+                await asyncio.to_thread(
+                    self.qdrant_helper.upsert_points,
+                    "llm_orchestrator",
+                    [
+                        {"id": tool.point_id, "vector": embedding, "payload": tool.point_payload}
+                        for tool, embedding in zip(batch, embeddings)
+                    ]
+                )
+            for tool, embedding in zip(batch, embeddings):
+                tool.vector = embedding
+        if diff.relabeled:
+            await asyncio.to_thread(
+                self.qdrant_helper.overwrite_payloads,
+                "llm_orchestrator",
+                [{"id": tool.point_id, "payload": tool.point_payload} for tool in diff.relabeled]
+            )
+
+        self.registry.set_agent(agent, checksum, diff)
+        await self.llm_client.invalidate_cache(agent.agent_name)
+        if diff.removed:
+            await asyncio.to_thread(
+                self.qdrant_helper.delete_points,
+                "llm_orchestrator",
+                [tool.point_id for tool in diff.removed]
+            )
+        return diff
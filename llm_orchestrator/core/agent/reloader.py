@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Optional
+
+import aiofiles
+import httpx
+
+from llm_orchestrator.core.agent.validator import AgentValidator
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+
+if TYPE_CHECKING:
+    from llm_orchestrator.core.agent.loader import AgentLoader
+
+
+@dataclass
+class ReloadMetrics:
+    """
+    Counters of the background agent reloader.
+
+    Attributes:
+        reloads_total (int): Completed reload passes.
+        reload_errors_total (int): Agents that failed to reload.
+        agents_reloaded_total (int): Agents whose file changed and were applied.
+        tools_added_total (int): Tools added across all reloads.
+        tools_changed_total (int): Tools re-embedded because their content changed.
+        tools_removed_total (int): Tools whose points were deleted.
+        last_reload_seconds (float): Duration of the last reload pass.
+        last_reload_at (float): Unix time the last reload pass finished.
+    """
+    reloads_total: int = 0
+    reload_errors_total: int = 0
+    agents_reloaded_total: int = 0
+    tools_added_total: int = 0
+    tools_changed_total: int = 0
+    tools_removed_total: int = 0
+    last_reload_seconds: float = 0.0
+    last_reload_at: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class AgentReloader:
+    """
+    Background task that keeps the loaded agents in sync with their sources.
+
+    Every `interval` seconds it re-fetches the registered agent URLs (using ETags when
+    the server provides them) and, with `watch_storage`, re-reads the agent files in
+    storage/agents. Agents whose checksum changed are applied through
+    `AgentLoader.sync_agent`, which only re-embeds added or changed tools and deletes
+    the points of removed ones while queries keep being served.
+    """
+
+    def __init__(self, loader: 'AgentLoader', interval: float = 30.0, watch_storage: bool = False):
+        """
+        Args:
+            loader (AgentLoader): The loader (usually the LLMOrchestrator) to keep in sync.
+            interval (float): Seconds between two reload passes. Defaults to 30.
+            watch_storage (bool): Also pick up edits made directly to storage/agents. Defaults to False.
+        """
+        self.loader = loader
+        self.interval = interval
+        self.watch_storage = watch_storage
+        self.metrics = ReloadMetrics()
+        self._etags: dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """
+        Start the reload loop on the running event loop. Calling it twice is a no-op.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the reload loop and wait for it to finish.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload_once()
+            except Exception:
+                # Mis. Redis tidak tersedia: pass ini gagal, loop tetap jalan
+                traceback.print_exc()
+                self.metrics.reload_errors_total += 1
+                Telemetry().inc("llm_orchestrator_agent_reload_errors_total")
+
+    async def reload_once(self) -> ReloadMetrics:
+        """
+        Run a single reload pass over all sources.
+
+        Returns:
+            ReloadMetrics: The updated metrics.
+        """
+        started = time.perf_counter()
+        await self.loader.load_agent_tenants()
+        sources = await self.loader.get_agent_sources()
+        async with httpx.AsyncClient() as client:
+            for name, url in sources.items():
+                try:
+                    fetched = await self._fetch(client, name, url)
+                    if fetched is not None:
+                        agent_json, etag = fetched
+                        await self._apply(name, agent_json, registered=True)
+                        # ETag baru disimpan setelah apply berhasil, kalau gagal agent di-fetch ulang
+                        if etag is not None:
+                            self._etags[name] = etag
+                except Exception:
+                    traceback.print_exc()
+                    self.metrics.reload_errors_total += 1
+                    Telemetry().inc("llm_orchestrator_agent_reload_errors_total")
+
+        if self.watch_storage and os.path.isdir('storage/agents'):
+            for file in os.listdir('storage/agents'):
+                name = file.removesuffix('.json')
+                if not file.endswith('.json') or name in sources:
+                    continue
+                try:
+                    async with aiofiles.open(f'storage/agents/{file}', 'r') as f:
+                        await self._apply(name, await f.read())
+                except Exception:
+                    traceback.print_exc()
+                    self.metrics.reload_errors_total += 1
+                    Telemetry().inc("llm_orchestrator_agent_reload_errors_total")
+
+        self.metrics.reloads_total += 1
+        self.metrics.last_reload_seconds = time.perf_counter() - started
+        self.metrics.last_reload_at = time.time()
+        Telemetry().observe("llm_orchestrator_agent_reload_seconds", self.metrics.last_reload_seconds)
+        return self.metrics
+
+    async def _fetch(self, client: httpx.AsyncClient, name: str, url: str) -> Optional[tuple[str, Optional[str]]]:
+        headers = {"If-None-Match": self._etags[name]} if name in self._etags else {}
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        return response.text, response.headers.get("etag")
+
+    async def _apply(self, name: str, agent_json: str, registered: bool = False):
+        checksum = hashlib.md5(agent_json.encode()).hexdigest()
+        checksum_path = f'storage/agents/{name}.checksum'
+        agent = AgentValidator.run(json.loads(agent_json))
+        if registered:
+            # Tenant disimpan dengan nama registrasi, agent_name yang berubah tidak di-apply
+            self.loader.check_agent_name(name, agent)
+        # Dibandingkan dengan registry, bukan file checksum: worker lain bisa sudah menulis
+        # file yang sama, agent tetap harus di-apply ke registry proses ini
+        registry = self.loader.registry
+        current = registry.diff(agent)
+        if registry.get_checksum(agent.agent_name) == checksum and not current.pending and not current.relabeled:
+            return
+
+        diff = await self.loader.sync_agent(agent, checksum)
+
+        os.makedirs('storage/agents', exist_ok=True)
+        async with aiofiles.open(f'storage/agents/{name}.json', 'w') as f:
+            await f.write(agent_json)
+        async with aiofiles.open(checksum_path, 'w') as f:
+            await f.write(checksum)
+
+        self.metrics.agents_reloaded_total += 1
+        self.metrics.tools_added_total += len(diff.added)
+        self.metrics.tools_changed_total += len(diff.changed)
+        self.metrics.tools_removed_total += len(diff.removed)
+        for change, tools in (("added", diff.added), ("changed", diff.changed), ("removed", diff.removed)):
+            Telemetry().inc("llm_orchestrator_agent_reload_tools_total", len(tools), change=change)
+        print(
+            f"Reloaded {agent.agent_name}: {len(diff.added)} added, "
+            f"{len(diff.changed)} changed, {len(diff.removed)} removed"
+        )
@@ -0,0 +1,358 @@
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import aiofiles
+
+from llm_orchestrator.core.llms.rate_limiter import AdaptiveRateLimiter, Priority, llm_priority
+from llm_orchestrator.core.registry.registry import ToolRecord
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+
+if TYPE_CHECKING:
+    from llm_orchestrator.core.agent.loader import AgentLoader
+
+CHECKPOINT_DIR = 'storage/warmup'
+
+
+class WarmUpJob:
+    """
+    Resumable embedding job for the tools of the loaded agents.
+
+    Tools are embedded and upserted in batches. Every finished batch is appended to a
+    checkpoint under storage/warmup (point ID and content hash per tool), so after a
+    crash or a failed run the next job only re-embeds what is missing; the vectors of
+    checkpointed tools are read back from Qdrant. Failed batches are retried with
+    exponential backoff, then tool by tool, so a single bad tool doesn't abort the rest.
+
+    With `workers > 1` the batches are put on a shared queue and drained by that many
+    worker processes, each with its own LLM and Qdrant clients and an equal share of the
+    embedding rate limiter's quota (`AdaptiveRateLimiter.share`), so together they stay
+    within the configured RPM/TPM. This needs a Qdrant server, since an in-process Qdrant
+    isn't shared between processes. The workers get the
+    parent's Qdrant client arguments and collection layout (`QdrantHelper.configure`) and
+    build the same embedding provider; a worker whose embedder differs from the parent's
+    (e.g. an instance set with `EmbeddingFactory.set_instance`, which doesn't reach other
+    processes) fails instead of writing vectors the queries can't match.
+    """
+
+    def __init__(
+        self,
+        loader: 'AgentLoader',
+        batch_size: int = 100,
+        retries: int = 3,
+        backoff_factor: float = 1.0,
+        workers: int = 1,
+        checkpoint_dir: str = CHECKPOINT_DIR
+    ):
+        """
+        Args:
+            loader (AgentLoader): The loader whose registry tools should be vectorized.
+            batch_size (int): How many tools to embed per request. Defaults to 100.
+            retries (int): Retries per batch (and per tool) after the first failure. Defaults to 3.
+            backoff_factor (float): Base delay in seconds for the exponential backoff. Defaults to 1.0.
+            workers (int): Number of worker processes; 1 runs in the current process. Defaults to 1.
+            checkpoint_dir (str): Where checkpoints are kept. Defaults to storage/warmup.
+        """
+        self.loader = loader
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.workers = workers
+        self.checkpoint_dir = checkpoint_dir
+        self.completed = 0
+        self.resumed = 0
+        self.failed: list[ToolRecord] = []
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.checkpoint_dir, 'checkpoint.jsonl')
+
+    async def run(self) -> 'WarmUpJob':
+        """
+        Vectorize every registry tool that has no vector yet.
+
+        Returns:
+            WarmUpJob: The job, with `completed`, `resumed` and `failed` filled in.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self._check_model()
+        pending = [tool for tool in self.loader.registry.tools() if tool.vector is None]
+        checkpoint = self.load_checkpoint()
+        resumable = [tool for tool in pending if checkpoint.get(tool.point_id) == tool.content_hash]
+        self.resumed = await self._restore_vectors(resumable)
+        if self.resumed:
+            print(f"Warm up: resumed {self.resumed} tools from checkpoint")
+
+        pending = [tool for tool in pending if tool.vector is None]
+        if self.workers > 1 and len(pending) > self.batch_size:
+            await self._run_processes(pending)
+        else:
+            await self._run_local(pending)
+        self.compact_checkpoint()
+        return self
+
+    def _check_model(self):
+        """
+        Drop the checkpoint when it was written with another embedding model: the vectors in
+        Qdrant can't be reused, every tool is re-embedded (and its point overwritten).
+        """
+        model_id = self.loader.embedding_client.model_id
+        model_path = os.path.join(self.checkpoint_dir, 'model')
+        previous = None
+        if os.path.exists(model_path):
+            with open(model_path) as f:
+                previous = f.read().strip()
+        if previous is not None and previous != model_id:
+            print(f"Warm up: embedding model changed from {previous} to {model_id}, re-embedding every tool")
+            for path in glob.glob(os.path.join(self.checkpoint_dir, 'checkpoint*.jsonl')):
+                os.remove(path)
+        with open(model_path, 'w') as f:
+            f.write(model_id)
+
+    def load_checkpoint(self) -> dict[str, str]:
+        """
+        Read the checkpoint, including the ones written by worker processes.
+
+        Returns:
+            dict[str, str]: Point ID to the content hash it was embedded with.
+        """
+        checkpoint = {}
+        for path in sorted(glob.glob(os.path.join(self.checkpoint_dir, 'checkpoint*.jsonl'))):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Baris terakhir bisa terpotong kalau proses crash
+                    checkpoint[entry["point_id"]] = entry["hash"]
+        return checkpoint
+
+    def compact_checkpoint(self):
+        """
+        Rewrite the checkpoint with only the tools currently in the registry and merge the
+        worker checkpoints into it.
+        """
+        checkpoint = self.load_checkpoint()
+        lines = [
+            json.dumps({"point_id": tool.point_id, "agent_name": tool.agent_name, "name": tool.name, "hash": tool.content_hash})
+            for tool in self.loader.registry.tools()
+            if checkpoint.get(tool.point_id) == tool.content_hash
+        ]
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        os.replace(tmp_path, self.checkpoint_path)
+        for path in glob.glob(os.path.join(self.checkpoint_dir, 'checkpoint-*.jsonl')):
+            os.remove(path)
+
+    async def _restore_vectors(self, tools: list[ToolRecord]) -> int:
+        if not tools:
+            return 0
+        points = await asyncio.to_thread(
+            self.loader.qdrant_helper.retrieve_vectors,
+            "llm_orchestrator",
+            [tool.point_id for tool in tools],
+            with_payload=True
+        )
+        restored, relabeled = 0, []
+        for tool in tools:
+            if tool.point_id in points:
+                tool.vector, payload = points[tool.point_id]
+                restored += 1
+                # Checkpoint hanya mencocokkan prompt, tenant bisa sudah berubah sejak di-embed
+                if payload != tool.point_payload:
+                    relabeled.append({"id": tool.point_id, "payload": tool.point_payload})
+        if relabeled:
+            await asyncio.to_thread(self.loader.qdrant_helper.overwrite_payloads, "llm_orchestrator", relabeled)
+        return restored
+
+    async def _run_local(self, pending: list[ToolRecord]):
+        async with aiofiles.open(self.checkpoint_path, 'a') as checkpoint:
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                try:
+                    await self._process_batch(batch, checkpoint)
+                except Exception:
+                    traceback.print_exc()
+                    # Batch gagal terus, coba satu per satu supaya tool lain tetap jalan
+                    for tool in batch:
+                        try:
+                            await self._process_batch([tool], checkpoint)
+                        except Exception:
+                            traceback.print_exc()
+                            self.failed.append(tool)
+                print(f"Warm up: {self.completed}/{len(pending)} tools vectorized")
+
+    async def _process_batch(self, batch: list[ToolRecord], checkpoint):
+        attempt = 0
+        while True:
+            try:
+                # Warm up mengalah ke query user di rate limiter LLM
+                with Telemetry().span("embed_batch", phase="warmup"), llm_priority(Priority.BACKGROUND):
+                    embeddings = await self.loader.embedding_client.embeddings([tool.prompt for tool in batch])
+                with Telemetry().span("upsert_batch", phase="warmup"):
+                    await asyncio.to_thread(
+                        self.loader.qdrant_helper.upsert_points,
+                        "llm_orchestrator",
+                        [
+                            {"id": tool.point_id, "vector": embedding, "payload": tool.point_payload}
+                            for tool, embedding in zip(batch, embeddings)
+                        ]
+                    )
+                break
+            except Exception:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                delay = self.backoff_factor * (2 ** (attempt - 1))  # exponential backoff
+                print(f"Warm up batch failed (attempt {attempt}), retrying after {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+        for tool, embedding in zip(batch, embeddings):
+            tool.vector = embedding
+        await checkpoint.write(''.join(_checkpoint_line(tool) for tool in batch))
+        await checkpoint.flush()
+        self.completed += len(batch)
+
+    async def _run_processes(self, pending: list[ToolRecord]):
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager:
+            work_queue = manager.Queue()
+            for start in range(0, len(pending), self.batch_size):
+                work_queue.put([
+                    {
+                        "point_id": tool.point_id,
+                        "agent_name": tool.agent_name,
+                        "name": tool.name,
+                        "prompt": tool.prompt,
+                        "hash": tool.content_hash,
+                        "payload": tool.point_payload,
+                    }
+                    for tool in pending[start:start + self.batch_size]
+                ])
+
+            # Quota API embedding dibagi rata, N worker bersama tetap dalam budget parent
+            limiter = self.loader.embedding_client.rate_limiter
+            rate_limit = limiter.share(self.workers) if limiter is not None else None
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(
+                        pool,
+                        _process_worker,
+                        work_queue,
+                        os.path.join(self.checkpoint_dir, f'checkpoint-{worker_id}.jsonl'),
+                        self.loader.qdrant_helper.collection_config.model_dump(),
+                        self.loader.qdrant_helper.client_kwargs,
+                        self.loader.embedding_client_type,
+                        (self.loader.embedding_client.model_id, self.loader.embedding_client.embedding_dimension),
+                        rate_limit,
+                        self.retries,
+                        self.backoff_factor,
+                    )
+                    for worker_id in range(self.workers)
+                ])
+
+        failed_ids = {point_id for worker_failed in results for point_id in worker_failed}
+        checkpoint = self.load_checkpoint()
+        done = [tool for tool in pending if checkpoint.get(tool.point_id) == tool.content_hash]
+        self.completed += await self._restore_vectors(done)
+        self.failed.extend(tool for tool in pending if tool.point_id in failed_ids or tool.vector is None)
+
+
+def _checkpoint_line(tool) -> str:
+    if isinstance(tool, ToolRecord):
+        tool = {"point_id": tool.point_id, "agent_name": tool.agent_name, "name": tool.name, "hash": tool.content_hash}
+    return json.dumps({key: tool[key] for key in ("point_id", "agent_name", "name", "hash")}) + '\n'
+
+
+def _process_worker(
+    work_queue,
+    checkpoint_path: str,
+    collection_config: dict,
+    qdrant_client_kwargs: dict | None,
+    embedding_client_type,
+    embedding_model: tuple[str, int],
+    rate_limit: dict | None,
+    retries: int,
+    backoff_factor: float
+) -> list[str]:
+    """
+    Worker process entry point: drain batches from the shared queue until it is empty.
+
+    Args:
+        collection_config (dict): The parent's `CollectionConfig`, dumped.
+        qdrant_client_kwargs (dict | None): The parent's QdrantClient arguments, None for the defaults.
+        embedding_client_type (EmbeddingClientType): The parent's embedding provider.
+        embedding_model (tuple[str, int]): `model_id` and dimension of the parent's embedder.
+        rate_limit (dict | None): This worker's share of the parent's embedding rate limiter,
+            see `AdaptiveRateLimiter.share`; None when the embedder has no limiter.
+
+    Returns:
+        list[str]: Point IDs of the tools that failed after all retries.
+
+    Raises:
+        AgentLoaderException: If this process builds a different embedder than the parent.
+    """
+    from llm_orchestrator.core.embeddings.factory import EmbeddingFactory
+    from llm_orchestrator.exceptions.agent_loader_exception import AgentLoaderException
+    from llm_orchestrator.shared.helpers.qdrant_helper import QdrantHelper
+    from llm_orchestrator.types.collection_config import CollectionConfig
+
+    # Proses spawn membaca ulang environment, konfigurasi parent diteruskan eksplisit
+    qdrant_helper = QdrantHelper().configure(CollectionConfig(**collection_config), **(qdrant_client_kwargs or {}))
+    embedding_client = EmbeddingFactory.get(embedding_client_type)
+    built = (embedding_client.model_id, embedding_client.embedding_dimension)
+    if built != tuple(embedding_model):
+        raise AgentLoaderException(
+            f"Warm up worker embeds with {built[0]} ({built[1]}-d), the orchestrator with "
+            f"{embedding_model[0]} ({embedding_model[1]}-d); instances set with set_instance don't "
+            f"reach worker processes, use workers=1"
+        )
+    if rate_limit is not None and embedding_client.rate_limiter is not None:
+        embedding_client.rate_limiter = AdaptiveRateLimiter(**rate_limit)
+    failed = []
+    # Satu event loop per worker, dipakai ulang untuk setiap call embeddings
+    loop = asyncio.new_event_loop()
+
+    def process(batch: list[dict]):
+        attempt = 0
+        while True:
+            try:
+                with llm_priority(Priority.BACKGROUND):
+                    embeddings = loop.run_until_complete(embedding_client.embeddings([tool["prompt"] for tool in batch]))
+                qdrant_helper.upsert_points("llm_orchestrator", [
+                    {"id": tool["point_id"], "vector": embedding, "payload": tool["payload"]}
+                    for tool, embedding in zip(batch, embeddings)
+                ])
+                break
+            except Exception:
+                attempt += 1
+                if attempt > retries:
+                    raise
+                time.sleep(backoff_factor * (2 ** (attempt - 1)))
+        with open(checkpoint_path, 'a') as f:
+            f.write(''.join(_checkpoint_line(tool) for tool in batch))
+
+    while True:
+        try:
+            batch = work_queue.get_nowait()
+        except queue.Empty:
+            loop.close()
+            return failed
+        try:
+            process(batch)
+        except Exception:
+            traceback.print_exc()
+            for tool in batch:
+                try:
+                    process([tool])
+                except Exception:
+                    failed.append(tool["point_id"])
@@ -1,3 +1,221 @@
+import asyncio
+import collections
+import time
+import traceback
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from llm_orchestrator.exceptions.auth_exception import AuthException
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+from llm_orchestrator.types.auth_token import AuthToken
+
+# Provider token: dipanggil dengan (scope, user), scope "SSO" atau nama agent
+TokenProvider = Callable[[str, Optional[str]], Awaitable[AuthToken]]
+
+
 class AuthManager:
-    def __init__(self):
-        pass
\ No newline at end of file
+    """
+    Credentials of tools whose agent has `requiredAuth`, cached per scope and user.
+
+    The scope of an SSO agent is "SSO", so every SSO agent shares the user's token; any
+    other auth type is scoped to its agent. Tokens come from the provider registered for
+    the agent name or, failing that, for its auth type; agents without a provider are
+    called without credentials.
+
+    A cached token is used until `refresh_ahead` seconds (at most half its lifetime) before
+    it expires; a token used within that window is returned and refreshed in the
+    background, so requests only wait for a token the first time or after it expired.
+    Concurrent fetches of the same token share one provider call. At most `max_entries`
+    tokens are kept, least recently used first out.
+    """
+
+    def __init__(self, refresh_ahead: float = 60.0, max_entries: int = 10000):
+        """
+        Args:
+            refresh_ahead (float): Seconds before expiry at which a token is refreshed. Defaults to 60.
+            max_entries (int): Maximum cached tokens. Defaults to 10000.
+        """
+        self.refresh_ahead = refresh_ahead
+        self.max_entries = max_entries
+        self.providers: dict[str, TokenProvider] = {}
+        self.telemetry = Telemetry()
+        self._tokens: collections.OrderedDict[tuple, tuple[AuthToken, float]] = collections.OrderedDict()
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    def register_provider(self, name: str, provider: TokenProvider):
+        """
+        Use `provider` for the agent or auth type `name` ("SSO", "Individual", an agent name).
+
+        Args:
+            name (str): The agent name or auth type.
+            provider (TokenProvider): Async callable `(scope, user) -> AuthToken`.
+        """
+        self.providers[name] = provider
+        # Token lama bisa berasal dari provider sebelumnya
+        self.clear()
+
+    @staticmethod
+    def scope(agent_name: str, auth_type: Optional[str]) -> str:
+        return "SSO" if auth_type == "SSO" else agent_name
+
+    def provider_for(self, agent_name: str, auth_type: Optional[str]) -> Optional[TokenProvider]:
+        return self.providers.get(agent_name) or self.providers.get(auth_type or "")
+
+    async def get_auth(self, agent_name: str, auth_type: Optional[str], user: Optional[str] = None) -> Optional[AuthToken]:
+        """
+        The token for an agent and user.
+
+        Args:
+            agent_name (str): The agent.
+            auth_type (Optional[str]): The agent's auth type.
+            user (Optional[str]): The user the request is made for. Defaults to None.
+
+        Returns:
+            Optional[AuthToken]: The token, None when no provider is registered.
+
+        Raises:
+            AuthException: When there is no valid cached token and fetching one failed.
+        """
+        provider = self.provider_for(agent_name, auth_type)
+        if provider is None:
+            return None
+        key = (self.scope(agent_name, auth_type), user)
+        cached = self._tokens.get(key)
+        now = time.time()
+        if cached is not None:
+            token, refresh_at = cached
+            if token.expires_at is None or now < token.expires_at:
+                self._tokens.move_to_end(key)
+                if now >= refresh_at and key not in self._inflight:
+                    self._start_refresh(key, provider, background=True)
+                self._count("hit")
+                return token
+        task = self._inflight.get(key) or self._start_refresh(key, provider)
+        # shield: satu caller yang dibatalkan tidak membatalkan fetch milik caller lain
+        token = await asyncio.shield(task)
+        if token is None:  # Refresh background yang gagal
+            raise AuthException(f"Failed to get a token for {key[0]}")
+        return token
+
+    async def headers(self, tool: dict, user: Optional[str] = None) -> dict[str, str]:
+        """
+        The auth headers of a tool request.
+
+        Args:
+            tool (dict): The tool definition, with `agent_name`, `requiredAuth` and `authType`.
+            user (Optional[str]): The user the request is made for. Defaults to None.
+
+        Returns:
+            dict[str, str]: The headers, empty when the tool needs no credentials.
+        """
+        if not tool.get("requiredAuth"):
+            return {}
+        token = await self.get_auth(tool["agent_name"], tool.get("authType"), user)
+        return token.headers() if token is not None else {}
+
+    def prefetch(self, tools: list[dict], user: Optional[str] = None):
+        """
+        Start fetching the missing or expired tokens of the given tools in the background,
+        e.g. while the LLM is still selecting one of them.
+
+        Args:
+            tools (list[dict]): Candidate tool definitions.
+            user (Optional[str]): The user the requests will be made for. Defaults to None.
+        """
+        now = time.time()
+        for tool in tools:
+            if not tool.get("requiredAuth"):
+                continue
+            provider = self.provider_for(tool["agent_name"], tool.get("authType"))
+            key = (self.scope(tool["agent_name"], tool.get("authType")), user)
+            if provider is None or key in self._inflight:
+                continue
+            cached = self._tokens.get(key)
+            if cached is None or (cached[0].expires_at is not None and now >= cached[1]):
+                self._start_refresh(key, provider, background=True)
+
+    def invalidate(self, tool: dict, user: Optional[str] = None):
+        """
+        Drop the cached token of a tool, e.g. after the API rejected it with 401.
+        """
+        self._tokens.pop((self.scope(tool["agent_name"], tool.get("authType")), user), None)
+
+    def clear(self):
+        self._tokens.clear()
+
+    def _start_refresh(self, key: tuple, provider: TokenProvider, background: bool = False) -> asyncio.Task:
+        task = asyncio.create_task(self._refresh(key, provider, background))
+        self._inflight[key] = task
+        task.add_done_callback(lambda task: self._finish_refresh(key, task))
+        return task
+
+    def _finish_refresh(self, key: tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Semua caller bisa sudah batal, hindari "exception was never retrieved"
+
+    async def _refresh(self, key: tuple, provider: TokenProvider, background: bool) -> Optional[AuthToken]:
+        scope, user = key
+        try:
+            with self.telemetry.span("auth_token", scope=scope):
+                token = await provider(scope, user)
+        except Exception as e:
+            self._count("error")
+            if background:
+                # Token lama tetap dipakai sampai expired, refresh dicoba lagi saat dipakai
+                traceback.print_exc()
+                return None
+            raise AuthException(f"Failed to get a token for {scope}: {e}") from e
+        now = time.time()
+        refresh_at = float("inf")
+        if token.expires_at is not None:
+            lifetime = max(0.0, token.expires_at - now)
+            refresh_at = token.expires_at - min(self.refresh_ahead, lifetime / 2)
+        self._tokens[key] = (token, refresh_at)
+        self._tokens.move_to_end(key)
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+        self._count("refresh_ahead" if background else "fetch")
+        return token
+
+    def _count(self, outcome: str):
+        self.telemetry.inc("llm_orchestrator_auth_tokens_total", outcome=outcome)
+
+
+class ClientCredentialsProvider:
+    """
+    Token provider for the OAuth 2.0 client credentials grant. The user is ignored: every
+    user of the scope shares the client's token.
+    """
+
+    def __init__(self, token_url: str, client_id: str, client_secret: str, scope: Optional[str] = None, timeout: float = 10.0):
+        """
+        Args:
+            token_url (str): The token endpoint.
+            client_id (str): The client ID.
+            client_secret (str): The client secret.
+            scope (Optional[str]): The requested OAuth scope. Defaults to None.
+            timeout (float): Seconds before the token request fails. Defaults to 10.
+        """
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.timeout = timeout
+
+    async def __call__(self, scope: str, user: Optional[str]) -> AuthToken:
+        data = {"grant_type": "client_credentials"}
+        if self.scope:
+            data["scope"] = self.scope
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(self.token_url, data=data, auth=(self.client_id, self.client_secret))
+            response.raise_for_status()
+        body = response.json()
+        expires_in = body.get("expires_in")
+        return AuthToken(
+            access_token=body["access_token"],
+            expires_at=time.time() + float(expires_in) if expires_in else None,
+            token_type=body.get("token_type", "Bearer").capitalize(),
+        )
@@ -0,0 +1,41 @@
+from llm_orchestrator.core.llms.factory import LLMFactory
+from llm_orchestrator.types.base_embedding import BaseEmbedding
+from llm_orchestrator.types.base_llm import LLMClientType
+
+
+class GeminiEmbedding(BaseEmbedding):
+    """
+    Embeddings from `gemini-embedding-001`, through the shared LLMGemini client so they
+    share its rate limiter.
+    """
+
+    model_id = "gemini-embedding-001"
+
+    @property
+    def llm_client(self):
+        # Diambil dari factory setiap kali, supaya LLMFactory.set_instance tetap berlaku
+        return LLMFactory.get(LLMClientType.GEMINI)
+
+    @property
+    def rate_limiter(self):
+        return getattr(self.llm_client, "rate_limiter", None)
+
+    @rate_limiter.setter
+    def rate_limiter(self, rate_limiter):
+        self.llm_client.rate_limiter = rate_limiter
+
+    @property
+    def embedding_dimension(self) -> int:
+        return self.llm_client.embedding_dimension
+
+    async def embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for a list of text inputs with Gemini.
+
+        Args:
+            texts (list[str]): The texts to embed.
+
+        Returns:
+            list[list[float]]: One embedding per text.
+        """
+        return await self.llm_client.embeddings(texts)
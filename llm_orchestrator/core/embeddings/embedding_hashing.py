@@ -0,0 +1,54 @@
+import hashlib
+import math
+import os
+import re
+
+from llm_orchestrator.types.base_embedding import BaseEmbedding
+
+_WORD = re.compile(r"\w+")
+
+
+class HashingEmbedding(BaseEmbedding):
+    """
+    Deterministic feature-hashing embedder for tests and offline runs.
+
+    Words and their character trigrams are hashed into `embedding_dimension` signed buckets
+    and the vector is L2-normalized. Texts sharing words or word fragments get similar
+    vectors; there is no semantic understanding beyond that. No model, no network, the
+    same text always gives the same vector in every process.
+    """
+
+    def __init__(self, dimension: int | None = None):
+        """
+        Args:
+            dimension (int | None): Vector size. Defaults to EMBEDDING_DIMENSION (1536).
+        """
+        self.embedding_dimension = dimension or int(os.getenv("EMBEDDING_DIMENSION", 1536))
+        self.model_id = "hashing-v1"
+
+    async def embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for a list of text inputs.
+
+        Args:
+            texts (list[str]): The texts to embed.
+
+        Returns:
+            list[list[float]]: One unit-length embedding per text.
+        """
+        return [self.embed(text) for text in texts]
+
+    def embed(self, text: str) -> list[float]:
+        vector = [0.0] * self.embedding_dimension
+        for word in _WORD.findall(text.lower()):
+            self._add(vector, word, 1.0)
+            padded = f"#{word}#"
+            for start in range(len(padded) - 2):
+                self._add(vector, padded[start:start + 3], 0.5)
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _add(self, vector: list[float], feature: str, weight: float):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        # Bit terakhir jadi tanda, supaya collision saling meniadakan, bukan menumpuk
+        vector[(digest >> 1) % self.embedding_dimension] += weight if digest & 1 else -weight
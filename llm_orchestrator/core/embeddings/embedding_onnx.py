@@ -0,0 +1,134 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_orchestrator.exceptions.llm_exception import LLMException
+from llm_orchestrator.types.base_embedding import BaseEmbedding
+from llm_orchestrator.types.collection_config import truncate_vector
+
+
+class OnnxEmbedding(BaseEmbedding):
+    """
+    In-process embeddings from a local ONNX sentence-embedding model on the CPU.
+
+    The model directory (EMBEDDING_MODEL_PATH) holds `model.onnx` and the Hugging Face
+    `tokenizer.json`, e.g. an exported all-MiniLM-L6-v2 or bge-small. Token embeddings are
+    mean-pooled over the attention mask and L2-normalized; models that already output a
+    sentence embedding are used as is. When EMBEDDING_DIMENSION is smaller than the model's
+    output the vectors are truncated, for Matryoshka-trained models.
+
+    Batches of at most `batch_size` texts run concurrently on a thread pool of `workers`
+    threads (onnxruntime releases the GIL), so the event loop isn't blocked. Needs the
+    optional dependencies onnxruntime and tokenizers.
+    """
+
+    def __init__(self, model_path: str | None = None, workers: int | None = None, batch_size: int | None = None, max_length: int = 256):
+        """
+        Args:
+            model_path (str | None): The model directory. Defaults to EMBEDDING_MODEL_PATH.
+            workers (int | None): Inference threads. Defaults to EMBEDDING_WORKERS or 2.
+            batch_size (int | None): Texts per inference call. Defaults to EMBEDDING_BATCH_SIZE or 32.
+            max_length (int): Tokens per text, longer texts are truncated. Defaults to 256.
+        """
+        self.model_path = model_path or os.getenv("EMBEDDING_MODEL_PATH")
+        self.workers = workers or int(os.getenv("EMBEDDING_WORKERS", 2))
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+        self.max_length = max_length
+        self.model_id = f"onnx:{os.path.basename(os.path.normpath(self.model_path or ''))}"
+        self._session = None
+        self._tokenizer = None
+        self._dimension: int | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def embedding_dimension(self) -> int:
+        self._load()
+        return self._dimension
+
+    def _load(self):
+        """
+        Load the model and tokenizer on first use.
+
+        Raises:
+            LLMException: If the optional dependencies or the model files are missing.
+        """
+        if self._session is not None:
+            return
+        with self._lock:
+            if self._session is not None:
+                return
+            try:
+                import onnxruntime
+                from tokenizers import Tokenizer
+            except ImportError as e:
+                raise LLMException(
+                    "EmbeddingClientType.ONNX needs onnxruntime and tokenizers: pip install onnxruntime tokenizers"
+                ) from e
+            if not self.model_path:
+                raise LLMException("Set EMBEDDING_MODEL_PATH to the directory of the ONNX embedding model")
+
+            tokenizer = Tokenizer.from_file(os.path.join(self.model_path, "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.enable_padding()
+            options = onnxruntime.SessionOptions()
+            # Thread CPU dibagi rata ke worker supaya tidak oversubscribe
+            options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            session = onnxruntime.InferenceSession(
+                os.path.join(self.model_path, "model.onnx"),
+                sess_options=options,
+                providers=["CPUExecutionProvider"],
+            )
+            self._input_names = {model_input.name for model_input in session.get_inputs()}
+            self._tokenizer = tokenizer
+            # Ukuran output bisa simbolik di graph, ukur dari satu inference
+            output_size = self._run(session, ["dimension probe"]).shape[-1]
+            configured = os.getenv("EMBEDDING_DIMENSION")
+            self._dimension = min(int(configured), output_size) if configured else output_size
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="onnx-embedding")
+            self._session = session
+
+    async def embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for a list of text inputs with the local model.
+
+        Args:
+            texts (list[str]): The texts to embed.
+
+        Returns:
+            list[list[float]]: One unit-length embedding per text.
+        """
+        self._load()
+        loop = asyncio.get_running_loop()
+        batches = await asyncio.gather(*[
+            loop.run_in_executor(self._pool, self._encode, texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ])
+        return [vector for batch in batches for vector in batch]
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        return [truncate_vector(vector, self._dimension) for vector in self._run(self._session, texts).tolist()]
+
+    def _run(self, session, texts: list[str]):
+        """
+        Tokenize and run the model.
+
+        Returns:
+            np.ndarray: One (not yet normalized) sentence embedding per text.
+        """
+        import numpy as np
+
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+        output = session.run(None, {name: value for name, value in inputs.items() if name in self._input_names})[0]
+
+        if output.ndim == 3:
+            # Mean pooling token embeddings, padding tidak ikut dihitung
+            mask = attention_mask[..., None].astype(output.dtype)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return output
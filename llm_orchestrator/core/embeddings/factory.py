@@ -0,0 +1,54 @@
+import os
+from typing import Type, Union
+from llm_orchestrator.types.base_embedding import BaseEmbedding, EmbeddingClientType
+from llm_orchestrator.core.embeddings.embedding_gemini import GeminiEmbedding
+from llm_orchestrator.core.embeddings.embedding_hashing import HashingEmbedding
+from llm_orchestrator.core.embeddings.embedding_onnx import OnnxEmbedding
+
+
+EMBEDDING_CLIENT_MAP: dict[EmbeddingClientType, Type[Union[GeminiEmbedding, HashingEmbedding, OnnxEmbedding]]] = {
+    EmbeddingClientType.GEMINI: GeminiEmbedding,
+    EmbeddingClientType.ONNX: OnnxEmbedding,
+    EmbeddingClientType.HASHING: HashingEmbedding,
+}
+class EmbeddingFactory:
+    _instances: dict[str, BaseEmbedding] = {}
+
+    @classmethod
+    def get(cls, client_type: EmbeddingClientType | None = None) -> BaseEmbedding:
+        """
+        Get an instance of an embedding client given the client type.
+
+        Args:
+            client_type (EmbeddingClientType | None): The type of embedding client to get.
+                Defaults to EMBEDDING_PROVIDER (GEMINI when unset).
+
+        Returns:
+            BaseEmbedding: An instance of the requested embedding client.
+        """
+        client_type = client_type or cls.default_type()
+        if client_type not in cls._instances:
+            cls._instances[client_type] = EMBEDDING_CLIENT_MAP[client_type]()
+        return cls._instances[client_type]
+
+    @classmethod
+    def default_type(cls) -> EmbeddingClientType:
+        """
+        The provider configured with EMBEDDING_PROVIDER ("GEMINI", "ONNX" or "HASHING").
+
+        Returns:
+            EmbeddingClientType: The configured type, GEMINI when unset.
+        """
+        return EmbeddingClientType(os.getenv("EMBEDDING_PROVIDER", "GEMINI").upper())
+
+    @classmethod
+    def set_instance(cls, client_type: EmbeddingClientType, client: BaseEmbedding):
+        """
+        Use the given client for a client type instead of creating one, e.g. a fake
+        embedder in tests and benchmarks. Must be called before the orchestrator is created.
+
+        Args:
+            client_type (EmbeddingClientType): The client type to override.
+            client (BaseEmbedding): The client instance to return from `get`.
+        """
+        cls._instances[client_type] = client
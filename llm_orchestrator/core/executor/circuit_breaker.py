@@ -0,0 +1,224 @@
+import collections
+import email.utils
+import random
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from llm_orchestrator.exceptions.circuit_open_exception import CircuitOpenException
+
+# 4xx lain tidak akan berhasil walaupun diulang
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Dengan Retry-After, server menolak request sebelum diproses
+REJECTED_STATUSES = frozenset({429, 503})
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one endpoint.
+
+    Closed: requests pass and consecutive failures are counted. After `failure_threshold`
+    failures it opens: requests fail fast for `reset_timeout` seconds. Then it is half-open:
+    a single probe request passes; its success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit. Defaults to 5.
+            reset_timeout (float): Seconds the circuit stays open before a probe. Defaults to 30.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now. In half-open state only the first caller gets
+        through, as the probe.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def cancel_probe(self):
+        """
+        Give the probe slot back when an allowed request isn't sent after all.
+        """
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def retry_in(self) -> float:
+        """
+        Seconds until the next probe may be sent, 0 when the circuit isn't open.
+        """
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class RetryBudget:
+    """
+    Global cap on retries: over the last `window` seconds, retries may be at most `ratio`
+    of the requests, plus `min_per_second` so a quiet system can still retry. When a
+    backend is down the budget runs out and requests fail instead of multiplying the load.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, window: float = 10.0):
+        """
+        Args:
+            ratio (float): Allowed retries per request. Defaults to 0.2.
+            min_per_second (float): Retries always allowed per second. Defaults to 1.
+            window (float): Seconds of history considered. Defaults to 10.
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._requests: collections.deque = collections.deque()
+        self._retries: collections.deque = collections.deque()
+
+    def _trim(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        now = time.monotonic()
+        self._trim(now)
+        self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        """
+        Take one retry from the budget.
+
+        Returns:
+            bool: False if the budget is exhausted.
+        """
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self.min_per_second * self.window + self.ratio * len(self._requests):
+            return False
+        self._retries.append(now)
+        return True
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers per host and per tool endpoint (method and URL without query).
+
+    Connection errors and timeouts count against the host, so every tool of a dead server
+    fails fast; 429 and 5xx responses count against the tool only.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open a circuit. Defaults to 5.
+            reset_timeout (float): Seconds a circuit stays open before a probe. Defaults to 30.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self.breakers[key]
+
+    def for_request(self, method: str, url: str) -> tuple[CircuitBreaker, CircuitBreaker]:
+        """
+        Returns:
+            tuple[CircuitBreaker, CircuitBreaker]: The host and the tool breaker of a request.
+        """
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        return self.get(host), self.get(f"{method.upper()} {host}{parts.path}")
+
+    def check(self, method: str, url: str) -> tuple[CircuitBreaker, CircuitBreaker]:
+        """
+        The breakers of a request, if both allow it.
+
+        Raises:
+            CircuitOpenException: When the host or the tool circuit is open.
+        """
+        host, tool = self.for_request(method, url)
+        for name, breaker in (("host", host), ("tool", tool)):
+            if not breaker.allow():
+                if name == "tool":
+                    host.cancel_probe()  # Probe host tidak jadi dikirim
+                raise CircuitOpenException(
+                    f"Circuit of {name} {method.upper()} {url} is open after {breaker.failures} failures, "
+                    f"retry in {breaker.retry_in():.1f}s"
+                )
+        return host, tool
+
+    def states(self) -> dict[str, str]:
+        return {key: breaker.state for key, breaker in self.breakers.items()}
+
+
+def is_retryable(error: Exception, method: str) -> bool:
+    """
+    Whether a failed tool request may be retried: 408, 429 and 5xx gateway errors, and
+    transport errors. Non-idempotent methods are only retried when the request was never
+    sent (connection failures) or was rejected before being processed (429 or 503 with a
+    Retry-After header), so a POST isn't executed twice.
+    """
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status not in RETRYABLE_STATUSES:
+            return False
+        return idempotent or (status in REJECTED_STATUSES and bool(error.response.headers.get("retry-after")))
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    return isinstance(error, httpx.TransportError) and idempotent
+
+
+def retry_delay(error: Exception, attempt: int, backoff_factor: float, max_delay: float = 30.0) -> float:
+    """
+    Delay before retry number `attempt`: the response's Retry-After if present, otherwise
+    an exponential backoff with full jitter; at most `max_delay` seconds.
+    """
+    response = getattr(error, "response", None) if isinstance(error, httpx.HTTPStatusError) else None
+    if response is not None and response.headers.get("retry-after"):
+        value = response.headers["retry-after"]
+        try:
+            return min(max_delay, max(0.0, float(value)))
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(value)
+                return min(max_delay, max(0.0, retry_at.timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(max_delay, backoff_factor * (2 ** (attempt - 1))))
@@ -0,0 +1,115 @@
+import asyncio
+import contextlib
+import time
+from typing import Optional
+
+from llm_orchestrator.exceptions.deadline_exceeded_exception import DeadlineExceededException
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+
+# Bagian budget per stage, sesuai urutan stage di invoke_query
+DEFAULT_SHARES = {
+    "embed_query": 0.1,
+    "vector_search": 0.05,
+    "select_tool": 0.35,
+    "perform_request": 0.3,
+    "explain_answer": 0.2,
+}
+# Stage yang boleh dilewati kalau budget hampir habis
+OPTIONAL_STAGES = frozenset({"explain_answer"})
+
+
+class Deadline:
+    """
+    Latency budget of one query, split across its stages.
+
+    Each stage gets its share of the remaining budget (`remaining * share / shares of this
+    and all later stages`), so time a fast stage didn't use carries over to the next ones.
+    A slow stage may also use the slack beyond its share, but never the `floor` fraction of
+    the budget reserved for each later required stage. A stage that runs out of time is
+    cancelled and the deadline remembers it in `exceeded_stage`; optional stages are
+    skipped when less than `floor` of their share is left.
+    """
+
+    def __init__(self, budget: float, shares: Optional[dict[str, float]] = None, floor: float = 0.5):
+        """
+        Args:
+            budget (float): Seconds for the whole query.
+            shares (Optional[dict[str, float]]): Relative share per stage, in stage order.
+                Defaults to DEFAULT_SHARES.
+            floor (float): Fraction of its share that is kept for every later required stage,
+                and below which an optional stage is skipped. Defaults to 0.5.
+        """
+        self.budget = budget
+        self.shares = dict(shares or DEFAULT_SHARES)
+        self.floor = floor
+        self.started = time.perf_counter()
+        self.exceeded_stage: Optional[str] = None
+        self.skipped: list[str] = []
+        self._pending = list(self.shares)
+        self.telemetry = Telemetry()
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget - (time.perf_counter() - self.started))
+
+    def allot(self, stage: str) -> float:
+        """
+        Start `stage` and return the time it may take. Stages before it that didn't run
+        give up their share.
+
+        Args:
+            stage (str): The stage name, a key of `shares`.
+
+        Returns:
+            float: Seconds the stage may take.
+        """
+        if stage in self._pending:
+            self._pending = self._pending[self._pending.index(stage) + 1:]
+        remaining = self.remaining()
+        share = self.shares.get(stage, 0.0)
+        later = share + sum(self.shares[name] for name in self._pending)
+        fair = remaining * share / later if later else remaining
+        reserved = self.floor * self.budget * sum(
+            self.shares[name] for name in self._pending if name not in OPTIONAL_STAGES
+        )
+        return max(fair, remaining - reserved)
+
+    def should_skip(self, stage: str) -> bool:
+        """
+        Whether the optional `stage` should be skipped because too little budget is left.
+        The skip is recorded in `skipped` and `llm_orchestrator_deadline_skipped_total`.
+        """
+        if self.remaining() >= self.budget * self.shares.get(stage, 0.0) * self.floor:
+            return False
+        self.skipped.append(stage)
+        self.telemetry.inc("llm_orchestrator_deadline_skipped_total", stage=stage)
+        return True
+
+    def record_exceeded(self, stage: str):
+        if self.exceeded_stage is None:
+            self.exceeded_stage = stage
+        self.telemetry.inc("llm_orchestrator_deadline_exceeded_total", stage=stage)
+
+    @contextlib.asynccontextmanager
+    async def stage(self, stage: str):
+        """
+        Run the body of the block within the share of `stage`.
+
+        Raises:
+            DeadlineExceededException: When the stage ran out of time; the body is cancelled.
+        """
+        allotted = self.allot(stage)
+        try:
+            async with asyncio.timeout(allotted):
+                yield allotted
+        except TimeoutError as e:
+            self.record_exceeded(stage)
+            raise DeadlineExceededException(
+                f"Stage '{stage}' exceeded its {allotted:.3f}s share of the {self.budget}s budget"
+            ) from e
+
+
+def stage(deadline: Optional[Deadline], name: str):
+    """
+    `deadline.stage(name)`, or a no-op context without deadline.
+    """
+    return deadline.stage(name) if deadline is not None else contextlib.nullcontext()
@@ -1,38 +1,249 @@
 import asyncio
 import json
+import time
+import typing
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from urllib.parse import urlsplit
 import httpx
+from llm_orchestrator.core.auth.manager import AuthManager
+from llm_orchestrator.core.executor.circuit_breaker import RETRYABLE_STATUSES, CircuitBreakerRegistry, RetryBudget, is_retryable, retry_delay
+from llm_orchestrator.core.executor.deadline import Deadline, stage
+from llm_orchestrator.core.executor.response_template import ResponseRenderer
 from llm_orchestrator.core.llms.factory import LLMFactory
+from llm_orchestrator.core.embeddings.factory import EmbeddingFactory
 from llm_orchestrator.core.memory.factory import MemoryFactory
+from llm_orchestrator.core.registry.registry import TENANT_FIELD, AgentRegistry
 from llm_orchestrator.decorators.private import PrivateMethod
+from llm_orchestrator.exceptions.circuit_open_exception import CircuitOpenException
+from llm_orchestrator.exceptions.deadline_exceeded_exception import DeadlineExceededException
+from llm_orchestrator.shared.helpers.loop_local import LoopLocal
 from llm_orchestrator.shared.helpers.qdrant_helper import QdrantHelper
+from llm_orchestrator.shared.helpers.single_flight import SingleFlight
+from llm_orchestrator.shared.helpers.telemetry import COUNT_BUCKETS, Telemetry
 from llm_orchestrator.types.base_llm import LLMClientType
-from llm_orchestrator.types.memory import MemoryType
-from llm_orchestrator.types.response_tool import ResponseTool
+from llm_orchestrator.types.cached_prefix import CachedPrefix
+from llm_orchestrator.types.response_tool import ResponseTool, ToolPlan
+
+@dataclass
+class SpeculationMetrics:
+    """
+    Outcomes of speculative tool requests, see `Executor.invoke_query(speculative=True)`.
+
+    Attributes:
+        started (int): Speculative requests started.
+        hits (int): The LLM picked the speculated call, its result was used.
+        wasted (int): The LLM picked another call after the request had completed.
+        cancelled (int): The LLM picked another call and the request was cancelled in flight.
+        saved_seconds (float): Request time that overlapped the tool selection, summed over hits.
+    """
+    started: int = 0
+    hits: int = 0
+    wasted: int = 0
+    cancelled: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        decided = self.hits + self.wasted + self.cancelled
+        return self.hits / decided if decided else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class TimedStream:
+    """
+    The chunks of a streamed answer, recording its time to first chunk and total time.
+    `close` closes the underlying stream even when no chunk was read, so the LLM client
+    releases what it holds for it (a wrapping generator that never started wouldn't).
+    """
+
+    def __init__(self, telemetry: Telemetry, chunks, started: float):
+        self._chunks = chunks
+        self._iterator = None
+        self._total = telemetry.span("explain_answer")
+        self._ttft = telemetry.span("explain_answer_ttft")
+        self._total.start = self._ttft.start = started
+        self._finished = False
+
+    def __iter__(self) -> 'TimedStream':
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._chunks)
+            chunk = next(self._iterator)
+        except StopIteration:
+            self._finish(None)
+            raise
+        except Exception as e:
+            self._finish(e)
+            raise
+        if self._ttft is not None:
+            self._ttft.__exit__(None, None, None)
+            self._ttft = None
+        return chunk
+
+    def close(self):
+        self._finish(None)
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def _finish(self, error: typing.Optional[Exception]):
+        if not self._finished:
+            self._finished = True
+            self._total.__exit__(type(error) if error else None, error, None)
+
 
 class Executor:
     def __init__(self):
-        self.memory_manager = MemoryFactory.get(MemoryType.InMemory)
+        self.memory_manager = MemoryFactory.get()
         self.llm_client = LLMFactory.get(LLMClientType.GEMINI)
+        self.embedding_client = EmbeddingFactory.get()
         self.qdrant_helper = QdrantHelper()
-        self.stream = False
-        self.additional_prompt_to_ai = None
-        
-        
-    async def invoke_query(self, query: str, top_k = 5, stream = False):
-        self.stream = stream
-        query_embedding = self.llm_client.embeddings([query])
-        result = self.qdrant_helper.client.search(
-            collection_name="llm_orchestrator",
-            query_vector=query_embedding[0],
-            limit=top_k
+        self.telemetry = Telemetry()
+        self.registry = AgentRegistry()
+        # Token tools dengan requiredAuth, di-cache dan di-refresh sebelum expired
+        self.auth_manager = AuthManager()
+        # Satu client per event loop: koneksi httpx terikat ke loop tempat dibuka
+        self._http_clients: LoopLocal[httpx.AsyncClient] = LoopLocal(
+            lambda: httpx.AsyncClient(limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)),
+            lambda client: not client.is_closed,
         )
-        tools = [p.payload for p in result if p.score > 0.8]
-        # for tool in tools:
-        #     if tool["requiredAuth"] and tool["authType"] != "SSO":
-        #         auth = self.auth_manager.get_auth(tool["agent_name"])
-        #     else:
-        #         auth = self.auth_manager.get_auth("SSO")
-        #     print(auth)
+        # Maksimum tool yang dipanggil bersamaan untuk satu query di plan mode
+        self.max_parallel_tools = 4
+        self.speculation_metrics = SpeculationMetrics()
+        # Dipakai bersama semua query: tool yang mati gagal cepat, retry tidak melipatgandakan beban
+        self.circuit_breakers = CircuitBreakerRegistry()
+        self.retry_budget = RetryBudget()
+        # Blok schema per kombinasi agent (nama, checksum), prefix yang di-cache oleh LLM
+        self._schema_blocks: dict[tuple, str] = {}
+        # Query dan GET tool yang identik dan bersamaan hanya dikerjakan sekali
+        self.query_flight = SingleFlight("query")
+        self.request_flight = SingleFlight("tool_request")
+        # Jawaban dari response_template tool, tanpa explain_answer ke LLM
+        self.response_renderer = ResponseRenderer()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """
+        The HTTP client used to call tools, shared by all queries on the running event loop so
+        connections are reused. Each loop gets its own client: its connections can't be used
+        from another loop, e.g. after setting up with `asyncio.run(...)`.
+
+        Returns:
+            httpx.AsyncClient: The client of the running loop, created on first access.
+        """
+        return self._http_clients.get()
+
+    async def aclose(self):
+        """
+        Close the HTTP clients. The client of the running loop is closed here, the ones of
+        loops running in other threads are closed on their loop.
+        """
+        running = asyncio.get_running_loop()
+        for loop, client in self._http_clients.pop_all():
+            if loop is running:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    async def invoke_query(self, query: str, top_k = 5, stream = False, plan = False, score_threshold = 0.8, speculative = False, deadline = None, tenant = None, agents = None, user = None, raw = False, language = None):
+        """
+        Answer a user query with the best matching tool(s).
+
+        Args:
+            query (str): The user query.
+            top_k (int): How many candidate tools to retrieve. Defaults to 5.
+            stream (bool): Return the explanation as a stream of chunks. Defaults to False.
+            plan (bool): Let the LLM plan several independent tool calls for compound queries
+                ("weather in Bali and today's news") and run them concurrently, at most
+                `max_parallel_tools` at a time. Defaults to False (exactly one tool).
+            score_threshold (float): Minimum similarity of a candidate tool. Compound queries
+                match each tool less closely, so plan mode may need a lower value. Defaults to 0.8.
+            speculative (bool): When the best matching tool is a GET whose parameters all have
+                defaults, start its request while the LLM is still selecting the tool. The result
+                is used if the LLM picks exactly that call, otherwise it is cancelled or discarded;
+                see `speculation_metrics`. Ignored in plan mode. Defaults to False.
+            deadline (float | Deadline | None): Latency budget in seconds, split across the
+                stages (see `Deadline`). A stage that exceeds its share is cancelled and
+                DeadlineExceededException names it. When too little is left for
+                `explain_answer`, or it times out, the raw tool result is returned instead; in
+                plan mode, calls still running when their share ends are reported as errors.
+                When streaming, only the start of the stream is bounded. Defaults to None (no limit).
+            tenant (str | None): Only search the tools of this tenant's agents and of shared
+                agents (registered without a tenant). Once any agent belongs to a tenant,
+                queries without a tenant only see shared agents. Defaults to None.
+            agents (Iterable[str] | None): Only search the tools of these agents, e.g. the ones
+                the user may use. Defaults to None (all agents visible to the tenant).
+            user (str | None): The user the tool requests are made for; tools of agents with
+                `requiredAuth` get this user's credentials from `auth_manager`. Defaults to None.
+            raw (bool): Never explain the answer with the LLM: tools with a `response_template`
+                are rendered, other results are returned as is. Defaults to False.
+            language (str | None): Language of rendered answers, selects the localized
+                `response_template` (e.g. "id", "en-US"). Defaults to None (the "default" one).
+
+        When every called tool has a `response_template` that renders, the answer is rendered
+        locally by `response_renderer` instead of being explained by the LLM. Rendered and raw
+        answers are streamed as a single chunk. Answers are counted in
+        `llm_orchestrator_answers_total{source}`, source "template", "raw" or "llm".
+
+        Concurrent queries with the same text share the query embedding and, with the same
+        `top_k`, tenant and agents, the vector search (see `query_flight`); identical GET tool
+        calls share one request (see `perform_request`).
+
+        Returns:
+            str | Iterator: The explained answer, or its chunks when streaming.
+
+        Raises:
+            DeadlineExceededException: When a required stage ran out of budget.
+        """
+        if deadline is not None and not isinstance(deadline, Deadline):
+            deadline = Deadline(deadline)
+        if agents is not None:
+            agents = set(agents)
+        with self.telemetry.span("invoke_query"):
+            return await self._invoke_query(query, top_k, stream, plan, score_threshold, speculative, deadline, tenant, agents, user, raw, language)
+
+    async def _invoke_query(self, query: str, top_k, stream, plan=False, score_threshold=0.8, speculative=False, deadline=None, tenant=None, agents=None, user=None, raw=False, language=None):
+        # State per query tetap lokal, instance ini dipakai bersamaan oleh banyak query
+        await self.qdrant_helper.connect()
+        async with stage(deadline, "embed_query"):
+            with self.telemetry.span("embed_query"):
+                query_embedding = await self.query_flight.do(
+                    ("embed", query),
+                    lambda: self.embedding_client.embeddings([query])
+                )
+        # Search Qdrant masih sync, jalankan di thread supaya event loop tidak terblokir
+        async with stage(deadline, "vector_search"):
+            with self.telemetry.span("vector_search"):
+                # Tidak ada agent yang boleh dipakai, tidak perlu search
+                result = [] if agents == set() else await self.query_flight.do(
+                    ("search", query, top_k, tenant, frozenset(agents) if agents is not None else None),
+                    lambda: asyncio.to_thread(
+                        self.qdrant_helper.search,
+                        collection_name="llm_orchestrator",
+                        query_vector=query_embedding[0],
+                        limit=top_k,
+                        query_filter=self.search_filter(tenant, agents)
+                    )
+                )
+        # Qdrant hanya menyimpan field untuk filter, definisi tool diambil dari registry by point ID.
+        # visible_to dicek lagi karena payload di Qdrant bisa tertinggal saat tenant agent diganti
+        tools = [
+            record.definition
+            for p in result
+            if p.score > score_threshold
+            and (record := self.registry.get_by_point_id(p.id)) is not None
+            and record.visible_to(tenant, agents)
+        ]
+        # Token yang belum ada di-fetch sambil LLM memilih tool
+        self.auth_manager.prefetch(tools, user)
         # if (tools is None or len(tools) == 0) and self.context.get("pending_request") == None:
         #     general_result = await self.llm_client.ask(query)
         #     return general_result.text
@@ -54,18 +265,132 @@ class Executor:
         #         explained_required_fields = await self.explain_required_fields(missing, query)
         #         return explained_required_fields.text
                 
-        tool_result = await self.get_tool(tools, query)
+        if plan:
+            tool_result, additional_prompt_to_ai = await self.plan_tools(tools, query, deadline, user)
+            called = [match_tool(SimpleNamespace(**result), tools) for result in tool_result]
+        else:
+            speculation = None
+            if speculative and tools:
+                speculation = self.start_speculation(tools[0], user)
+            tool_result, additional_prompt_to_ai, tool_definition = await self.get_tool(tools, query, speculation, deadline, user)
+            called = [tool_definition]
         # if isinstance(tool_result, dict) and tool_result.get("status") == "need_user_input":
         #     self.context["pending_request"] = tool_result["config"]
         #     self._save_pending_requests()
         #     explained_required_fields = await self.explain_required_fields(tool_result["missing_fields"], query)
         #     return explained_required_fields.text
         
-        explained_answer = await self.explain_answer(tool_result, query)
-        self.additional_prompt_to_ai = None
-        if self.stream:
+        rendered = self.render_answer(tool_result, called, query, language, plan)
+        if rendered is not None:
+            return self._text_answer(rendered, stream, "template")
+        # explain_answer opsional: kalau budget hampir habis, kembalikan hasil tool apa adanya
+        if raw or (deadline is not None and deadline.should_skip("explain_answer")):
+            return self._raw_answer(tool_result, stream)
+        try:
+            async with stage(deadline, "explain_answer"):
+                explained_answer = await self.explain_answer(tool_result, query, stream, additional_prompt_to_ai)
+        except DeadlineExceededException:
+            return self._raw_answer(tool_result, stream)
+        self.telemetry.inc("llm_orchestrator_answers_total", source="llm")
+        if stream:
             return explained_answer
         return explained_answer.text
+
+    @PrivateMethod
+    def search_filter(self, tenant: typing.Optional[str], agents: typing.Optional[set[str]]):
+        """
+        The Qdrant filter restricting a search to the tools a query may use: the tenant's and
+        the shared ones, of the allowed agents. Both fields are indexed (the tenant field as
+        tenant index), so the search only visits matching points instead of post-filtering
+        every tool.
+
+        Args:
+            tenant (Optional[str]): The tenant of the query.
+            agents (Optional[set[str]]): The allowed agent names, None for all.
+
+        Returns:
+            Filter | None: The filter, None when every tool is visible.
+        """
+        from qdrant_client.models import FieldCondition, Filter, IsEmptyCondition, MatchAny, MatchValue, PayloadField
+
+        must = []
+        if agents is not None:
+            must.append(FieldCondition(key="agent_name", match=MatchAny(any=sorted(agents))))
+        # Tanpa agent milik tenant, semua tool shared dan filter tenant tidak perlu
+        if self.registry.has_tenants:
+            visible = [IsEmptyCondition(is_empty=PayloadField(key=TENANT_FIELD))]
+            if tenant is not None:
+                visible.append(FieldCondition(key=TENANT_FIELD, match=MatchValue(value=tenant)))
+            must.append(Filter(should=visible))
+        return Filter(must=must) if must else None
+
+    @PrivateMethod
+    def render_answer(self, tool_result, called: list[typing.Optional[dict]], query: str, language: typing.Optional[str], plan: bool = False) -> typing.Optional[str]:
+        """
+        The answer rendered from the `response_template` of the called tools.
+
+        Args:
+            tool_result: The result of `get_tool` or `plan_tools`.
+            called (list[Optional[dict]]): The definition of each called tool, in the order of
+                the plan results; None for a call that matched no candidate.
+            query (str): The user query.
+            language (Optional[str]): The language of the answer.
+            plan (bool): Whether `tool_result` holds the results of `plan_tools`. Defaults to False.
+
+        Returns:
+            Optional[str]: The answer, None when a tool has no template, a call failed or
+            needs user input, or a template didn't render.
+        """
+        # Di mode single, payload non-dict (mis. list) dikembalikan apa adanya oleh perform_request
+        if plan:
+            results = [result.get("result") for result in tool_result]
+        else:
+            results = [tool_result]
+        if not results or len(results) != len(called):
+            return None
+        rendered = []
+        for tool, result in zip(called, results):
+            record = self.registry.get_tool(tool["agent_name"], tool["name"]) if tool is not None else None
+            # Error atau need_user_input tetap dijelaskan oleh LLM
+            if record is None or record.response_template is None or not isinstance(result, str):
+                return None
+            text = self.response_renderer.render(record.response_template, result, query, language)
+            if text is None:
+                return None
+            rendered.append(text)
+        return "\n\n".join(rendered)
+
+    def _raw_answer(self, tool_result, stream: bool):
+        """
+        The tool result as the answer, when it is requested `raw` or there is no budget left
+        to explain it.
+
+        Args:
+            tool_result: The result of `get_tool` or `plan_tools`.
+            stream (bool): Return it as a stream of a single chunk.
+
+        Returns:
+            str | Iterator: The result as text, or one chunk with a `text` attribute.
+        """
+        text = tool_result if isinstance(tool_result, str) else json.dumps(tool_result, default=str)
+        return self._text_answer(text, stream, "raw")
+
+    def _text_answer(self, text: str, stream: bool, source: str):
+        """
+        An answer that needs no LLM generation, in the shape `explain_answer` returns it.
+
+        Args:
+            text (str): The answer.
+            stream (bool): Return it as a stream of a single chunk.
+            source (str): "template" or "raw", for `llm_orchestrator_answers_total`.
+
+        Returns:
+            str | Iterator: The text, or one chunk with a `text` attribute.
+        """
+        self.telemetry.inc("llm_orchestrator_answers_total", source=source)
+        if stream:
+            return iter([SimpleNamespace(text=text)])
+        return text
     
     @PrivateMethod
     async def explain_required_fields(self, fields: dict, user_query):
@@ -110,26 +435,293 @@ class Executor:
             return {}
 
     @PrivateMethod
-    async def get_tool(self, tools: list[dict], query: str)-> ResponseTool:
+    async def get_tool(self, tools: list[dict], query: str, speculation=None, deadline: Deadline | None = None, user: str | None = None) -> tuple[typing.Any, typing.Optional[str]]:
+        """
+        Let the LLM pick a tool and fill its parameters, then call it.
+
+        Args:
+            tools (list[dict]): The candidate tool definitions.
+            query (str): The user query.
+            speculation (tuple | None): The call and task from `start_speculation`, if any. Its
+                result is used when the LLM picks the same call.
+            deadline (Deadline | None): Bounds the tool selection and the request.
+            user (str | None): The user the request is made for.
+
+        Returns:
+            tuple: The tool result, the tool's `additional_prompt_to_ai`, if any, and the
+            definition of the called tool, None if the call matched no candidate.
+        """
+        schemas, cached_prefix = self.tool_schemas(tools)
         prompt = f""" 
-        The JSON Schema says:
-            Schemas:
-                {"\n".join([json.dumps(tool) for tool in tools])}
+        {schemas}
         Return Only 1 Schema based on user query:
         If user not provide the information fill it with None
         User Query: {query}
         """
-        result = await self.llm_client.ask(prompt, {
-            "response_mime_type": "application/json",
-            "response_schema": ResponseTool,
-        })
-        if result.parsed.additional_prompt_to_ai:
-            self.additional_prompt_to_ai = result.parsed.additional_prompt_to_ai
-        return await self.perform_request(result.parsed)
+        try:
+            async with stage(deadline, "select_tool"):
+                with self.telemetry.span("select_tool"):
+                    result = await self.llm_client.ask(prompt, {
+                        "response_mime_type": "application/json",
+                        "response_schema": ResponseTool,
+                    }, cached_prefix=cached_prefix)
+        except BaseException:
+            if speculation is not None:
+                speculation[1].cancel()
+            raise
+        tool_definition = match_tool(result.parsed, tools)
+        async with stage(deadline, "perform_request"):
+            if speculation is not None:
+                used, tool_result = await self.resolve_speculation(speculation, result.parsed)
+                if used:
+                    return tool_result, result.parsed.additional_prompt_to_ai, tool_definition
+            with self.telemetry.span("perform_request"):
+                tool_result = await self.perform_request(result.parsed, tool_definition=tool_definition, user=user)
+                return tool_result, result.parsed.additional_prompt_to_ai, tool_definition
 
     @PrivateMethod
-    async def perform_request(self, config: ResponseTool, retries=3, backoff_factor=1.0):
-        print(config.dict())
+    def tool_schemas(self, tools: list[dict]) -> tuple[str, typing.Optional[CachedPrefix]]:
+        """
+        The schema part of a tool selection prompt.
+
+        When the LLM client can cache it, the schemas of every tool of the candidates' agents
+        become a cached prefix, identical for every query routed to those agents, and the
+        prompt only names the candidates. Otherwise the candidates' schemas are inlined.
+
+        Args:
+            tools (list[dict]): The candidate tool definitions.
+
+        Returns:
+            tuple: The text for the prompt and the cached prefix, if any.
+        """
+        agent_names = sorted({tool["agent_name"] for tool in tools})
+        if tools:
+            block = self.agent_schema_block(agent_names)
+            if self.llm_client.can_cache(block):
+                names = ", ".join(f"{tool['agent_name']}/{tool['name']}" for tool in tools)
+                return (
+                    f"Only consider these Schemas (agent_name/name), best match first: {names}",
+                    CachedPrefix(text=block, tags=agent_names),
+                )
+        schemas = "\n".join([json.dumps(tool) for tool in tools])
+        return f"""The JSON Schema says:
+            Schemas:
+                {schemas}""", None
+
+    @PrivateMethod
+    def agent_schema_block(self, agent_names: list[str]) -> str:
+        """
+        The schemas of every tool of the given agents, in a stable order so the text (and its
+        context cache) only changes when an agent changes.
+
+        Args:
+            agent_names (list[str]): The sorted agent names.
+
+        Returns:
+            str: The schema block.
+        """
+        key = tuple((name, self.registry.get_checksum(name)) for name in agent_names)
+        if key not in self._schema_blocks:
+            if len(self._schema_blocks) >= 256:
+                self._schema_blocks.clear()
+            schemas = "\n".join(
+                json.dumps(tool.definition, sort_keys=True)
+                for name in agent_names
+                for tool in self.registry.tools(name)
+            )
+            self._schema_blocks[key] = f"The JSON Schema says:\n    Schemas:\n{schemas}"
+        return self._schema_blocks[key]
+
+    @PrivateMethod
+    def start_speculation(self, tool: dict, user: str | None = None) -> typing.Optional[tuple[ResponseTool, asyncio.Task]]:
+        """
+        Start the request of a tool before the LLM selected it, if its call can be predicted:
+        a GET (no side effects) whose required parameters all have defaults.
+
+        Args:
+            tool (dict): The best matching tool definition.
+            user (str | None): The user the request is made for.
+
+        Returns:
+            tuple | None: The predicted call and the task performing it, None if not eligible.
+        """
+        if tool["http"]["method"].upper() != "GET":
+            return None
+        parameters = tool["schema_model"]["parameters"]
+        properties = parameters["properties"]
+        if any(properties.get(name, {}).get("default") is None for name in parameters["required"]):
+            return None
+        call = ResponseTool(
+            url=tool["http"]["url"],
+            method="GET",
+            payload={name: prop["default"] for name, prop in properties.items() if prop.get("default") is not None},
+            additional_prompt_to_ai=tool.get("additional_prompt_to_ai"),
+        )
+
+        async def run():
+            started = time.perf_counter()
+            with self.telemetry.span("perform_request", speculative="true"):
+                result = await self.perform_request(call, tool_definition=tool, user=user)
+            return result, started, time.perf_counter()
+
+        self.speculation_metrics.started += 1
+        return call, asyncio.create_task(run())
+
+    @PrivateMethod
+    async def resolve_speculation(self, speculation: tuple[ResponseTool, asyncio.Task], selected: ResponseTool) -> tuple[bool, typing.Any]:
+        """
+        Use the speculative result if the LLM selected the same call, otherwise drop it.
+
+        Args:
+            speculation (tuple): The call and task from `start_speculation`.
+            selected (ResponseTool): The call the LLM selected.
+
+        Returns:
+            tuple[bool, Any]: Whether the speculative result is used, and the result.
+        """
+        call, task = speculation
+        selected_at = time.perf_counter()
+        if (
+            selected.url == call.url
+            and selected.method.upper() == call.method
+            and selected.payload == call.payload
+        ):
+            result, started, finished = await task
+            self.speculation_metrics.hits += 1
+            self.speculation_metrics.saved_seconds += min(selected_at, finished) - started
+            self.telemetry.inc("llm_orchestrator_speculative_requests_total", outcome="hit")
+            return True, result
+
+        if task.done():
+            self.speculation_metrics.wasted += 1
+            self.telemetry.inc("llm_orchestrator_speculative_requests_total", outcome="wasted")
+            if not task.cancelled():
+                task.exception()  # hindari warning "exception was never retrieved"
+        else:
+            task.cancel()
+            self.speculation_metrics.cancelled += 1
+            self.telemetry.inc("llm_orchestrator_speculative_requests_total", outcome="cancelled")
+        return False, None
+
+    @PrivateMethod
+    async def plan_tools(self, tools: list[dict], query: str, deadline: Deadline | None = None, user: str | None = None) -> tuple[list[dict], typing.Optional[str]]:
+        """
+        Let the LLM plan every independent tool call the query needs, then run them concurrently.
+
+        Args:
+            tools (list[dict]): The candidate tool definitions.
+            query (str): The user query.
+            deadline (Deadline | None): Bounds the tool selection and the requests.
+            user (str | None): The user the requests are made for.
+
+        Returns:
+            tuple: The results (one dict per call with `url`, `method` and `result` or `error`)
+            and the combined `additional_prompt_to_ai` of the called tools, if any.
+        """
+        schemas, cached_prefix = self.tool_schemas(tools)
+        prompt = f""" 
+        {schemas}
+        Return one call for every Schema the user query needs, each with its own payload.
+        Only return calls that don't depend on the result of another call.
+        If user not provide the information fill it with None
+        User Query: {query}
+        """
+        async with stage(deadline, "select_tool"):
+            with self.telemetry.span("select_tool", mode="plan"):
+                result = await self.llm_client.ask(prompt, {
+                    "response_mime_type": "application/json",
+                    "response_schema": ToolPlan,
+                }, cached_prefix=cached_prefix)
+        calls = []
+        for call in result.parsed.calls:
+            if call not in calls:  # LLM kadang mengulang call yang sama
+                calls.append(call)
+        self.telemetry.observe("llm_orchestrator_planned_tools", len(calls), buckets=COUNT_BUCKETS)
+        additional_prompts = [call.additional_prompt_to_ai for call in calls if call.additional_prompt_to_ai]
+        timeout = deadline.allot("perform_request") if deadline is not None else None
+        results = await self.perform_requests(calls, timeout=timeout, tools=tools, user=user)
+        if deadline is not None and any(result.get("error") == "Deadline exceeded" for result in results):
+            deadline.record_exceeded("perform_request")
+        return results, "\n".join(additional_prompts) or None
+
+    @PrivateMethod
+    async def perform_requests(self, calls: list[ResponseTool], max_parallel: int | None = None, timeout: float | None = None, tools: list[dict] | None = None, user: str | None = None) -> list[dict]:
+        """
+        Perform several tool calls concurrently, at most `max_parallel` at a time. A failing
+        call doesn't cancel the others; its error is returned in place of its result.
+
+        Args:
+            calls (list[ResponseTool]): The tool calls.
+            max_parallel (int | None): Concurrency cap. Defaults to `max_parallel_tools`.
+            timeout (float | None): Seconds after which unfinished calls are cancelled and
+                reported with the error "Deadline exceeded". Defaults to None (no limit).
+            tools (list[dict] | None): The candidate tool definitions the calls were selected
+                from, for their auth settings. Defaults to None.
+            user (str | None): The user the requests are made for. Defaults to None.
+
+        Returns:
+            list[dict]: One dict per call, in order, with `url`, `method` and `result` or `error`.
+        """
+        semaphore = asyncio.Semaphore(max_parallel or self.max_parallel_tools)
+
+        async def run(call: ResponseTool):
+            async with semaphore:
+                with self.telemetry.span("perform_request"):
+                    return await self.perform_request(call, tool_definition=match_tool(call, tools or []), user=user)
+
+        tasks = [asyncio.create_task(run(call)) for call in calls]
+        if timeout is not None and tasks:
+            pending = tasks  # asyncio.wait tidak membatalkan task-nya kalau dirinya dibatalkan
+            try:
+                _, pending = await asyncio.wait(tasks, timeout=timeout)
+            finally:
+                for task in pending:
+                    task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = [
+            DeadlineExceededException("Deadline exceeded") if isinstance(result, asyncio.CancelledError) else result
+            for result in results
+        ]
+        return [
+            {"url": call.url, "method": call.method, "error": str(result)}
+            if isinstance(result, Exception)
+            else {"url": call.url, "method": call.method, "result": result}
+            for call, result in zip(calls, results)
+        ]
+
+    @PrivateMethod
+    async def perform_request(self, config: ResponseTool, retries=3, backoff_factor=1.0, tool_definition: dict | None = None, user: str | None = None):
+        """
+        Call a tool endpoint.
+
+        Only failures that may succeed later are retried (408, 429, 5xx and transport errors;
+        for non-idempotent methods only connection failures and 429/503 with Retry-After,
+        so a POST isn't executed twice), after the response's Retry-After or a jittered
+        exponential backoff, and only while the shared `retry_budget` allows. Requests to a host or tool whose circuit is open in
+        `circuit_breakers` fail fast without being sent.
+
+        Tools of agents with `requiredAuth` get the credentials of `user` from `auth_manager`,
+        usually from its cache. When the tool rejects them with 401, the token is dropped and
+        the request is sent once more with a fresh one.
+
+        Concurrent GET calls with the same URL, parameters and credentials share one request
+        through `request_flight`, with the retry settings of the first caller.
+
+        Args:
+            config (ResponseTool): The call selected by the LLM.
+            retries (int): Maximum retries. Defaults to 3.
+            backoff_factor (float): Base delay of the backoff in seconds. Defaults to 1.0.
+            tool_definition (dict | None): The tool definition of the call, for its auth settings.
+            user (str | None): The user the request is made for.
+
+        Returns:
+            str | dict: The response body, or the missing fields when the LLM left some empty.
+
+        Raises:
+            CircuitOpenException: When the circuit of the host or the tool is open.
+            AuthException: When the tool needs a token that couldn't be fetched.
+            httpx.HTTPError: When the request failed and isn't retried (anymore).
+        """
         if not hasattr(config.payload, "items"):
             return config.payload
 
@@ -142,35 +734,99 @@ class Executor:
                 "config": config.dict()
             }
 
+        kwargs = {}
+        if config.payload:
+            if config.method.upper() == "GET":
+                kwargs["params"] = config.payload
+            else:
+                kwargs["json"] = config.payload
+
+        method = config.method.upper()
+        headers = await self.auth_manager.headers(tool_definition, user) if tool_definition is not None else {}
+        if method != "GET":
+            return await self.send_request(config, kwargs, headers, retries, backoff_factor, tool_definition, user)
+        key = (
+            config.url,
+            json.dumps(config.payload, sort_keys=True, default=str),
+            tuple(sorted(headers.items())),
+        )
+        return await self.request_flight.do(
+            key,
+            lambda: self.send_request(config, kwargs, headers, retries, backoff_factor, tool_definition, user)
+        )
+
+    @PrivateMethod
+    async def send_request(self, config: ResponseTool, kwargs: dict, headers: dict, retries: int, backoff_factor: float, tool_definition: dict | None, user: str | None) -> str:
+        """
+        The request loop of `perform_request`: circuit breakers, retries and the 401 re-auth.
+
+        Returns:
+            str: The response body.
+        """
+        method = config.method.upper()
+        reauthenticated = False
+        self.retry_budget.record_request()
         attempt = 0
         while True:
             try:
-                async with httpx.AsyncClient() as client:
-                    kwargs = {}
-                    if config.payload:
-                        if config.method.upper() == "GET":
-                            kwargs["params"] = config.payload
-                        else:
-                            kwargs["json"] = config.payload
-
-                    response = await client.request(
-                        method=config.method,
-                        url=config.url,
-                        **kwargs
-                    )
-                    response.raise_for_status()  # Raise jika status code 4xx/5xx
-                    return response.text
+                host, tool = self.circuit_breakers.check(method, config.url)
+            except CircuitOpenException:
+                self.telemetry.inc("llm_orchestrator_circuit_open_total", method=method)
+                raise
+            try:
+                response = await self.http_client.request(
+                    method=config.method,
+                    url=config.url,
+                    headers=headers or None,
+                    **kwargs
+                )
+                response.raise_for_status()  # Raise jika status code 4xx/5xx
+                host.record_success()
+                tool.record_success()
+                return response.text
 
             except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError):
+                    # Server menjawab: host sehat, hanya 408/429/5xx dihitung gagal untuk tool
+                    host.record_success()
+                    if e.response.status_code in RETRYABLE_STATUSES:
+                        tool.record_failure()
+                    else:
+                        tool.record_success()
+                else:
+                    host.record_failure()
+                    tool.cancel_probe()
+                if (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and e.response.status_code == 401
+                    and headers
+                    and not reauthenticated
+                ):
+                    # Token ditolak (dicabut atau expired lebih cepat), ambil token baru sekali
+                    self.auth_manager.invalidate(tool_definition, user)
+                    headers = await self.auth_manager.headers(tool_definition, user)
+                    reauthenticated = True
+                    continue
+                if not is_retryable(e, method):
+                    raise
                 attempt += 1
                 if attempt > retries:
                     raise  # Sudah melewati retry, lempar error
-                delay = backoff_factor * (2 ** (attempt - 1))  # exponential backoff
+                if not self.retry_budget.try_retry():
+                    self.telemetry.inc("llm_orchestrator_retry_budget_exhausted_total", method=method)
+                    raise
+                delay = retry_delay(e, attempt, backoff_factor)
                 print(f"Request failed (attempt {attempt}), retrying after {delay:.1f}s...")
+                self.telemetry.inc("llm_orchestrator_tool_retries_total", method=method)
                 await asyncio.sleep(delay)
+            except BaseException:
+                # Dibatalkan (mis. speculation): slot probe half-open dikembalikan
+                host.cancel_probe()
+                tool.cancel_probe()
+                raise
         
     @PrivateMethod
-    async def explain_answer(self, answer, previous_query):
+    async def explain_answer(self, answer, previous_query, stream=False, additional_prompt_to_ai=None):
         prompt = f""" 
         You're a explainer
         
@@ -179,7 +835,49 @@ class Executor:
         Answer: {answer}
         
         explain the answer basedon user language
-        {self.additional_prompt_to_ai if self.additional_prompt_to_ai else ""}
+        {additional_prompt_to_ai if additional_prompt_to_ai else ""}
+        """
+        if stream:
+            started = time.perf_counter()
+            return self._timed_stream(await self.llm_client.ask(prompt, stream=True), started)
+        with self.telemetry.span("explain_answer"):
+            result = await self.llm_client.ask(prompt)
+        return result
+
+    def _timed_stream(self, chunks, started: float):
         """
-        result = await self.llm_client.ask(prompt, stream=self.stream)
-        return result
\ No newline at end of file
+        Pass a streamed answer through, recording time to first chunk and total time.
+
+        Args:
+            chunks: The stream returned by the LLM client.
+            started (float): `time.perf_counter()` when the request was made.
+
+        Returns:
+            Iterator: The chunks of the stream, see `TimedStream`.
+        """
+        if not self.telemetry.active:
+            return chunks
+        return TimedStream(self.telemetry, chunks, started)
+
+
+def match_tool(call: ResponseTool, tools: list[dict]) -> typing.Optional[dict]:
+    """
+    The candidate tool a call was selected from: the first one with the same method and
+    URL (without query string).
+
+    Args:
+        call (ResponseTool): The call selected by the LLM.
+        tools (list[dict]): The candidate tool definitions, best match first.
+
+    Returns:
+        Optional[dict]: The tool definition, None if no candidate matches.
+    """
+    def endpoint(url: str) -> tuple:
+        parts = urlsplit(url)
+        return parts.scheme, parts.netloc, parts.path.rstrip("/")
+
+    target = (call.method.upper(), endpoint(call.url))
+    for tool in tools:
+        if (tool["http"]["method"].upper(), endpoint(tool["http"]["url"])) == target:
+            return tool
+    return None
@@ -0,0 +1,115 @@
+import json
+from typing import Optional, Union
+
+# Template yang sudah di-compile, per teks template
+MAX_TEMPLATES = 256
+
+
+class ResponseRenderer:
+    """
+    Renders tool responses with the `response_template` of their tool, so the answer doesn't
+    need an LLM generation.
+
+    A template is a Jinja template, or a dict of templates per language with a "default"
+    one; for "en-US" the "en-US", "en" and "default" templates are tried in that order.
+    Templates see the parsed JSON response as `response` (and its top-level keys directly
+    when it is an object), the response body as `text`, the user query as `query` and the
+    requested `language`.
+
+    Templates run in Jinja's immutable sandbox: agent files come from URLs, and a template
+    can't reach Python internals or modify the response. Undefined variables are errors.
+    `render` returns None when a template can't be rendered (missing field, unexpected
+    response, syntax error, jinja2 not installed), so the caller can fall back to the LLM.
+    """
+
+    def __init__(self):
+        self._environment = None
+        self._templates: dict[str, object] = {}
+        self._unavailable = False
+
+    @staticmethod
+    def select(template: Union[str, dict, None], language: Optional[str] = None) -> Optional[str]:
+        """
+        The template for a language.
+
+        Args:
+            template (str | dict | None): The tool's `response_template`.
+            language (Optional[str]): A language tag such as "id" or "en-US". Defaults to None.
+
+        Returns:
+            Optional[str]: The template text, None when the tool has none.
+        """
+        if not isinstance(template, dict):
+            return template
+        if language:
+            for candidate in (language, language.split("-")[0]):
+                for key, value in template.items():
+                    if key.lower() == candidate.lower():
+                        return value
+        return template.get("default")
+
+    def render(self, template: Union[str, dict, None], response: str, query: str = "", language: Optional[str] = None) -> Optional[str]:
+        """
+        Render a tool response.
+
+        Args:
+            template (str | dict | None): The tool's `response_template`.
+            response (str): The response body.
+            query (str): The user query. Defaults to "".
+            language (Optional[str]): The language of the answer. Defaults to None ("default").
+
+        Returns:
+            Optional[str]: The answer, None when it must be explained by the LLM instead.
+        """
+        source = self.select(template, language)
+        if source is None:
+            return None
+        compiled = self._compile(source)
+        if compiled is None:
+            return None
+        try:
+            parsed = json.loads(response)
+        except ValueError:
+            parsed = response
+        context = {**parsed} if isinstance(parsed, dict) else {}
+        context.update(response=parsed, text=response, query=query, language=language)
+        try:
+            return compiled.render(context).strip()
+        except Exception as e:
+            print(f"Failed to render response template, explaining with the LLM: {e}")
+            return None
+
+    def _compile(self, source: str):
+        compiled = self._templates.get(source)
+        if compiled is not None:
+            return compiled
+        environment = self._get_environment()
+        if environment is None:
+            return None
+        try:
+            compiled = environment.from_string(source)
+        except Exception as e:
+            print(f"Invalid response template, explaining with the LLM: {e}")
+            return None
+        if len(self._templates) >= MAX_TEMPLATES:
+            self._templates.clear()
+        self._templates[source] = compiled
+        return compiled
+
+    def _get_environment(self):
+        if self._environment is None and not self._unavailable:
+            try:
+                from jinja2 import StrictUndefined
+                from jinja2.sandbox import ImmutableSandboxedEnvironment
+            except ImportError:
+                # Cukup sekali diberi tahu, jawaban tetap dijelaskan oleh LLM
+                self._unavailable = True
+                print("Response templates need jinja2: pip install 'llm-orchestrator[templates]'")
+                return None
+            self._environment = ImmutableSandboxedEnvironment(
+                undefined=StrictUndefined,
+                trim_blocks=True,
+                lstrip_blocks=True,
+                autoescape=False,
+            )
+        return self._environment
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from llm_orchestrator.core.llms.rate_limiter import estimate_tokens
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+
+
+@dataclass
+class CacheEntry:
+    name: str
+    tags: frozenset
+    expires_at: float
+
+
+class ContextCacheManager:
+    """
+    Model-side cached content for static prompt prefixes (Gemini explicit context caching).
+
+    A prefix and the system instruction are cached once under a digest of their text, so
+    later calls only send the dynamic rest of the prompt and the cached tokens are billed
+    and processed at the cached rate. Entries are refreshed (TTL extended) when they get
+    used within `refresh_margin` of expiring, and deleted by tag when the agents they were
+    built from change. When caching is disabled, the prefix is too short for the API's
+    minimum, or creating the cache failed (the digest then cools down for
+    `failure_cooldown` seconds), `get` returns None and the caller sends the prefix inline.
+
+    The `caches` callable returns an object with async `create(model, config)`,
+    `update(name, config)` and `delete(name)`, like `client.aio.caches`; tests pass a stub.
+    """
+
+    def __init__(
+        self,
+        caches: Callable[[], Any],
+        model: str,
+        enabled: bool = True,
+        ttl: int = 3600,
+        refresh_margin: int = 300,
+        min_tokens: int = 1024,
+        failure_cooldown: float = 600.0,
+    ):
+        """
+        Args:
+            caches (Callable[[], Any]): Returns the caches API, called on first use.
+            model (str): The model the caches are created for.
+            enabled (bool): Whether to cache at all. Defaults to True.
+            ttl (int): Lifetime of a cache in seconds. Defaults to 3600.
+            refresh_margin (int): Extend the TTL when a cache is used this close to expiring. Defaults to 300.
+            min_tokens (int): Prefixes estimated below this aren't cached (the API rejects them). Defaults to 1024.
+            failure_cooldown (float): Seconds before a prefix whose cache failed is tried again. Defaults to 600.
+        """
+        self.caches = caches
+        self.model = model
+        self.enabled = enabled
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.min_tokens = min_tokens
+        self.failure_cooldown = failure_cooldown
+        self.stats = {"hits": 0, "created": 0, "refreshed": 0, "fallbacks": 0, "invalidated": 0}
+        self.telemetry = Telemetry()
+        self._entries: dict[str, CacheEntry] = {}
+        self._failed: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def from_env(cls, caches: Callable[[], Any], model: str, prefix: str = "GEMINI") -> 'ContextCacheManager':
+        """
+        Build a manager from <prefix>_CONTEXT_CACHE ("1" enables it, off by default),
+        <prefix>_CONTEXT_CACHE_TTL and <prefix>_CONTEXT_CACHE_MIN_TOKENS.
+        """
+        return cls(
+            caches,
+            model,
+            enabled=os.getenv(f"{prefix}_CONTEXT_CACHE", "0") not in ("", "0", "false"),
+            ttl=int(os.getenv(f"{prefix}_CONTEXT_CACHE_TTL", 3600)),
+            min_tokens=int(os.getenv(f"{prefix}_CONTEXT_CACHE_MIN_TOKENS", 1024)),
+        )
+
+    def digest(self, system_instruction: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{system_instruction}\0{text}".encode()).hexdigest()
+
+    def can_cache(self, text: str, system_instruction: str = "") -> bool:
+        """
+        Whether `get` is expected to return a cache for this prefix.
+        """
+        if not self.enabled or estimate_tokens([system_instruction, text]) < self.min_tokens:
+            return False
+        return self._failed.get(self.digest(system_instruction, text), 0.0) <= time.time()
+
+    async def get(self, system_instruction: str, text: str, tags: list[str] | None = None) -> Optional[str]:
+        """
+        The name of a live cache holding `system_instruction` and `text`, created or
+        refreshed if needed.
+
+        Args:
+            system_instruction (str): The system instruction of the calls.
+            text (str): The prefix.
+            tags (list[str] | None): Tags for `invalidate`.
+
+        Returns:
+            Optional[str]: The cache name, None when the prefix must be sent inline.
+        """
+        if not self.can_cache(text, system_instruction):
+            return None
+        digest = self.digest(system_instruction, text)
+        entry = self._entries.get(digest)
+        if entry is not None and entry.expires_at - time.time() > self.refresh_margin:
+            self._count("hits")
+            return entry.name
+
+        # Satu create/update per prefix, call lain yang bersamaan menunggu hasilnya
+        async with self._locks.setdefault(digest, asyncio.Lock()):
+            entry = self._entries.get(digest)
+            now = time.time()
+            if entry is not None and entry.expires_at - now > self.refresh_margin:
+                self._count("hits")
+                return entry.name
+            try:
+                if entry is not None and entry.expires_at > now:
+                    await self.caches().update(name=entry.name, config={"ttl": f"{self.ttl}s"})
+                    entry.expires_at = now + self.ttl
+                    self._count("refreshed")
+                else:
+                    cached = await self.caches().create(model=self.model, config={
+                        "system_instruction": system_instruction,
+                        "contents": [text],
+                        "ttl": f"{self.ttl}s",
+                        "display_name": f"llm_orchestrator:{','.join(sorted(tags or []))}"[:128],
+                    })
+                    entry = CacheEntry(name=cached.name, tags=frozenset(tags or []), expires_at=now + self.ttl)
+                    self._entries[digest] = entry
+                    self._count("created")
+            except Exception as e:
+                print(f"Context cache unavailable, sending the prompt prefix inline: {e}")
+                self._entries.pop(digest, None)
+                self._failed[digest] = now + self.failure_cooldown
+                self._count("fallbacks")
+                return None
+            return entry.name
+
+    def discard(self, name: str):
+        """
+        Forget a cache the API no longer knows (expired or deleted elsewhere).
+        """
+        for digest, entry in list(self._entries.items()):
+            if entry.name == name:
+                del self._entries[digest]
+
+    async def invalidate(self, tag: str | None = None) -> int:
+        """
+        Delete the caches built from `tag`, or all caches.
+
+        Args:
+            tag (str | None): E.g. an agent name. Defaults to None (all).
+
+        Returns:
+            int: The number of caches deleted.
+        """
+        stale = [
+            (digest, entry) for digest, entry in self._entries.items()
+            if tag is None or tag in entry.tags
+        ]
+        for digest, entry in stale:
+            del self._entries[digest]
+            try:
+                await self.caches().delete(name=entry.name)
+            except Exception as e:
+                print(f"Failed to delete context cache {entry.name}: {e}")
+        self.stats["invalidated"] += len(stale)
+        return len(stale)
+
+    def _count(self, outcome: str):
+        self.stats[outcome] += 1
+        self.telemetry.inc("llm_orchestrator_context_cache_total", outcome=outcome)
+
+
+def is_cache_missing(error: Exception) -> bool:
+    """
+    Whether an API error means the cached content of a request is gone (expired or deleted
+    elsewhere): a 400, 403 or 404 whose message says the cache isn't found or expired.
+    Gemini answers an unknown cache with 403 "CachedContent not found (or permission
+    denied)". Any other error is a real failure of the request.
+    """
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    message = str(getattr(error, "message", None) or error).lower()
+    return code in (400, 403, 404) and "cache" in message and ("not found" in message or "expired" in message)
@@ -22,4 +22,16 @@ class LLMFactory:
         """
         if client_type not in cls._instances:
             cls._instances[client_type] = LLM_CLIENT_MAP[client_type]()
-        return cls._instances[client_type]
\ No newline at end of file
+        return cls._instances[client_type]
+
+    @classmethod
+    def set_instance(cls, client_type: LLMClientType, client: BaseLLM):
+        """
+        Use the given client for a client type instead of creating one, e.g. a fake
+        LLM in tests and benchmarks. Must be called before the orchestrator is created.
+
+        Args:
+            client_type (LLMClientType): The client type to override.
+            client (BaseLLM): The client instance to return from `get`.
+        """
+        cls._instances[client_type] = client
\ No newline at end of file
@@ -1,23 +1,78 @@
-from google import genai
-from google.genai import types
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from llm_orchestrator.types.base_llm import BaseLLM
+from llm_orchestrator.core.llms.context_cache import ContextCacheManager, is_cache_missing
+from llm_orchestrator.core.llms.rate_limiter import AdaptiveRateLimiter, estimate_tokens, is_throttled
+from llm_orchestrator.types.cached_prefix import CachedPrefix
+from llm_orchestrator.shared.helpers.loop_local import LoopLocal
+from llm_orchestrator.shared.helpers.single_flight import SingleFlight
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
 from dotenv import load_dotenv
+import asyncio
 import os
+import threading
+import time
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", None)
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", 1536))
 class LLMGemini(BaseLLM):
     def __init__(self):
         """
         Initialize an instance of LLMGemini.
 
-        This constructor sets up a connection to the Google GENAI client using the provided API key
-        and initializes an empty context dictionary for storing context information for future queries.
+        This constructor only initializes an empty context dictionary for storing context
+        information for future queries. The Google GENAI client is created on first use,
+        see `client`. The embedding dimension is read from EMBEDDING_DIMENSION (default 1536).
+        Every call goes through `rate_limiter`, configured with GEMINI_RPM, GEMINI_TPM,
+        GEMINI_MAX_CONCURRENCY and GEMINI_LATENCY_TARGET. Static prompt prefixes are cached
+        model-side by `context_cache` when GEMINI_CONTEXT_CACHE=1. Identical concurrent
+        embedding calls share one request through `embedding_flight`.
+        """
+        self._client: genai.Client | None = None
+        # Client async per event loop, lihat `aio`
+        self._aio_clients = LoopLocal(lambda: self._create_client().aio)
+        self.embedding_dimension = EMBEDDING_DIMENSION
+        self.context = {}
+        self.telemetry = Telemetry()
+        self.rate_limiter = AdaptiveRateLimiter.from_env("GEMINI")
+        self.context_cache = ContextCacheManager.from_env(lambda: self.aio.caches, "gemini-2.5-flash")
+        self.embedding_flight = SingleFlight("gemini_embeddings")
+
+    @property
+    def client(self) -> genai.Client:
+        """
+        The Google GENAI client, created (and google-genai imported) on first access.
+
+        Returns:
+            genai.Client: The shared client for this LLMGemini instance.
+        """
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    @property
+    def aio(self):
         """
-        self.client = genai.Client(
+        The async API of the GENAI client for the running event loop. Its HTTP connections are
+        bound to the loop they were opened on, so each loop gets the `aio` of its own client.
+
+        Returns:
+            genai.client.AsyncClient: The async client of the running loop.
+        """
+        return self._aio_clients.get()
+
+    def _create_client(self) -> genai.Client:
+        from google import genai
+
+        return genai.Client(
             api_key=GEMINI_API_KEY,
         )
-        self.context = {}
-        
+
     def set_context(self, context: dict):
         """
         Set the context to use for future queries.
@@ -32,7 +87,7 @@ class LLMGemini(BaseLLM):
         """
         self.context = context
     
-    async def ask(self, prompt, config = None, stream = False)->types.GenerateContentResponse:
+    async def ask(self, prompt, config = None, stream = False, cached_prefix: CachedPrefix | None = None)->types.GenerateContentResponse:
         """
         Generate content based on the provided prompt and configuration.
 
@@ -46,31 +101,88 @@ class LLMGemini(BaseLLM):
             config: Optional configuration dictionary to customize the content
                     generation process. If not provided, an empty configuration
                     is used.
+            stream: Return an iterator of response chunks. Defaults to False.
+            cached_prefix: Static text sent before the prompt. It is served from a
+                    context cache (together with the system instruction) when
+                    `context_cache` can cache it, otherwise sent inline.
 
         Returns:
             types.GenerateContentResponse: The response from the content generation
             request, which includes the generated content and associated metadata.
         """
+        system_instruction = str(self.context)
+        cache_name = None
+        if cached_prefix is not None:
+            cache_name = await self.context_cache.get(system_instruction, cached_prefix.text, cached_prefix.tags)
+        contents, generate_config = self._request(prompt, config, system_instruction, cached_prefix, cache_name)
+        tokens = estimate_tokens(contents) + (0 if cache_name else estimate_tokens(system_instruction))
         if stream:
-            return self.client.models.generate_content_stream(
-                model="gemini-2.5-flash",
-                contents=prompt,
-                config={
-                    **(config if config else {}),
-                    "system_instruction": str(self.context)
-                }
+            # Slot limiter dilepas saat stream habis dibaca, gagal atau ditutup, lihat GeminiStream
+            await self.rate_limiter.acquire(tokens)
+            try:
+                chunks = self.client.models.generate_content_stream(
+                    model="gemini-2.5-flash",
+                    contents=contents,
+                    config=generate_config
+                )
+            except Exception as e:
+                self.rate_limiter.release(throttled=is_throttled(e))
+                raise
+            return GeminiStream(self, chunks, time.perf_counter())
+        # Client async (aio) supaya request ke Gemini tidak memblokir event loop
+        try:
+            response = await self.rate_limiter.run(
+                lambda: self.aio.models.generate_content(
+                    model="gemini-2.5-flash",
+                    contents=contents,
+                    config=generate_config
+                ),
+                tokens=tokens
             )
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config={
-                **(config if config else {}),
-                "system_instruction": str(self.context)
-            }
-        )
+        except Exception as e:
+            if cache_name is None or not is_cache_missing(e):
+                raise
+            # Cache sudah expired atau dihapus di luar proses ini, ulangi tanpa cache
+            self.context_cache.discard(cache_name)
+            contents, generate_config = self._request(prompt, config, system_instruction, cached_prefix, None)
+            response = await self.rate_limiter.run(
+                lambda: self.aio.models.generate_content(
+                    model="gemini-2.5-flash",
+                    contents=contents,
+                    config=generate_config
+                ),
+                tokens=tokens + estimate_tokens(cached_prefix.text)
+            )
+        self.telemetry.record_usage("gemini-2.5-flash", response.usage_metadata)
         return response
-    
-    def embeddings(self, texts: list[str]):
+
+    def _request(self, prompt, config, system_instruction: str, cached_prefix: CachedPrefix | None, cache_name: str | None):
+        """
+        The contents and config of a generate call, with the prefix either cached or inline.
+
+        Returns:
+            tuple: The contents and the config.
+        """
+        if cache_name is not None:
+            # System instruction sudah ada di cache, tidak boleh dikirim lagi
+            return prompt, {**(config if config else {}), "cached_content": cache_name}
+        if cached_prefix is not None:
+            prompt = f"{cached_prefix.text}\n{prompt}"
+        return prompt, {**(config if config else {}), "system_instruction": system_instruction}
+
+    def can_cache(self, prefix: str) -> bool:
+        """
+        Whether a prefix would be served from the context cache, see `BaseLLM.can_cache`.
+        """
+        return self.context_cache.can_cache(prefix, str(self.context))
+
+    async def invalidate_cache(self, tag: str | None = None):
+        """
+        Delete the context caches built from `tag` (e.g. an agent name), or all of them.
+        """
+        await self.context_cache.invalidate(tag)
+
+    async def embeddings(self, texts: list[str]):
         
         """
         Generate embeddings for a list of text inputs.
@@ -87,20 +199,117 @@ class LLMGemini(BaseLLM):
         Returns:
             list[list[float]]: A list of embeddings, where each embedding
             is a list of floats representing the vector for the corresponding
-            input text.
-        """
-        result = self.client.models.embed_content(
-            model="gemini-embedding-001",
-            contents=texts,
-            config=types.EmbedContentConfig(
-                task_type="SEMANTIC_SIMILARITY",
-                output_dimensionality=1536
-            )
+            input text. Concurrent calls with the same texts share one request
+            and its result, which must not be modified.
+        """
+        return await self.embedding_flight.do(
+            (tuple(texts), self.embedding_dimension),
+            lambda: self._embed(texts)
+        )
+
+    async def _embed(self, texts: list[str]):
+        from google.genai import types
+
+        result = await self.rate_limiter.run(
+            lambda: self.aio.models.embed_content(
+                model="gemini-embedding-001",
+                contents=texts,
+                config=types.EmbedContentConfig(
+                    task_type="SEMANTIC_SIMILARITY",
+                    output_dimensionality=self.embedding_dimension
+                )
+            ),
+            tokens=estimate_tokens(texts)
         )
         
+        self.telemetry.inc("llm_orchestrator_embedded_texts_total", len(texts), model="gemini-embedding-001")
         embeddings = []
         
         for embedding in result.embeddings:
             embeddings.append(embedding.values)
         
-        return embeddings
\ No newline at end of file
+        return embeddings
+
+
+class GeminiStream:
+    """
+    The chunks of a streamed answer, holding a rate limiter slot of `LLMGemini` until the
+    stream is consumed, fails or is closed. Closing releases the slot even when no chunk
+    was read (a generator that never started would skip its `finally`), and a stream that
+    is dropped without closing is released when it is garbage collected. The token usage is
+    recorded once the stream is consumed.
+
+    The chunks are usually read in a worker thread (the Gemini stream blocks); the slot is
+    released on the event loop the stream was requested on.
+    """
+
+    def __init__(self, llm: LLMGemini, chunks, started: float):
+        """
+        Args:
+            llm (LLMGemini): The client whose limiter slot the stream holds.
+            chunks: The stream from `generate_content_stream`.
+            started (float): `time.perf_counter()` when the stream was requested.
+        """
+        self._llm = llm
+        self._chunks = chunks
+        self._iterator = None
+        self._started = started
+        self._loop = asyncio.get_running_loop()
+        self._usage = None
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> 'GeminiStream':
+        return self
+
+    def __next__(self):
+        if self._released:
+            raise StopIteration
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._chunks)
+            chunk = next(self._iterator)
+        except StopIteration:
+            if self._release(latency=time.perf_counter() - self._started):
+                self._llm.telemetry.record_usage("gemini-2.5-flash", self._usage, purpose="stream")
+            raise
+        except BaseException as e:
+            self._release(throttled=isinstance(e, Exception) and is_throttled(e))
+            raise
+        self._usage = chunk.usage_metadata or self._usage
+        return chunk
+
+    def close(self):
+        """
+        Stop reading the stream and release its slot.
+        """
+        self._release()
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def __del__(self):
+        self._release()
+
+    def _release(self, latency: float | None = None, throttled: bool = False) -> bool:
+        """
+        Release the slot once.
+
+        Returns:
+            bool: Whether this call released it.
+        """
+        with self._lock:
+            if self._released:
+                return False
+            self._released = True
+        release = lambda: self._llm.rate_limiter.release(latency=latency, throttled=throttled)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            release()
+        elif not self._loop.is_closed():
+            # Dari thread lain: future waiter hanya boleh di-set dari loop-nya sendiri
+            self._loop.call_soon_threadsafe(release)
+        return True
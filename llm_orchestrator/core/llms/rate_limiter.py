@@ -0,0 +1,309 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import os
+import random
+import time
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Prioritas call LLM untuk task yang sedang berjalan; warm up dan reload set BACKGROUND
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+
+@contextlib.contextmanager
+def llm_priority(priority: Priority):
+    """
+    Run the LLM calls made inside the block (including tasks created in it) with `priority`.
+
+    Args:
+        priority (Priority): BACKGROUND for bulk work such as warm up embedding batches.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` tokens per minute. Reservations may
+    drive the balance negative; the caller then waits until it is paid back.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            per_minute (float): Refill rate per minute.
+            capacity (Optional[float]): Maximum burst. Defaults to one minute of refill.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.balance = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take `amount` tokens.
+
+        Args:
+            amount (float): Tokens to take.
+
+        Returns:
+            float: Seconds to wait before the reservation is covered.
+        """
+        now = time.monotonic()
+        self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+        self.balance -= amount
+        return 0.0 if self.balance >= 0 else -self.balance / self.rate
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared limiter for calls to an LLM API.
+
+    Calls wait for a concurrency slot, interactive calls before background ones, then for the
+    requests-per-minute and tokens-per-minute buckets. The concurrency limit adapts AIMD
+    style: it halves on throttling (429/503) and when latency exceeds `latency_target`, and
+    grows by about one per round trip otherwise. Throttled calls are retried after the
+    server's Retry-After or an exponential backoff, so callers see added latency instead
+    of errors until `max_retries` is exhausted.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        latency_target: Optional[float] = None,
+        max_retries: int = 5,
+        backoff_factor: float = 1.0,
+    ):
+        """
+        Args:
+            requests_per_minute (Optional[float]): Request quota; None for no limit.
+            tokens_per_minute (Optional[float]): Token quota; None for no limit.
+            max_concurrency (int): Upper bound of concurrent calls. Defaults to 16.
+            min_concurrency (int): Lower bound of concurrent calls. Defaults to 1.
+            latency_target (Optional[float]): Seconds; slower calls shrink the concurrency limit.
+            max_retries (int): Retries of a throttled call before its error is raised. Defaults to 5.
+            backoff_factor (float): Base delay of the exponential backoff in seconds. Defaults to 1.0.
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.in_flight = 0
+        self.throttled = 0
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self.telemetry = Telemetry()
+
+    @classmethod
+    def from_env(cls, prefix: str = "GEMINI") -> 'AdaptiveRateLimiter':
+        """
+        Build a limiter from <prefix>_RPM, <prefix>_TPM, <prefix>_MAX_CONCURRENCY and
+        <prefix>_LATENCY_TARGET.
+
+        Args:
+            prefix (str): Environment variable prefix. Defaults to "GEMINI".
+
+        Returns:
+            AdaptiveRateLimiter: The limiter.
+        """
+        def number(name: str) -> Optional[float]:
+            value = os.getenv(f"{prefix}_{name}")
+            return float(value) if value else None
+
+        return cls(
+            requests_per_minute=number("RPM"),
+            tokens_per_minute=number("TPM"),
+            max_concurrency=int(number("MAX_CONCURRENCY") or 16),
+            latency_target=number("LATENCY_TARGET"),
+        )
+
+    def share(self, parts: int) -> dict:
+        """
+        Arguments of a limiter with a `parts`-th of this one's quota and concurrency, for one
+        of `parts` processes that together must stay within this limiter's budget, e.g. the
+        warm up workers. A dict rather than a limiter, so it can be sent to another process.
+
+        Args:
+            parts (int): How many processes share the budget.
+
+        Returns:
+            dict: Keyword arguments of `AdaptiveRateLimiter`.
+        """
+        parts = max(1, parts)
+        return {
+            "requests_per_minute": self.requests.rate * 60 / parts if self.requests else None,
+            "tokens_per_minute": self.tokens.rate * 60 / parts if self.tokens else None,
+            "max_concurrency": max(1, self.max_concurrency // parts),
+            "min_concurrency": 1,
+            "latency_target": self.latency_target,
+            "max_retries": self.max_retries,
+            "backoff_factor": self.backoff_factor,
+        }
+
+    async def acquire(self, tokens: int = 0, priority: Optional[Priority] = None):
+        """
+        Wait for a concurrency slot and quota. Every `acquire` must be followed by `release`.
+
+        Args:
+            tokens (int): Estimated tokens of the call. Defaults to 0.
+            priority (Optional[Priority]): Defaults to the priority of the current context.
+        """
+        priority = current_priority() if priority is None else priority
+        queued = time.perf_counter()
+        if self.in_flight >= int(self.limit) or self._waiters:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            self._wake()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release()  # Slot sudah diberikan sebelum cancel
+                raise
+        else:
+            self.in_flight += 1
+
+        delay = max(
+            self.requests.reserve(1) if self.requests else 0.0,
+            self.tokens.reserve(tokens) if self.tokens and tokens else 0.0,
+        )
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Dibatalkan saat menunggu quota: slot yang sudah didapat dikembalikan
+                self.release()
+                raise
+        self.telemetry.observe("llm_orchestrator_llm_queue_seconds", time.perf_counter() - queued, priority=priority.name.lower())
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False):
+        """
+        Free the slot of a finished call and adapt the concurrency limit.
+
+        Args:
+            latency (Optional[float]): Duration of the call, if it completed.
+            throttled (bool): Whether the API rejected the call with a quota error.
+        """
+        if throttled:
+            self.limit = max(self.min_concurrency, self.limit / 2)
+        elif latency is not None:
+            if self.latency_target and latency > self.latency_target:
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Run an API call under the limiter, retrying it while it is throttled.
+
+        Args:
+            call (Callable[[], Awaitable[T]]): Starts the call, invoked once per attempt.
+            tokens (int): Estimated tokens of the call. Defaults to 0.
+
+        Returns:
+            T: The result of the call.
+
+        Raises:
+            Exception: The call's error if it isn't a quota error, or once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(tokens)
+            started = time.perf_counter()
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_throttled(e):
+                    self.release()
+                    raise
+                self.release(throttled=True)
+                self.throttled += 1
+                self.telemetry.inc("llm_orchestrator_llm_throttled_total")
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = retry_after(e) or self.backoff_factor * (2 ** (attempt - 1)) * (0.5 + random.random())
+                print(f"LLM call throttled (attempt {attempt}), retrying after {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Dibatalkan (mis. timeout deadline): slot tetap dikembalikan
+                self.release()
+                raise
+            self.release(latency=time.perf_counter() - started)
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "throttled": self.throttled,
+        }
+
+
+def is_throttled(error: Exception) -> bool:
+    """
+    Whether an API error means "slow down": HTTP 429 or 503.
+    """
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code is None and getattr(error, "response", None) is not None:
+        code = getattr(error.response, "status_code", None)
+    return code in (429, 503)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    The Retry-After header of an API error in seconds, if present.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(content) -> int:
+    """
+    Rough token count of a prompt (about four characters per token).
+    """
+    if isinstance(content, (list, tuple)):
+        return sum(estimate_tokens(item) for item in content)
+    return len(str(content)) // 4 + 1
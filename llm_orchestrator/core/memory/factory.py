@@ -1,25 +1,41 @@
+import os
 from typing import Type, Union
 from llm_orchestrator.types.memory import AbstractMemoryManager, MemoryType
 from llm_orchestrator.core.memory.in_memory import InMemoryManager
+from llm_orchestrator.core.memory.redis_memory import RedisMemoryManager
 
-MEMORY_MANAGER_MAP: dict[MemoryType, Type[Union[InMemoryManager]]] = {
+MEMORY_MANAGER_MAP: dict[MemoryType, Type[Union[InMemoryManager, RedisMemoryManager]]] = {
     MemoryType.InMemory: InMemoryManager,
+    MemoryType.Redis: RedisMemoryManager,
 }
 class MemoryFactory:
     _instances: dict[str, AbstractMemoryManager] = {}
     
     @classmethod
-    def get(cls, memory_type: MemoryType):
+    def get(cls, memory_type: MemoryType | None = None):
         """
         Get an instance of a memory manager given the memory type.
 
         Args:
-            memory_type (MemoryType): The type of memory manager to get.
+            memory_type (MemoryType | None): The type of memory manager to get.
+                Defaults to MEMORY_BACKEND (InMemory when unset).
 
         Returns:
             AbstractMemoryManager: An instance of the requested memory manager.
         """
 
+        memory_type = memory_type or cls.default_type()
         if memory_type not in cls._instances:
             cls._instances[memory_type] = MEMORY_MANAGER_MAP[memory_type]()
-        return cls._instances[memory_type]
\ No newline at end of file
+        return cls._instances[memory_type]
+
+    @classmethod
+    def default_type(cls) -> MemoryType:
+        """
+        The memory manager configured with MEMORY_BACKEND ("InMemory" or "Redis"). Use Redis
+        when several processes, e.g. server workers, must share registered agents.
+
+        Returns:
+            MemoryType: The configured type, InMemory when unset.
+        """
+        return MemoryType(os.getenv("MEMORY_BACKEND", MemoryType.InMemory.value))
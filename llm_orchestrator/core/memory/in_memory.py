@@ -46,6 +46,25 @@ class InMemoryManager(AbstractMemoryManager):
             else:
                 self.memory[key] = value
 
+    async def set_if_absent(self, key: str, value: Any, ttl: int | None = None) -> bool:
+        """
+        Stores a value only if the key has no value yet. The memory lives as long as the
+        process, so `ttl` is ignored.
+
+        Args:
+            key (str): The key to store the value with.
+            value (Any): The value to store.
+            ttl (int | None): Ignored.
+
+        Returns:
+            bool: True if the value was stored.
+        """
+        async with self._lock:
+            if self.memory.get(key) is not None:
+                return False
+            self.memory[key] = value
+            return True
+
     async def clear_memory(self, key: str) -> bool:
         """
         Clears the value associated with the given key from memory.
@@ -59,3 +78,47 @@ class InMemoryManager(AbstractMemoryManager):
         async with self._lock:
             self.memory.pop(key, None)
         return True
+
+    async def clear_if_equal(self, key: str, value: Any) -> bool:
+        """
+        Clears the value of a key only if it still equals `value`.
+
+        Args:
+            key (str): The key to clear.
+            value (Any): The expected value.
+
+        Returns:
+            bool: True if the value was cleared.
+        """
+        async with self._lock:
+            if key not in self.memory or self.memory[key] != value:
+                return False
+            del self.memory[key]
+            return True
+
+    async def set_field(self, key: str, field: str, value: Any) -> None:
+        """
+        Stores one field of a mapping without rewriting the other fields.
+
+        Args:
+            key (str): The key of the mapping.
+            field (str): The field to store.
+            value (Any): The value of the field.
+        """
+        async with self._lock:
+            if not isinstance(self.memory.get(key), dict):
+                self.memory[key] = {}
+            self.memory[key][field] = value
+
+    async def get_fields(self, key: str) -> dict:
+        """
+        Retrieves every field of a mapping stored with `set_field`.
+
+        Args:
+            key (str): The key of the mapping.
+
+        Returns:
+            dict: A copy of the fields, empty if the key has no value.
+        """
+        async with self._lock:
+            return dict(self.memory.get(key) or {})
@@ -0,0 +1,162 @@
+import os
+import pickle
+from typing import Any
+
+from llm_orchestrator.exceptions.memory_manager_exception import MemoryManagerException
+from llm_orchestrator.types.memory import AbstractMemoryManager
+
+# Hapus key hanya kalau nilainya masih sama, dalam satu operasi atomik di Redis
+CLEAR_IF_EQUAL_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+class RedisMemoryManager(AbstractMemoryManager):
+    def __init__(self, url: str | None = None, prefix: str | None = None):
+        """
+        Initialize a memory manager backed by Redis, shared by every process that uses the
+        same Redis, e.g. the workers of the server.
+
+        Values are pickled, so only point it at a trusted Redis. Appended values are kept in
+        a Redis list, fields set with `set_field` in a Redis hash. The client is created on first use and needs the optional dependency
+        redis.
+
+        Args:
+            url (str | None): The Redis URL. Defaults to REDIS_URL or redis://localhost:6379/0.
+            prefix (str | None): Prefix of every key. Defaults to REDIS_PREFIX or "llm_orchestrator:".
+        """
+        self.url = url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.prefix = prefix if prefix is not None else os.getenv("REDIS_PREFIX", "llm_orchestrator:")
+        self._client = None
+
+    @property
+    def client(self):
+        """
+        The Redis client, created on first access.
+
+        Raises:
+            MemoryManagerException: If the redis package is not installed.
+        """
+        if self._client is None:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as e:
+                raise MemoryManagerException("MemoryType.Redis needs redis: pip install redis") from e
+            self._client = Redis.from_url(self.url)
+        return self._client
+
+    async def get_memory(self, key: str) -> Any | None:
+        """
+        Retrieves the value associated with the given key from Redis.
+
+        Args:
+            key (str): The key to retrieve the value for.
+
+        Returns:
+            Any | None: The value (a list for appended values) if it exists, otherwise None.
+        """
+        name = self.prefix + key
+        kind = await self.client.type(name)
+        if kind == b"list":
+            return [pickle.loads(item) for item in await self.client.lrange(name, 0, -1)]
+        if kind == b"string":
+            value = await self.client.get(name)
+            return pickle.loads(value) if value is not None else None
+        return None
+
+    async def set_memory(self, key: str, value: Any, append: bool = False) -> None:
+        """
+        Stores a value in Redis with the given key.
+
+        Args:
+            key (str): The key to store the value with.
+            value (Any): The value to store.
+            append (bool, optional): Whether to append the value to an existing list for the given key. Defaults to False.
+
+        Returns:
+            None
+        """
+        name = self.prefix + key
+        if append:
+            # Nilai lama yang bukan list diganti, sama seperti InMemoryManager
+            if await self.client.type(name) not in (b"list", b"none"):
+                await self.client.delete(name)
+            await self.client.rpush(name, pickle.dumps(value))
+        else:
+            await self.client.set(name, pickle.dumps(value))
+
+    async def set_if_absent(self, key: str, value: Any, ttl: int | None = None) -> bool:
+        """
+        Atomically stores a value only if the key has no value yet (SET NX).
+
+        Args:
+            key (str): The key to store the value with.
+            value (Any): The value to store.
+            ttl (int | None): Seconds after which the value expires. Defaults to None.
+
+        Returns:
+            bool: True if the value was stored.
+        """
+        return bool(await self.client.set(self.prefix + key, pickle.dumps(value), nx=True, ex=ttl))
+
+    async def clear_memory(self, key: str) -> bool:
+        """
+        Clears the value associated with the given key from Redis.
+
+        Args:
+            key (str): The key to clear the value for.
+
+        Returns:
+            bool: Whether the key was successfully cleared.
+        """
+        await self.client.delete(self.prefix + key)
+        return True
+
+    async def clear_if_equal(self, key: str, value: Any) -> bool:
+        """
+        Atomically clears the value of a key only if it still equals `value`, compared as
+        pickled bytes (a Lua script, so no other client can take the key in between).
+
+        Args:
+            key (str): The key to clear.
+            value (Any): The expected value.
+
+        Returns:
+            bool: True if the value was cleared.
+        """
+        return bool(await self.client.eval(CLEAR_IF_EQUAL_SCRIPT, 1, self.prefix + key, pickle.dumps(value)))
+
+    async def set_field(self, key: str, field: str, value: Any) -> None:
+        """
+        Stores one field of a mapping in a Redis hash (HSET), without rewriting the other
+        fields. A mapping stored as a single value by older versions is converted first.
+
+        Args:
+            key (str): The key of the mapping.
+            field (str): The field to store.
+            value (Any): The value of the field.
+        """
+        name = self.prefix + key
+        if await self.client.type(name) == b"string":
+            legacy = await self.get_memory(key)
+            await self.client.delete(name)
+            if isinstance(legacy, dict) and legacy:
+                await self.client.hset(name, mapping={k: pickle.dumps(v) for k, v in legacy.items()})
+        await self.client.hset(name, field, pickle.dumps(value))
+
+    async def get_fields(self, key: str) -> dict:
+        """
+        Retrieves every field of a mapping stored with `set_field` (HGETALL).
+
+        Args:
+            key (str): The key of the mapping.
+
+        Returns:
+            dict: Field to value, empty if the key has no value.
+        """
+        name = self.prefix + key
+        if await self.client.type(name) == b"string":
+            return dict(await self.get_memory(key) or {})
+        return {field.decode(): pickle.loads(value) for field, value in (await self.client.hgetall(name)).items()}
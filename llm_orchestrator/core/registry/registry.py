@@ -0,0 +1,358 @@
+import hashlib
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+from llm_orchestrator.schemas.agent import AgentSchema
+
+# Payload field of the owning tenant, indexed as Qdrant tenant key
+TENANT_FIELD = "tenant"
+
+# Namespace for deterministic point IDs, so an (agent, tool) pair always maps to the same Qdrant point
+TOOL_POINT_NAMESPACE = uuid.UUID("6f1d7c3e-2b7a-4a8e-9c55-6c1f0b8f4a21")
+
+
+def build_tool_prompt(agent_data: dict, tool: dict) -> str:
+    """
+    Build the text that is embedded for a tool.
+
+    Args:
+        agent_data (dict): The validated agent, as returned by `AgentSchema.model_dump()`.
+        tool (dict): One of the agent's tools.
+
+    Returns:
+        str: The prompt fragment describing the tool.
+    """
+    return (
+        f"Agent Name: {agent_data['agent_name']}, "
+        f"Tool Name: {tool['name']}, "
+        f"Tool Description: {tool['description']}, "
+        f"Tool Intents: {', '.join(tool['intent_examples'])}"
+    )
+
+
+def tool_point_id(agent_name: str, tool_name: str) -> str:
+    """
+    Deterministic Qdrant point ID for a tool.
+
+    Args:
+        agent_name (str): The agent name.
+        tool_name (str): The tool name.
+
+    Returns:
+        str: A UUID string.
+    """
+    return str(uuid.uuid5(TOOL_POINT_NAMESPACE, f"{agent_name}/{tool_name}"))
+
+
+def is_tool_point_id(point_id) -> bool:
+    """
+    Whether a Qdrant point ID was made by `tool_point_id`. Collections written before tools
+    got deterministic IDs hold points with random (uuid4) IDs that no tool maps to anymore.
+
+    Args:
+        point_id: The point ID, a UUID string or an integer.
+
+    Returns:
+        bool: True for a version 5 UUID.
+    """
+    try:
+        return uuid.UUID(str(point_id)).version == 5
+    except ValueError:
+        return False
+
+
+@dataclass(slots=True)
+class ToolRecord:
+    """
+    A tool of a registered agent, built once from its `AgentSchema`.
+
+    Attributes:
+        agent_name (str): The owning agent.
+        name (str): The tool name.
+        point_id (str): The tool's Qdrant point ID, see `tool_point_id`.
+        prompt (str): The text that is embedded, see `build_tool_prompt`.
+        content_hash (str): Hash of the embedded prompt; a changed hash means the tool has to
+            be re-embedded. Payload changes (tenant, auth settings) keep the vector.
+        definition (dict): The tool fields plus agent name and auth settings, as shown to the
+            LLM when selecting a tool.
+        required_auth (bool): Whether the agent requires auth.
+        auth_type (Optional[str]): The agent's auth type.
+        tenant (Optional[str]): The tenant that owns the agent, None for a shared agent.
+        vector (Optional[Sequence[float]]): The embedding, once vectorized.
+        response_template (str | dict | None): Renders the tool's responses without the LLM,
+            see `ResponseRenderer`. Not part of `definition`, the LLM doesn't need it.
+    """
+    agent_name: str
+    name: str
+    point_id: str
+    prompt: str
+    content_hash: str
+    definition: dict
+    required_auth: bool
+    auth_type: Optional[str]
+    tenant: Optional[str] = None
+    vector: Optional[Sequence[float]] = None
+    response_template: Optional[Union[str, dict]] = None
+
+    @classmethod
+    def build(cls, agent_data: dict, tool: dict, tenant: Optional[str] = None) -> 'ToolRecord':
+        """
+        Build a record for one tool of a validated agent.
+
+        Args:
+            agent_data (dict): The validated agent, as returned by `AgentSchema.model_dump()`.
+            tool (dict): One of the agent's tools.
+            tenant (Optional[str]): The tenant that owns the agent. Defaults to None (shared).
+
+        Returns:
+            ToolRecord: The new record, without a vector.
+        """
+        required_auth = agent_data.get("requiredAuth", False)
+        auth_type = agent_data.get("authType", "Individual")
+        prompt = build_tool_prompt(agent_data, tool)
+        record = cls(
+            agent_name=agent_data["agent_name"],
+            name=tool["name"],
+            point_id=tool_point_id(agent_data["agent_name"], tool["name"]),
+            prompt=prompt,
+            content_hash="",
+            definition={
+                **{key: value for key, value in tool.items() if key != "response_template"},
+                "agent_name": agent_data["agent_name"],
+                "requiredAuth": required_auth,
+                "authType": auth_type
+            },
+            required_auth=required_auth,
+            auth_type=auth_type,
+            tenant=tenant,
+            response_template=tool.get("response_template"),
+        )
+        record.content_hash = hashlib.md5(prompt.encode()).hexdigest()
+        return record
+
+    @property
+    def point_payload(self) -> dict:
+        """
+        The payload stored in Qdrant. It only carries the filterable fields; the full tool
+        definition is resolved from the registry by point ID.
+
+        Returns:
+            dict: The agent name, tool name and auth settings, and the tenant of tenant-owned tools.
+        """
+        payload = {
+            "agent_name": self.agent_name,
+            "name": self.name,
+            "requiredAuth": self.required_auth,
+            "authType": self.auth_type,
+        }
+        # Tool shared tidak punya field tenant, filter IsEmpty di search bergantung pada ini
+        if self.tenant is not None:
+            payload[TENANT_FIELD] = self.tenant
+        return payload
+
+    def visible_to(self, tenant: Optional[str], agents: Optional[set[str]] = None) -> bool:
+        """
+        Whether a query of `tenant`, limited to `agents`, may use this tool: shared tools
+        and the tenant's own tools, of an allowed agent.
+
+        Args:
+            tenant (Optional[str]): The tenant of the query, None for shared tools only.
+            agents (Optional[set[str]]): The allowed agent names, None for all.
+
+        Returns:
+            bool: True if the tool is visible.
+        """
+        return self.tenant in (None, tenant) and (agents is None or self.agent_name in agents)
+
+
+@dataclass(slots=True)
+class AgentDiff:
+    """
+    Tool-level difference between a registered agent and a new version of it.
+
+    Attributes:
+        records (list[ToolRecord]): All tool records of the new version.
+        added (list[ToolRecord]): Tools that didn't exist before.
+        changed (list[ToolRecord]): Tools whose content hash changed.
+        removed (list[ToolRecord]): Previous tools missing from the new version.
+        relabeled (list[ToolRecord]): Unchanged tools whose Qdrant payload changed, e.g. a new
+            tenant; they keep their vector, only the payload of their point is overwritten.
+    """
+    records: list[ToolRecord]
+    added: list[ToolRecord]
+    changed: list[ToolRecord]
+    removed: list[ToolRecord]
+    relabeled: list[ToolRecord]
+
+    @property
+    def pending(self) -> list[ToolRecord]:
+        """Tools that still need to be embedded."""
+        return [record for record in self.records if record.vector is None]
+
+
+class AgentRegistry:
+    """
+    Registry of validated agents and their tools.
+
+    Agents are keyed by `agent_name` and tools by `(agent_name, tool_name)` and by Qdrant
+    point ID, all with O(1) lookup. Registering an agent again replaces its entries
+    instead of appending duplicates. Agent names are unique across tenants; the tenant of
+    an agent is set with `set_tenant` and applied when its records are built.
+    """
+
+    def __init__(self):
+        self._agents: dict[str, AgentSchema] = {}
+        self._checksums: dict[str, Optional[str]] = {}
+        self._tenants: dict[str, str] = {}
+        self._tools: dict[tuple[str, str], ToolRecord] = {}
+        self._by_point_id: dict[str, ToolRecord] = {}
+
+    def diff(self, agent: AgentSchema) -> AgentDiff:
+        """
+        Build the tool records of an agent and compare them with the registered version,
+        without changing the registry.
+
+        Vectors of tools whose content hash didn't change are carried over, so only new or
+        changed tools need to be re-embedded; the ones whose payload changed are `relabeled`.
+
+        Args:
+            agent (AgentSchema): The validated agent.
+
+        Returns:
+            AgentDiff: The new records and the added, changed and removed tools.
+        """
+        agent_data = agent.model_dump()
+        tenant = self._tenants.get(agent.agent_name)
+        records = [ToolRecord.build(agent_data, tool, tenant) for tool in agent_data["tools"]]
+        previous = {record.name: record for record in self.tools(agent.agent_name)}
+        added, changed, relabeled = [], [], []
+        for record in records:
+            old = previous.pop(record.name, None)
+            if old is None:
+                added.append(record)
+            elif old.content_hash != record.content_hash:
+                changed.append(record)
+            else:
+                record.vector = old.vector
+                if old.point_payload != record.point_payload:
+                    relabeled.append(record)
+        return AgentDiff(
+            records=records,
+            added=added,
+            changed=changed,
+            removed=list(previous.values()),
+            relabeled=relabeled
+        )
+
+    def set_agent(
+        self,
+        agent: AgentSchema,
+        checksum: Optional[str] = None,
+        diff: Optional[AgentDiff] = None
+    ) -> AgentDiff:
+        """
+        Register an agent, replacing any previous version of it.
+
+        Args:
+            agent (AgentSchema): The validated agent.
+            checksum (Optional[str]): Checksum of the agent file it was loaded from.
+            diff (Optional[AgentDiff]): The result of an earlier `diff` of this agent, e.g. with its
+                pending tools already embedded. Computed when omitted.
+
+        Returns:
+            AgentDiff: The difference with the previously registered version.
+        """
+        if diff is None:
+            diff = self.diff(agent)
+
+        self.remove_agent(agent.agent_name)
+        self._agents[agent.agent_name] = agent
+        self._checksums[agent.agent_name] = checksum
+        for record in diff.records:
+            self._tools[(record.agent_name, record.name)] = record
+            self._by_point_id[record.point_id] = record
+        return diff
+
+    def remove_agent(self, agent_name: str) -> list[ToolRecord]:
+        """
+        Unregister an agent and its tools.
+
+        Args:
+            agent_name (str): The agent to remove.
+
+        Returns:
+            list[ToolRecord]: The removed tool records.
+        """
+        agent = self._agents.pop(agent_name, None)
+        self._checksums.pop(agent_name, None)
+        if agent is None:
+            return []
+        removed = []
+        for tool in agent.tools:
+            record = self._tools.pop((agent_name, tool.name), None)
+            if record is not None:
+                self._by_point_id.pop(record.point_id, None)
+                removed.append(record)
+        return removed
+
+    def set_tenant(self, agent_name: str, tenant: Optional[str]):
+        """
+        Assign an agent to a tenant, or share it with every tenant. Takes effect for the
+        agent's records the next time it is set; its tools are then `relabeled`, their points
+        get the new payload without being re-embedded.
+
+        Args:
+            agent_name (str): The agent.
+            tenant (Optional[str]): The owning tenant, None for a shared agent.
+        """
+        if tenant is None:
+            self._tenants.pop(agent_name, None)
+        else:
+            self._tenants[agent_name] = tenant
+
+    def get_tenant(self, agent_name: str) -> Optional[str]:
+        return self._tenants.get(agent_name)
+
+    @property
+    def has_tenants(self) -> bool:
+        """Whether any agent is owned by a tenant, i.e. searches need a tenant filter."""
+        return bool(self._tenants)
+
+    def get_agent(self, agent_name: str) -> Optional[AgentSchema]:
+        return self._agents.get(agent_name)
+
+    def get_checksum(self, agent_name: str) -> Optional[str]:
+        return self._checksums.get(agent_name)
+
+    def get_tool(self, agent_name: str, tool_name: str) -> Optional[ToolRecord]:
+        return self._tools.get((agent_name, tool_name))
+
+    def get_by_point_id(self, point_id) -> Optional[ToolRecord]:
+        return self._by_point_id.get(str(point_id))
+
+    def agents(self) -> list[AgentSchema]:
+        return list(self._agents.values())
+
+    def tools(self, agent_name: Optional[str] = None) -> list[ToolRecord]:
+        """
+        List tool records, optionally only those of one agent.
+
+        Args:
+            agent_name (Optional[str]): Only return this agent's tools.
+
+        Returns:
+            list[ToolRecord]: The matching tool records.
+        """
+        if agent_name is None:
+            return list(self._tools.values())
+        agent = self._agents.get(agent_name)
+        if agent is None:
+            return []
+        return [self._tools[(agent_name, tool.name)] for tool in agent.tools]
+
+    def __contains__(self, agent_name: str) -> bool:
+        return agent_name in self._agents
+
+    def __len__(self) -> int:
+        return len(self._tools)
@@ -0,0 +1,136 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Any
+
+import msgpack
+
+from llm_orchestrator.exceptions.snapshot_exception import SnapshotException
+
+# Layout: MAGIC | version (u32) | header length (u32) | msgpack header | padding | float32 vectors
+MAGIC = b"LLMOSNAP"
+VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+_FLOAT_SIZE = 4
+
+
+class SnapshotManager:
+    """
+    Reads and writes versioned binary snapshots of a warmed orchestrator.
+
+    A snapshot holds the validated agents (with their raw JSON and checksum), the
+    prompt fragment of every vectorized tool and its embedding. Embeddings are stored
+    as one contiguous float32 block so a restore can memory-map the file and hand out
+    zero-copy views instead of parsing or re-embedding anything.
+    """
+
+    @classmethod
+    def export(cls, path: str, agents: list[dict], tools: list[dict], embedding_model: str = "") -> int:
+        """
+        Write a snapshot to `path`.
+
+        The snapshot is written to a temporary file next to `path` that then replaces it, so
+        processes that memory-mapped the previous snapshot (including this one, after
+        `restore_snapshot`) keep reading the old file instead of crashing on a truncated map.
+
+        Args:
+            path (str): Destination file.
+            agents (list[dict]): One entry per agent file with keys `file`, `raw` (the agent JSON
+                text), `checksum` (md5 of `raw`), `agent` (the validated `model_dump()`) and
+                `tenant` (the owning tenant, None for a shared agent).
+            tools (list[dict]): One entry per vectorized tool with keys `agent_name`, `name`,
+                `prompt`, `hash` and `vector` (a sequence of floats). All vectors must share one dimension.
+            embedding_model (str): `model_id` of the embedder that produced the vectors.
+
+        Returns:
+            int: The number of bytes written.
+
+        Raises:
+            SnapshotException: If the tool vectors don't share the same dimension.
+        """
+        dimensions = {len(tool["vector"]) for tool in tools}
+        if len(dimensions) > 1:
+            raise SnapshotException(f"Tool vectors have mixed dimensions: {sorted(dimensions)}")
+        dimension = dimensions.pop() if dimensions else 0
+
+        header = msgpack.packb({
+            "created_at": time.time(),
+            "byteorder": sys.byteorder,
+            "dimension": dimension,
+            "embedding_model": embedding_model,
+            "agents": agents,
+            "tools": [
+                {"agent_name": t["agent_name"], "name": t["name"], "prompt": t["prompt"], "hash": t["hash"]}
+                for t in tools
+            ],
+        })
+        padding = -(_PREAMBLE.size + len(header)) % _FLOAT_SIZE
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+                f.write(header)
+                f.write(b"\0" * padding)
+                for tool in tools:
+                    f.write(array("f", tool["vector"]).tobytes())
+                size = f.tell()
+            # Jangan truncate file lama: mmap dari restore masih membaca file itu
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return size
+
+    @classmethod
+    def load(cls, path: str) -> dict[str, Any]:
+        """
+        Memory-map a snapshot and verify its agent checksums.
+
+        Args:
+            path (str): The snapshot file.
+
+        Returns:
+            dict: The snapshot header (`created_at`, `dimension`, `embedding_model`, `agents`,
+            `tools`). Each tool gets a `vector` entry that is a float32 memoryview into the
+            mapped file.
+
+        Raises:
+            SnapshotException: If the file is not a snapshot, has an unsupported version or byte
+                order, is truncated, or an agent's raw JSON doesn't match its checksum.
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mapped) < _PREAMBLE.size:
+            raise SnapshotException(f"{path} is not an orchestrator snapshot")
+        magic, version, header_length = _PREAMBLE.unpack_from(mapped)
+        if magic != MAGIC:
+            raise SnapshotException(f"{path} is not an orchestrator snapshot")
+        if version != VERSION:
+            raise SnapshotException(f"Unsupported snapshot version {version}, expected {VERSION}")
+
+        header_end = _PREAMBLE.size + header_length
+        header = msgpack.unpackb(mapped[_PREAMBLE.size:header_end])
+        if header["byteorder"] != sys.byteorder:
+            raise SnapshotException(f"Snapshot was written on a {header['byteorder']}-endian machine")
+
+        for agent in header["agents"]:
+            if hashlib.md5(agent["raw"].encode()).hexdigest() != agent["checksum"]:
+                raise SnapshotException(f"Checksum mismatch for agent file {agent['file']}")
+
+        dimension = header["dimension"]
+        offset = header_end + (-header_end % _FLOAT_SIZE)
+        end = offset + len(header["tools"]) * dimension * _FLOAT_SIZE
+        if end > len(mapped):
+            raise SnapshotException(f"{path} is truncated")
+
+        vectors = memoryview(mapped)[offset:end].cast("f")
+        for i, tool in enumerate(header["tools"]):
+            tool["vector"] = vectors[i * dimension:(i + 1) * dimension]
+        return header
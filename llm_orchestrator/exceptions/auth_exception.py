@@ -0,0 +1,4 @@
+from llm_orchestrator.exceptions.base_agent_exception import BaseAgentException
+
+class AuthException(BaseAgentException):
+    pass
\ No newline at end of file
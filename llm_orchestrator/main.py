@@ -1,28 +1,213 @@
+import hashlib
+import json
+import os
+
+import aiofiles
+
 from llm_orchestrator.core.agent.loader import AgentLoader
+from llm_orchestrator.core.agent.reloader import AgentReloader
+from llm_orchestrator.core.agent.validator import AgentValidator
+from llm_orchestrator.core.snapshot.snapshot import SnapshotManager
+from llm_orchestrator.exceptions.snapshot_exception import SnapshotException
 from llm_orchestrator.types.base_llm import LLMClientType
+from llm_orchestrator.types.base_embedding import EmbeddingClientType
 from llm_orchestrator.core.executor.executor import Executor
 from llm_orchestrator.decorators.private import PrivateMethod
 
 class LLMOrchestrator(AgentLoader, Executor):
-    def __init__(self):
+    def __init__(self, embedding_client: EmbeddingClientType | None = None):
         """
         Initialize the LLMOrchestrator with a default LLM client of GEMINI.
+
+        Executor is initialized first so its per-query state exists; AgentLoader then
+        sets the shared clients and the agent registry used by both.
+
+        Args:
+            embedding_client (EmbeddingClientType | None): The provider that embeds tools and
+                queries, independent of the text generation client: GEMINI, ONNX (a local CPU
+                model) or HASHING (deterministic, for tests). Defaults to EMBEDDING_PROVIDER
+                (GEMINI when unset).
         """
-        super().__init__(
-            llm_client = LLMClientType.GEMINI
+        Executor.__init__(self)
+        AgentLoader.__init__(
+            self,
+            llm_client = LLMClientType.GEMINI,
+            embedding_client = embedding_client
         )
-        
-    async def warm_up(self):
+        self.reloader: AgentReloader | None = None
+
+    async def warm_up(self, workers: int = 1):
         """
-        Warm up the LLMOrchestrator by saving all the files and vectorizing them.
-        
-        This method is a coroutine.
-        
+        Warm up the LLMOrchestrator by connecting to Qdrant, saving all the files and vectorizing them.
+
+        This method is a coroutine. Vectorizing is checkpointed, so after a failure calling
+        it again resumes instead of starting from the first tool.
+
+        Args:
+            workers (int): Number of worker processes used to embed the tools. Defaults to 1.
+
         Raises:
             Exception: If there is an error while saving the files or vectorizing.
         """
         try:
+            await self.qdrant_helper.connect()
             await self._save_files()
-            await self._vectorize()
+            await self._vectorize(workers=workers)
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+
+    def start_reloader(self, interval: float = 30.0, watch_storage: bool = False) -> AgentReloader:
+        """
+        Start hot reloading the registered agents in the background.
+
+        Must be called from a running event loop, typically after `warm_up`.
+
+        Args:
+            interval (float): Seconds between two polls of the agent sources. Defaults to 30.
+            watch_storage (bool): Also pick up edits made directly to storage/agents. Defaults to False.
+
+        Returns:
+            AgentReloader: The reloader; its `metrics` expose reload latency and changed tool counts.
+        """
+        if self.reloader is None:
+            self.reloader = AgentReloader(self, interval=interval, watch_storage=watch_storage)
+        self.reloader.start()
+        return self.reloader
+
+    async def stop_reloader(self):
+        """
+        Stop the background reloader started by `start_reloader`, if any.
+        """
+        if self.reloader is not None:
+            await self.reloader.stop()
+
+    def render_metrics(self) -> str:
+        """
+        Export the collected metrics (stage latencies, token usage, retries, reloads).
+
+        Metrics are only collected while telemetry is enabled, see `Telemetry.enable` or the
+        LLM_ORCHESTRATOR_METRICS environment variable.
+
+        Returns:
+            str: The metrics in Prometheus text format.
+        """
+        return self.telemetry.render_prometheus()
+
+    async def export_snapshot(self, path: str = "storage/snapshot.bin") -> int:
+        """
+        Export the warmed state to a versioned binary snapshot.
+
+        The snapshot contains every agent file in storage/agents (raw JSON, checksum,
+        validated schema and tenant) and the prompt fragment and embedding of every vectorized tool.
+        Call it after `warm_up`.
+
+        Args:
+            path (str): Destination file. Defaults to "storage/snapshot.bin".
+
+        Returns:
+            int: The size of the snapshot in bytes.
+        """
+        directory = 'storage/agents/'
+        agents = []
+        for file in sorted(f for f in os.listdir(directory) if f.endswith('.json')):
+            async with aiofiles.open(os.path.join(directory, file), 'r') as f:
+                agent_json = await f.read()
+            agent = AgentValidator.run(json.loads(agent_json))
+            agents.append({
+                "file": file,
+                "raw": agent_json,
+                "checksum": hashlib.md5(agent_json.encode()).hexdigest(),
+                "agent": agent.model_dump(),
+                "tenant": self.registry.get_tenant(agent.agent_name),
+            })
+        tools = [
+            {
+                "agent_name": tool.agent_name,
+                "name": tool.name,
+                "prompt": tool.prompt,
+                "hash": tool.content_hash,
+                "vector": tool.vector,
+            }
+            for tool in self.registry.tools()
+            if tool.vector is not None
+        ]
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        return SnapshotManager.export(path, agents, tools, self.embedding_client.model_id)
+
+    async def restore_snapshot(self, path: str = "storage/snapshot.bin", upsert_vectors: bool = False):
+        """
+        Restore the warmed state from a snapshot instead of re-doing the warm up work.
+
+        The snapshot is memory-mapped; embeddings are not copied or recomputed. Agent files
+        missing from storage/agents are written from the snapshot, existing ones must have
+        the same checksum as the snapshot. Agents get the tenant they were registered with,
+        or else the one in the snapshot. A later `warm_up` only re-embeds tools that changed,
+        and updates the Qdrant payload of tools whose tenant differs from the snapshot.
+
+        Args:
+            path (str): The snapshot file. Defaults to "storage/snapshot.bin".
+            upsert_vectors (bool): Also upsert the snapshot vectors into Qdrant. Only needed when
+                the collection doesn't already hold them, e.g. a fresh Qdrant. Defaults to False.
+
+        Raises:
+            SnapshotException: If the snapshot is invalid, older than the agent files on disk or
+                has a different embedding dimension or model.
+        """
+        snapshot = SnapshotManager.load(path)
+        if snapshot["tools"] and snapshot["dimension"] != self.embedding_client.embedding_dimension:
+            raise SnapshotException(
+                f"Snapshot has {snapshot['dimension']}-d embeddings, the embedding client produces "
+                f"{self.embedding_client.embedding_dimension}-d ones; run warm_up and export a new snapshot"
+            )
+        # Snapshot lama belum menyimpan embedding_model
+        if snapshot["tools"] and snapshot.get("embedding_model") not in (None, "", self.embedding_client.model_id):
+            raise SnapshotException(
+                f"Snapshot was embedded with {snapshot['embedding_model']}, the embedding client is "
+                f"{self.embedding_client.model_id}; run warm_up and export a new snapshot"
+            )
+        os.makedirs('storage/agents', exist_ok=True)
+        registered_tenants = await self.get_agent_tenants()
+        relabeled_agents = set()
+        for agent in snapshot["agents"]:
+            file_path = os.path.join('storage/agents', agent["file"])
+            checksum_path = file_path.removesuffix('.json') + '.checksum'
+            if os.path.exists(checksum_path):
+                async with aiofiles.open(checksum_path, 'r') as f:
+                    current_checksum = (await f.read()).strip()
+                if current_checksum != agent["checksum"]:
+                    raise SnapshotException(
+                        f"Snapshot is stale for {agent['file']}, run warm_up and export a new snapshot"
+                    )
+            else:
+                async with aiofiles.open(file_path, 'w') as f:
+                    await f.write(agent["raw"])
+                async with aiofiles.open(checksum_path, 'w') as f:
+                    await f.write(agent["checksum"])
+
+            agent_name = agent["agent"]["agent_name"]
+            # Tenant di-set sebelum record dibangun, payload record mengikutinya
+            tenant = registered_tenants.get(agent_name, agent.get("tenant"))
+            if tenant != agent.get("tenant"):
+                relabeled_agents.add(agent_name)
+            self.registry.set_tenant(agent_name, tenant)
+            self.registry.set_agent(AgentValidator.run(agent["agent"]), agent["checksum"])
+
+        restored = []
+        for tool in snapshot["tools"]:
+            record = self.registry.get_tool(tool["agent_name"], tool["name"])
+            if record is not None and record.content_hash == tool["hash"]:
+                record.vector = tool["vector"]
+                restored.append(record)
+                if not upsert_vectors and record.agent_name in relabeled_agents:
+                    # Point di Qdrant masih membawa tenant dari snapshot, diganti saat warm_up
+                    self.relabeled_tools[record.point_id] = record
+
+        if upsert_vectors:
+            await self.qdrant_helper.connect()
+            self.qdrant_helper.upsert_points(
+                collection_name="llm_orchestrator",
+                points=[
+                    {"id": tool.point_id, "vector": tool.vector.tolist(), "payload": tool.point_payload}
+                    for tool in restored
+                ]
+            )
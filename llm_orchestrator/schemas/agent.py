@@ -1,5 +1,5 @@
-from typing import List, Optional, Literal, Dict, Any
-from pydantic import BaseModel, Field
+from typing import List, Optional, Literal, Dict, Any, Union
+from pydantic import BaseModel, Field, field_validator
 
 
 class ParameterProperty(BaseModel):
@@ -35,9 +35,18 @@ class Tool(BaseModel):
     tags: List[str]
     schema_model: SchemaModel = Field(..., alias="schema")
     http: HTTPConfig
+    # Jinja template atas response JSON, atau {"default": ..., "en": ...} per bahasa
+    response_template: Optional[Union[str, Dict[str, str]]] = None
     class Config:
         populate_by_name = True
 
+    @field_validator("response_template")
+    @classmethod
+    def check_default_template(cls, value):
+        if isinstance(value, dict) and "default" not in value:
+            raise ValueError("Localized response_template needs a \"default\" template")
+        return value
+
 
 class AgentSchema(BaseModel):
     agent_name: str
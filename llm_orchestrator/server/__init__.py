@@ -0,0 +1,3 @@
+from llm_orchestrator.server.app import create_app
+
+__all__ = ["create_app"]
@@ -0,0 +1,48 @@
+"""
+Run the orchestrator server with uvicorn.
+
+Usage:
+    python -m llm_orchestrator.server [--host 0.0.0.0] [--port 8000] [--workers 4]
+        [--agents-file agents.json] [--reload-interval 30]
+
+Every worker is a separate process with its own orchestrator. Set MEMORY_BACKEND=Redis
+(and REDIS_URL) with more than one worker, so the workers share the registered agents
+and warm up one after another.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from llm_orchestrator.core.memory.factory import MemoryFactory
+from llm_orchestrator.types.memory import MemoryType
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an LLMOrchestrator over HTTP")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVER_WORKERS", 1)))
+    parser.add_argument("--agents-file", default=None, help="JSON list of agents to register on startup")
+    parser.add_argument("--reload-interval", type=float, default=None, help="Seconds between agent reloads, 0 to disable")
+    args = parser.parse_args()
+
+    # Worker adalah proses baru, konfigurasi diteruskan lewat environment
+    if args.agents_file:
+        os.environ["SERVER_AGENTS_FILE"] = args.agents_file
+    if args.reload_interval is not None:
+        os.environ["SERVER_RELOAD_INTERVAL"] = str(args.reload_interval)
+    if args.workers > 1 and MemoryFactory.default_type() == MemoryType.InMemory:
+        print("Warning: workers don't share registered agents with MEMORY_BACKEND=InMemory, set MEMORY_BACKEND=Redis")
+
+    uvicorn.run(
+        "llm_orchestrator.server.app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
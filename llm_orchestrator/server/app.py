@@ -0,0 +1,384 @@
+import asyncio
+import contextlib
+import importlib
+import inspect
+import json
+import os
+import traceback
+import uuid
+from typing import Awaitable, Callable, List, Optional, Union
+
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    from starlette.applications import Starlette
+    from starlette.concurrency import iterate_in_threadpool
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    from starlette.routing import Route
+except ImportError as e:
+    raise ImportError("llm_orchestrator.server needs starlette and uvicorn: pip install 'llm-orchestrator[server]'") from e
+
+from llm_orchestrator.exceptions.circuit_open_exception import CircuitOpenException
+from llm_orchestrator.exceptions.deadline_exceeded_exception import DeadlineExceededException
+from llm_orchestrator.types.agents import Agent
+from llm_orchestrator.types.server import BatchQueryRequest, Identity, QueryRequest, RegisterAgentsRequest
+
+# Lock warm up di memory manager, supaya worker tidak menulis storage/ bersamaan
+WARMUP_LOCK = "WARMUP_LOCK"
+WARMUP_LOCK_TTL = 900
+
+IdentifyHook = Callable[[Request], Union[Optional[Identity], Awaitable[Optional[Identity]]]]
+
+
+def anonymous(request: Request) -> Identity:
+    """
+    The default `identify` hook: every caller is anonymous, tool requests carry no user
+    credentials and only shared agents (registered without a tenant) are searched.
+    """
+    return Identity()
+
+
+class OrchestratorServer:
+    """
+    State of one server process: the orchestrator and its warm up status.
+
+    Warm up runs in the background after startup, so liveness is answered right away and
+    readiness once the agents are loaded. Processes sharing a memory manager (MEMORY_BACKEND=Redis)
+    warm up one at a time under a lock in it: the first one embeds the tools, the others
+    resume from the warm up checkpoint and the vectors already in Qdrant. Agents registered
+    through one process reach the others through the shared agent sources and their reloader.
+    """
+
+    STARTING = "starting"
+    WARMING_UP = "warming_up"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, orchestrator=None, agents: Optional[List[Agent]] = None, reload_interval: float = 30.0, identify: Optional[IdentifyHook] = None):
+        """
+        Args:
+            orchestrator (LLMOrchestrator | None): The orchestrator to serve. Created on startup when omitted.
+            agents (Optional[List[Agent]]): Agents to register before warming up.
+            reload_interval (float): Seconds between agent reloads, 0 to disable. Defaults to 30.
+            identify (Optional[IdentifyHook]): Resolves the `Identity` of a request from its
+                authentication (a verified token, a header set by the gateway), sync or async;
+                None rejects the request with 401. Defaults to `anonymous`.
+        """
+        self.orchestrator = orchestrator
+        self.agents = agents or []
+        self.reload_interval = reload_interval
+        self.identify = identify or anonymous
+        self.status = self.STARTING
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.orchestrator is None:
+            from llm_orchestrator import LLMOrchestrator
+
+            self.orchestrator = LLMOrchestrator()
+        self._task = asyncio.create_task(self.warm_up())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if self.orchestrator is not None:
+            await self.orchestrator.stop_reloader()
+            await self.orchestrator.aclose()
+
+    async def warm_up(self):
+        """
+        Register the startup agents, warm up and start the reloader; sets `status`.
+        """
+        self.status = self.WARMING_UP
+        try:
+            if self.agents:
+                await self.orchestrator.register_agents(self.agents)
+            await self.locked_warm_up()
+            if self.reload_interval:
+                self.orchestrator.start_reloader(interval=self.reload_interval)
+            self.status = self.READY
+        except Exception as e:
+            traceback.print_exc()
+            self.status = self.FAILED
+            self.error = str(e)
+
+    async def locked_warm_up(self):
+        """
+        `LLMOrchestrator.warm_up` under the warm up lock shared by the server processes. The
+        lock holds a random token and is only released while it still holds this process's
+        token, so a warm up that outlived the lock's TTL doesn't release another one's lock.
+        """
+        memory = self.orchestrator.in_memory_manager
+        # Token acak: lock yang sudah expired dan diambil worker lain tidak ikut dihapus
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        while not await memory.set_if_absent(WARMUP_LOCK, token, ttl=WARMUP_LOCK_TTL):
+            await asyncio.sleep(0.5)
+        try:
+            await self.orchestrator.warm_up()
+        finally:
+            if not await memory.clear_if_equal(WARMUP_LOCK, token):
+                print(f"Warm up took longer than the {WARMUP_LOCK_TTL}s warm up lock, another worker may have warmed up concurrently")
+
+    async def identity(self, request: Request) -> Optional[Identity]:
+        """
+        The caller of a request, see `identify`.
+        """
+        identity = self.identify(request)
+        if inspect.isawaitable(identity):
+            identity = await identity
+        return identity
+
+    @property
+    def ready(self) -> bool:
+        return self.status == self.READY
+
+
+def create_app(orchestrator=None, agents: Optional[List[Agent]] = None, reload_interval: Optional[float] = None, identify: Optional[IdentifyHook] = None) -> Starlette:
+    """
+    Create the ASGI application serving an LLMOrchestrator.
+
+    Endpoints:
+        POST /query: Answer a `QueryRequest`, as JSON or, with `stream`, as Server-Sent Events
+            ("data: {"text": ...}" per chunk, then an "event: done").
+        POST /query/batch: Answer a `BatchQueryRequest`, one result or error per query.
+        POST /agents: Register the agents of a `RegisterAgentsRequest` and warm them up;
+            "loaded" is false for an agent whose file couldn't be loaded (see the log).
+        GET /health/live: Always 200 while the process runs.
+        GET /health/ready: 200 once warm up finished, 503 before or when it failed.
+        GET /metrics: The metrics in Prometheus text format.
+
+    The user whose credentials the tool requests use and the tenant whose tools are searched
+    are resolved by `identify` from the authenticated request, never taken from the body.
+
+    Without arguments (e.g. `uvicorn --factory`), the agents are read from SERVER_AGENTS_FILE
+    (a JSON list of `Agent`), the reload interval from SERVER_RELOAD_INTERVAL and the
+    `identify` hook from SERVER_IDENTIFY ("module:function").
+
+    Args:
+        orchestrator (LLMOrchestrator | None): The orchestrator to serve. Created on startup when omitted.
+        agents (Optional[List[Agent]]): Agents to register on startup. Defaults to SERVER_AGENTS_FILE.
+        reload_interval (Optional[float]): Seconds between agent reloads, 0 to disable.
+            Defaults to SERVER_RELOAD_INTERVAL or 30.
+        identify (Optional[IdentifyHook]): Resolves the `Identity` of a request, see
+            `OrchestratorServer`. Defaults to SERVER_IDENTIFY or `anonymous`.
+
+    Returns:
+        Starlette: The application.
+    """
+    if agents is None:
+        agents = load_agents(os.getenv("SERVER_AGENTS_FILE"))
+    if reload_interval is None:
+        reload_interval = float(os.getenv("SERVER_RELOAD_INTERVAL", 30))
+    if identify is None:
+        identify = load_identify(os.getenv("SERVER_IDENTIFY"))
+    server = OrchestratorServer(orchestrator, agents, reload_interval, identify)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        await server.start()
+        try:
+            yield
+        finally:
+            await server.stop()
+
+    app = Starlette(
+        routes=[
+            Route("/query", query, methods=["POST"]),
+            Route("/query/batch", batch_query, methods=["POST"]),
+            Route("/agents", register_agents, methods=["POST"]),
+            Route("/health/live", live, methods=["GET"]),
+            Route("/health/ready", ready, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.server = server
+    return app
+
+
+def load_agents(path: Optional[str]) -> List[Agent]:
+    """
+    Read the startup agents from a JSON file holding a list of `Agent`.
+
+    Args:
+        path (Optional[str]): The file, None for no agents.
+
+    Returns:
+        List[Agent]: The agents.
+    """
+    if not path:
+        return []
+    with open(path) as f:
+        return TypeAdapter(List[Agent]).validate_python(json.load(f))
+
+
+def load_identify(path: Optional[str]) -> Optional[IdentifyHook]:
+    """
+    Import an `identify` hook.
+
+    Args:
+        path (Optional[str]): "module:function", None for the default.
+
+    Returns:
+        Optional[IdentifyHook]: The hook.
+    """
+    if not path:
+        return None
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+async def query(request: Request):
+    server: OrchestratorServer = request.app.state.server
+    if not server.ready:
+        return not_ready(server)
+    identity = await server.identity(request)
+    if identity is None:
+        return unauthorized()
+    try:
+        body = QueryRequest.model_validate(await request.json())
+    except (ValidationError, ValueError) as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+    try:
+        answer = await invoke(server, body, identity)
+    except Exception as e:
+        return error_response(e)
+    if not body.stream:
+        return JSONResponse({"answer": answer})
+    return StreamingResponse(
+        sse_events(answer),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def batch_query(request: Request):
+    server: OrchestratorServer = request.app.state.server
+    if not server.ready:
+        return not_ready(server)
+    identity = await server.identity(request)
+    if identity is None:
+        return unauthorized()
+    try:
+        body = BatchQueryRequest.model_validate(await request.json())
+    except (ValidationError, ValueError) as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+
+    semaphore = asyncio.Semaphore(max(1, body.max_concurrency))
+
+    async def run(item: QueryRequest) -> dict:
+        async with semaphore:
+            try:
+                return {"answer": await invoke(server, item.model_copy(update={"stream": False}), identity)}
+            except Exception as e:
+                return {"error": str(e), "status": error_status(e)}
+
+    results = await asyncio.gather(*[run(item) for item in body.queries])
+    return JSONResponse({"results": results})
+
+
+async def register_agents(request: Request):
+    server: OrchestratorServer = request.app.state.server
+    if not server.ready:
+        return not_ready(server)
+    try:
+        body = RegisterAgentsRequest.model_validate(await request.json())
+    except (ValidationError, ValueError) as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+    try:
+        await server.orchestrator.register_agents(body.agents)
+        await server.locked_warm_up()
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(e)
+    registry = server.orchestrator.registry
+    return JSONResponse({
+        "agents": [
+            {
+                "name": agent.name,
+                "loaded": agent.name in registry,
+                "tools": len(registry.tools(agent.name)),
+                "tenant": registry.get_tenant(agent.name),
+            }
+            for agent in body.agents
+        ],
+    })
+
+
+async def live(request: Request):
+    return JSONResponse({"status": "alive"})
+
+
+async def ready(request: Request):
+    server: OrchestratorServer = request.app.state.server
+    if not server.ready:
+        return not_ready(server)
+    registry = server.orchestrator.registry
+    return JSONResponse({"status": server.status, "agents": len(registry.agents()), "tools": len(registry)})
+
+
+async def metrics(request: Request):
+    server: OrchestratorServer = request.app.state.server
+    return PlainTextResponse(server.orchestrator.render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+async def invoke(server: OrchestratorServer, body: QueryRequest, identity: Identity):
+    return await server.orchestrator.invoke_query(
+        body.query,
+        top_k=body.top_k,
+        stream=body.stream,
+        plan=body.plan,
+        score_threshold=body.score_threshold,
+        speculative=body.speculative,
+        deadline=body.deadline,
+        tenant=identity.tenant,
+        agents=body.agents,
+        user=identity.user,
+        raw=body.raw,
+        language=body.language,
+    )
+
+
+async def sse_events(chunks):
+    """
+    Server-Sent Events of a streamed answer. The chunks come from a blocking iterator
+    (the Gemini stream), so it is read in a worker thread.
+    """
+    try:
+        async for chunk in iterate_in_threadpool(chunks):
+            text = getattr(chunk, "text", None)
+            if text:
+                yield f"data: {json.dumps({'text': text})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        traceback.print_exc()
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    finally:
+        # Client disconnect: tutup stream supaya slot rate limiter dilepas
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def error_status(error: Exception) -> int:
+    if isinstance(error, DeadlineExceededException):
+        return 504
+    if isinstance(error, CircuitOpenException):
+        return 503
+    return 500
+
+
+def error_response(error: Exception) -> JSONResponse:
+    return JSONResponse({"error": str(error)}, status_code=error_status(error))
+
+
+def unauthorized() -> JSONResponse:
+    return JSONResponse({"error": "unauthorized"}, status_code=401)
+
+
+def not_ready(server: OrchestratorServer) -> JSONResponse:
+    return JSONResponse({"status": server.status, "error": server.error}, status_code=503)
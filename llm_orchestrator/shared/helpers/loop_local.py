@@ -0,0 +1,63 @@
+import asyncio
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """
+    One value per event loop, for clients whose connections are bound to the loop they were
+    opened on (httpx, google-genai's `aio`). A value used on another loop fails with
+    "Event loop is closed" or "attached to a different loop", e.g. when the orchestrator is
+    set up with `asyncio.run(...)` and then queried on another loop (Streamlit, Jupyter).
+
+    `get` returns the value of the running loop, created by `factory` on first use on that
+    loop. Values of closed loops are dropped: their connections can't be closed anymore and
+    are released by garbage collection.
+    """
+
+    def __init__(self, factory: Callable[[], T], is_usable: Optional[Callable[[T], bool]] = None):
+        """
+        Args:
+            factory (Callable[[], T]): Creates the value for a loop.
+            is_usable (Optional[Callable[[T], bool]]): False when the value of the running loop
+                must be recreated, e.g. a closed client. Defaults to None (always usable).
+        """
+        self._factory = factory
+        self._is_usable = is_usable
+        self._values: dict[asyncio.AbstractEventLoop, T] = {}
+
+    def get(self) -> T:
+        """
+        The value of the running loop.
+
+        Returns:
+            T: The value, created on first use on this loop.
+
+        Raises:
+            RuntimeError: When called outside of a running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        value = self._values.get(loop)
+        if value is None or (self._is_usable is not None and not self._is_usable(value)):
+            self._prune()
+            value = self._factory()
+            self._values[loop] = value
+        return value
+
+    def pop_all(self) -> list[tuple[asyncio.AbstractEventLoop, T]]:
+        """
+        Remove all values, e.g. to close them.
+
+        Returns:
+            list[tuple[asyncio.AbstractEventLoop, T]]: The values with their loop, closed loops
+                excluded.
+        """
+        self._prune()
+        values = list(self._values.items())
+        self._values.clear()
+        return values
+
+    def _prune(self):
+        for loop in [loop for loop in self._values if loop.is_closed()]:
+            del self._values[loop]
@@ -1,17 +1,19 @@
+from __future__ import annotations
+
+import asyncio
 import os
+import threading
+import time
 import uuid
-from typing import List
+from typing import TYPE_CHECKING, List
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
-from qdrant_client.models import (
-    PointStruct,
-    PayloadSchemaType,
-    VectorParams,
-    Distance,
-    Filter,
-    FieldCondition,
-    MatchValue
-)
+
+from llm_orchestrator.core.registry.registry import TENANT_FIELD
+from llm_orchestrator.exceptions.qdrant_exception import QdrantException
+from llm_orchestrator.types.collection_config import CollectionConfig, truncate_vector
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
 
 load_dotenv()
 
@@ -21,38 +23,220 @@ QDRANT_API_KEY = os.getenv("QDRANT_API_KEY", None)
 
 class QdrantHelper:
     _instance: 'QdrantHelper' = None
-    client: QdrantClient
+    _client: QdrantClient | None
+    _ready: bool
 
     def __new__(cls):
         """
         Creates and returns a singleton instance of QdrantHelper.
 
         This method ensures that only one instance of QdrantHelper exists by checking if an instance 
-        has already been created. If not, it initializes the instance, sets up a Qdrant client 
-        connection using the environment variables QDRANT_HOST, QDRANT_PORT, and QDRANT_API_KEY, 
-        and creates a collection named 'llm_orchestrator' with a default vector configuration if 
-        it doesn't already exist.
+        has already been created. Creating the instance does not touch the network: the Qdrant 
+        client and the 'llm_orchestrator' collection are set up lazily by `connect` (during warm up) 
+        or on first access of `client`.
 
         Returns:
             QdrantHelper: The singleton instance of QdrantHelper.
         """
 
         if cls._instance is None:
-            print(f"Connecting to Qdrant at {QDRANT_HOST}:{QDRANT_PORT}")
             cls._instance = super().__new__(cls)
-            cls._instance.client = QdrantClient(
-                url=f"{QDRANT_HOST}:{QDRANT_PORT}",
-                api_key=QDRANT_API_KEY,
-            )
-            # Buat collection jika belum ada, dengan named vector "default"
-            collections = cls._instance.client.get_collections().collections
-            if not any(c.name == "llm_orchestrator" for c in collections):
-                cls._instance.client.recreate_collection(
-                    collection_name="llm_orchestrator",
-                    vectors_config=VectorParams(size=1536, distance=Distance.COSINE)
-                )
+            cls._instance._client = None
+            cls._instance._ready = False
+            cls._instance._connect_lock = threading.Lock()
+            cls._instance._indexed_fields = set()
+            cls._instance._client_kwargs = None
+            cls._instance.collection_config = CollectionConfig.from_env()
         return cls._instance
 
+    def configure(self, collection_config: CollectionConfig | None = None, **client_kwargs) -> 'QdrantHelper':
+        """
+        Override the QdrantClient arguments and/or the collection settings before the next
+        connection, e.g. `location=":memory:"` for qdrant-client's local mode in tests and
+        benchmarks.
+
+        Args:
+            collection_config (CollectionConfig | None): Settings of the 'llm_orchestrator'
+                collection, replacing the ones read from the environment.
+            **client_kwargs: Keyword arguments passed to QdrantClient instead of the
+                QDRANT_HOST/QDRANT_PORT/QDRANT_API_KEY defaults.
+
+        Returns:
+            QdrantHelper: The singleton instance.
+        """
+        if client_kwargs:
+            self._client_kwargs = client_kwargs
+            self._client = None
+        if collection_config is not None:
+            self.collection_config = collection_config
+        self._ready = False
+        self._indexed_fields.clear()
+        return self
+
+    @property
+    def client_kwargs(self) -> dict | None:
+        """The QdrantClient arguments set with `configure`, None for the environment defaults."""
+        return self._client_kwargs
+
+    @property
+    def client(self) -> QdrantClient:
+        """
+        The connected Qdrant client. Connects (with retries) on first access.
+
+        Returns:
+            QdrantClient: The Qdrant client, with the 'llm_orchestrator' collection ensured.
+        """
+        if not self._ready:
+            self.ensure_collection()
+        return self._client
+
+    def ensure_collection(self, retries: int = 3, backoff_factor: float = 0.5):
+        """
+        Connects to Qdrant and creates the 'llm_orchestrator' collection if it doesn't exist.
+
+        The Qdrant client connection uses the environment variables QDRANT_HOST, QDRANT_PORT, 
+        and QDRANT_API_KEY. Failures are retried with exponential backoff so a briefly 
+        unreachable Qdrant doesn't fail startup. Calling it again once connected is a no-op.
+
+        Args:
+            retries (int): How many times to retry after the first failed attempt. Defaults to 3.
+            backoff_factor (float): Base delay in seconds for the exponential backoff. Defaults to 0.5.
+
+        Raises:
+            Exception: The last connection error once all retries are exhausted.
+        """
+        with self._connect_lock:
+            attempt = 0
+            while not self._ready:
+                try:
+                    if self._client is None:
+                        from qdrant_client import QdrantClient
+
+                        if self._client_kwargs is not None:
+                            self._client = QdrantClient(**self._client_kwargs)
+                        else:
+                            print(f"Connecting to Qdrant at {QDRANT_HOST}:{QDRANT_PORT}")
+                            self._client = QdrantClient(
+                                url=f"{QDRANT_HOST}:{QDRANT_PORT}",
+                                api_key=QDRANT_API_KEY,
+                            )
+                    # Buat collection jika belum ada, kalau sudah ada terapkan setting yang berubah
+                    if not self._client.collection_exists("llm_orchestrator"):
+                        create_collection(self._client, "llm_orchestrator", self.collection_config)
+                    else:
+                        self.migrate_collection("llm_orchestrator")
+                    self._ready = True
+                except QdrantException:
+                    raise
+                except Exception:
+                    attempt += 1
+                    if attempt > retries:
+                        raise
+                    delay = backoff_factor * (2 ** (attempt - 1))  # exponential backoff
+                    print(f"Qdrant connection failed (attempt {attempt}), retrying after {delay:.1f}s...")
+                    time.sleep(delay)
+
+    async def connect(self, retries: int = 3, backoff_factor: float = 0.5) -> 'QdrantHelper':
+        """
+        Asynchronously runs `ensure_collection` off the event loop.
+
+        Args:
+            retries (int): How many times to retry after the first failed attempt. Defaults to 3.
+            backoff_factor (float): Base delay in seconds for the exponential backoff. Defaults to 0.5.
+
+        Returns:
+            QdrantHelper: The connected singleton instance.
+        """
+        if not self._ready:
+            await asyncio.to_thread(self.ensure_collection, retries, backoff_factor)
+        return self
+
+    def migrate_collection(self, collection_name: str) -> dict:
+        """
+        Applies the HNSW, quantization and on-disk settings of `collection_config` to an
+        existing collection. Only settings that differ are sent; Qdrant rebuilds the
+        affected index in the background while the collection stays searchable.
+
+        Args:
+            collection_name (str): The collection to update.
+
+        Returns:
+            dict: The settings that were changed, empty if the collection was up to date.
+
+        Raises:
+            QdrantException: If the vector layout (size, distance or two-stage vectors) differs and
+                `recreate_on_change` is off, since that requires a new collection.
+        """
+        from qdrant_client.models import VectorParamsDiff
+
+        config = self.collection_config
+        info = self._client.get_collection(collection_name).config
+        vectors = info.params.vectors
+        if not isinstance(vectors, dict):
+            vectors = {"": vectors}
+        layout = {name: (params.size, params.distance.value) for name, params in vectors.items()}
+        if layout != config.layout():
+            if not config.recreate_on_change:
+                raise QdrantException(
+                    f"Collection {collection_name} has vectors {layout}, configured are {config.layout()}; "
+                    "set QDRANT_RECREATE_ON_CHANGE=1 (or call recreate_collection) and run warm_up again"
+                )
+            self.recreate_collection(collection_name)
+            return {"layout": config.layout()}
+
+        changes = {}
+        full = vectors[config.full_vector_name]
+        if bool(full.on_disk) != config.on_disk:
+            changes["vectors_config"] = {config.full_vector_name: VectorParamsDiff(on_disk=config.on_disk)}
+        hnsw = config.hnsw_config()
+        if hnsw is not None and (
+            (hnsw.m is not None and hnsw.m != info.hnsw_config.m)
+            or (hnsw.ef_construct is not None and hnsw.ef_construct != info.hnsw_config.ef_construct)
+        ):
+            changes["hnsw_config"] = hnsw
+        quantization = config.quantization_config()
+        if quantization != info.quantization_config:
+            if quantization is None:
+                from qdrant_client.models import Disabled
+
+                quantization = Disabled.DISABLED
+            changes["quantization_config"] = quantization
+
+        if changes:
+            print(f"Updating collection {collection_name}: {', '.join(changes)}")
+            self._client.update_collection(collection_name=collection_name, **changes)
+        return changes
+
+    def recreate_collection(self, collection_name: str):
+        """
+        Drops a collection and creates it again with `collection_config`, e.g. after the
+        embedding dimension changed. All points are lost: the next warm_up finds no stored
+        vectors for its checkpointed tools and embeds them again.
+
+        Args:
+            collection_name (str): The collection to re-create.
+        """
+        print(f"Re-creating collection {collection_name} with vectors {self.collection_config.layout()}")
+        self._client.delete_collection(collection_name)
+        create_collection(self._client, collection_name, self.collection_config)
+        self._indexed_fields = {field for field in self._indexed_fields if field[0] != collection_name}
+
+    def search(self, collection_name: str, query_vector: List[float], limit: int = 5, query_filter=None) -> list:
+        """
+        Searches the nearest points, with the query-time settings of `collection_config`
+        (`hnsw_ef`, quantization rescoring and oversampling, two-stage rescoring).
+
+        Args:
+            collection_name (str): The collection to search.
+            query_vector (List[float]): The query embedding.
+            limit (int): Maximum number of points. Defaults to 5.
+            query_filter (Filter | None): Optional payload filter.
+
+        Returns:
+            list[ScoredPoint]: The points with their scores, best first.
+        """
+        return search_points(self.client, collection_name, self.collection_config, query_vector, limit, query_filter)
+
     def ensure_indexes(self, collection_name: str, payload_filter: dict):
 
         """
@@ -62,7 +246,8 @@ class QdrantHelper:
         the appropriate payload schema type (e.g., KEYWORD, BOOL, INTEGER, FLOAT) based on the
         value's data type. It then attempts to create a payload index for each field in the
         specified collection. If the index already exists, it silently ignores the error and 
-        continues with other fields.
+        continues with other fields. The tenant field gets a tenant index, so Qdrant stores
+        the points of one tenant together and tenant-filtered searches only touch those.
 
         Args:
             collection_name (str): The name of the collection in Qdrant where indexes should be created.
@@ -74,8 +259,14 @@ class QdrantHelper:
                     it is an "already exists" error, which is ignored.
         """
 
+        from qdrant_client.models import KeywordIndexParams, PayloadSchemaType
+
         for key, value in payload_filter.items():
-            if isinstance(value, str):
+            if (collection_name, key) in self._indexed_fields:
+                continue
+            if key == TENANT_FIELD:
+                schema = KeywordIndexParams(type="keyword", is_tenant=True)
+            elif isinstance(value, str):
                 schema = PayloadSchemaType.KEYWORD
             elif isinstance(value, bool):
                 schema = PayloadSchemaType.BOOL
@@ -96,6 +287,7 @@ class QdrantHelper:
                 # Abaikan error kalau index sudah ada
                 if "already exists" not in str(e):
                     raise
+            self._indexed_fields.add((collection_name, key))
 
     def upsert_with_filter(self, collection_name: str, payload_filter: dict, vector: List[float], payload: dict):
         # Pastikan index sudah dibuat
@@ -121,6 +313,8 @@ class QdrantHelper:
         Returns:
             str: The ID of the upserted point.
         """
+        from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
+
         self.ensure_indexes(collection_name, payload_filter)
 
         # Buat filter Qdrant
@@ -149,10 +343,194 @@ class QdrantHelper:
             points=[
                 PointStruct(
                     id=point_id,
-                    vector=vector,
+                    vector=self.collection_config.point_vector(vector),
                     payload=payload
                 )
             ]
         )
 
         return point_id
+
+    def upsert_points(self, collection_name: str, points: List[dict]):
+        """
+        Upserts a batch of points with known IDs in a single request.
+
+        Payload indexes are ensured for the fields of the points' payloads.
+
+        Args:
+            collection_name (str): The name of the collection in Qdrant where the upsert should occur.
+            points (List[dict]): The points, each a dict with `id`, `vector` and `payload`.
+        """
+        from qdrant_client.models import PointStruct
+
+        if not points:
+            return
+        self.ensure_indexes(collection_name, {key: value for point in points for key, value in point["payload"].items()})
+        self.client.upsert(
+            collection_name=collection_name,
+            points=[
+                PointStruct(
+                    id=point["id"],
+                    vector=self.collection_config.point_vector(point["vector"]),
+                    payload=point["payload"]
+                )
+                for point in points
+            ]
+        )
+
+    def overwrite_payloads(self, collection_name: str, points: List[dict], batch_size: int = 256):
+        """
+        Replaces the payloads of existing points without touching their vectors, in batches of
+        `batch_size` operations. Fields missing from a new payload are removed from the point.
+
+        Payload indexes are ensured for the fields of the new payloads.
+
+        Args:
+            collection_name (str): The name of the collection in Qdrant to update.
+            points (List[dict]): The points, each a dict with `id` and `payload`.
+            batch_size (int): How many points to update per request. Defaults to 256.
+        """
+        from qdrant_client.models import OverwritePayloadOperation, SetPayload
+
+        if not points:
+            return
+        self.ensure_indexes(collection_name, {key: value for point in points for key, value in point["payload"].items()})
+        for start in range(0, len(points), batch_size):
+            self.client.batch_update_points(
+                collection_name=collection_name,
+                update_operations=[
+                    OverwritePayloadOperation(overwrite_payload=SetPayload(payload=point["payload"], points=[point["id"]]))
+                    for point in points[start:start + batch_size]
+                ]
+            )
+
+    def delete_points(self, collection_name: str, point_ids: List[str], batch_size: int = 256):
+        """
+        Deletes points by ID, in batches of `batch_size`.
+
+        Args:
+            collection_name (str): The name of the collection in Qdrant to delete from.
+            point_ids (List[str]): The IDs of the points to delete.
+            batch_size (int): How many IDs to send per request. Defaults to 256.
+        """
+        from qdrant_client.models import PointIdsList
+
+        for start in range(0, len(point_ids), batch_size):
+            self.client.delete(
+                collection_name=collection_name,
+                points_selector=PointIdsList(points=point_ids[start:start + batch_size])
+            )
+
+    def point_ids(self, collection_name: str, batch_size: int = 1024) -> list:
+        """
+        Lists the IDs of every point, scrolling in pages of `batch_size` without payloads or vectors.
+
+        Args:
+            collection_name (str): The name of the collection in Qdrant to read from.
+            batch_size (int): How many points to fetch per request. Defaults to 1024.
+
+        Returns:
+            list: The point IDs.
+        """
+        ids, offset = [], None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            ids.extend(point.id for point in points)
+            if offset is None:
+                return ids
+
+    def retrieve_vectors(self, collection_name: str, point_ids: List[str], batch_size: int = 256, with_payload: bool = False) -> dict:
+        """
+        Fetches the stored (full-dimension) vectors of points by ID, in batches of `batch_size`.
+
+        Args:
+            collection_name (str): The name of the collection in Qdrant to read from.
+            point_ids (List[str]): The IDs of the points to fetch.
+            batch_size (int): How many IDs to send per request. Defaults to 256.
+            with_payload (bool): Also fetch the payloads. Defaults to False.
+
+        Returns:
+            dict: Point ID (as a string) to vector, or to a (vector, payload) tuple with
+                `with_payload`, for the points that exist.
+        """
+        vector_name = self.collection_config.full_vector_name
+        vectors = {}
+        for start in range(0, len(point_ids), batch_size):
+            points = self.client.retrieve(
+                collection_name=collection_name,
+                ids=point_ids[start:start + batch_size],
+                with_vectors=[vector_name] if vector_name else True,
+                with_payload=with_payload
+            )
+            for point in points:
+                vector = point.vector[vector_name] if vector_name else point.vector
+                vectors[str(point.id)] = (vector, point.payload or {}) if with_payload else vector
+        return vectors
+
+
+def create_collection(client: QdrantClient, collection_name: str, config: CollectionConfig):
+    """
+    Creates a collection with the vectors, HNSW and quantization settings of `config`.
+
+    Args:
+        client (QdrantClient): The Qdrant client.
+        collection_name (str): The collection to create.
+        config (CollectionConfig): The collection settings.
+    """
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=config.vectors_config(),
+        hnsw_config=config.hnsw_config(),
+        quantization_config=config.quantization_config(),
+    )
+
+
+def search_points(client: QdrantClient, collection_name: str, config: CollectionConfig, query_vector: List[float], limit: int = 5, query_filter=None) -> list:
+    """
+    Searches the nearest points of a collection created with `config`.
+
+    In two-stage mode the compact vector finds `config.candidates` candidates and the full
+    vector rescores them, in a single Qdrant query.
+
+    Args:
+        client (QdrantClient): The Qdrant client.
+        collection_name (str): The collection to search.
+        config (CollectionConfig): The settings the collection was created with.
+        query_vector (List[float]): The full-dimension query embedding.
+        limit (int): Maximum number of points. Defaults to 5.
+        query_filter (Filter | None): Optional payload filter.
+
+    Returns:
+        list[ScoredPoint]: The points with their scores, best first.
+    """
+    if not config.two_stage:
+        return client.search(
+            collection_name=collection_name,
+            query_vector=query_vector,
+            query_filter=query_filter,
+            search_params=config.search_params(),
+            limit=limit
+        )
+
+    from qdrant_client.models import Prefetch
+
+    return client.query_points(
+        collection_name=collection_name,
+        prefetch=Prefetch(
+            query=truncate_vector(query_vector, config.search_size),
+            using="compact",
+            filter=query_filter,
+            params=config.search_params(),
+            limit=max(config.candidates, limit),
+        ),
+        query=list(query_vector),
+        using="full",
+        query_filter=query_filter,
+        limit=limit
+    ).points
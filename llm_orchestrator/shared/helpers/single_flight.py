@@ -0,0 +1,86 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from llm_orchestrator.shared.helpers.telemetry import Telemetry
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight work: concurrent `do` calls with the same key await one
+    shared task instead of each running `fn`. The key must cover everything the result
+    depends on; the first caller's `fn` runs, so its arguments (retries, timeouts) apply to
+    every caller. Nothing is cached: once the task finished, the next call runs `fn` again.
+
+    Every caller gets the same result object (so it must not be mutated) or the same
+    exception. Calls are only shared within an event loop. A cancelled caller only stops waiting; the shared task is cancelled once no
+    caller waits for it anymore, and a later call with the key starts a new one.
+
+    Calls are counted as `llm_orchestrator_single_flight_total{flight, outcome}`, outcome
+    "leader" (ran `fn`) or "shared" (joined a running call).
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): Label of the metrics, e.g. "embeddings".
+        """
+        self.name = name
+        self.telemetry = Telemetry()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn`, or wait for the running call with the same key.
+
+        Args:
+            key (Hashable): Identifies the work.
+            fn (Callable[[], Awaitable[T]]): Starts the work, only called when no call with
+                the key is running.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        call = self._calls.get(key)
+        if call is not None and call.task.get_loop() is not asyncio.get_running_loop():
+            # Task dari loop lain (mis. loop asyncio.run yang sudah selesai) tidak bisa di-await di sini
+            self._forget(key, call)
+            call = None
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+            self.telemetry.inc("llm_orchestrator_single_flight_total", flight=self.name, outcome="leader")
+        else:
+            self.telemetry.inc("llm_orchestrator_single_flight_total", flight=self.name, outcome="shared")
+        call.waiters += 1
+        try:
+            # shield: caller yang dibatalkan tidak ikut membatalkan call milik caller lain
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Tidak ada yang menunggu lagi, call baru dengan key ini tidak boleh ikut yang dibatalkan
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _finish(self, key: Hashable, call: _Call):
+        self._forget(key, call)
+        if not call.task.cancelled():
+            call.task.exception()  # Semua caller bisa sudah batal, hindari "exception was never retrieved"
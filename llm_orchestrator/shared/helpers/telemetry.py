@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+# Histogram buckets in seconds, from a local vector search up to a slow LLM generation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Histogram buckets for counts, e.g. tools per plan
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13)
+
+
+class Span:
+    """
+    Timing of one stage. Use it as a context manager; on exit the duration is recorded
+    as `llm_orchestrator_stage_seconds{stage=...}` and passed to the registered hooks.
+    """
+    __slots__ = ("telemetry", "name", "labels", "start", "duration", "error")
+
+    def __init__(self, telemetry: 'Telemetry', name: str, labels: dict):
+        self.telemetry = telemetry
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+        self.duration = 0.0
+        self.error: Optional[BaseException] = None
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        self.error = exc
+        self.telemetry.finish(self)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+    duration = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Telemetry:
+    """
+    Process-wide stage timings, counters and histograms, exported in Prometheus text format.
+
+    Disabled by default (set LLM_ORCHESTRATOR_METRICS=1 or call `enable`); while disabled
+    and without hooks, `span` returns a shared no-op object and counters are ignored, so
+    instrumented code paths pay only an attribute check.
+    """
+    _instance: 'Telemetry' = None
+
+    def __new__(cls):
+        """
+        Creates and returns the singleton instance of Telemetry.
+
+        Returns:
+            Telemetry: The singleton instance.
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.enabled = os.getenv("LLM_ORCHESTRATOR_METRICS", "0") not in ("", "0", "false")
+            cls._instance.hooks = []
+            cls._instance.buckets = DEFAULT_BUCKETS
+            cls._instance._lock = threading.Lock()
+            cls._instance._counters = {}
+            cls._instance._histograms = {}
+        return cls._instance
+
+    @property
+    def active(self) -> bool:
+        return self.enabled or bool(self.hooks)
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def add_hook(self, hook: Callable[[Span], None]):
+        """
+        Register a callback that receives every finished `Span`, e.g. to forward it to a tracer.
+
+        Args:
+            hook (Callable[[Span], None]): The callback.
+        """
+        self.hooks.append(hook)
+
+    def span(self, stage: str, **labels):
+        """
+        Time a stage.
+
+        Args:
+            stage (str): The stage name, e.g. "vector_search".
+            **labels: Extra metric labels.
+
+        Returns:
+            Span: A context manager; a no-op one when telemetry is inactive.
+        """
+        if not self.active:
+            return _NOOP_SPAN
+        return Span(self, stage, labels)
+
+    def finish(self, span: Span):
+        """
+        Record a finished span and pass it to the hooks.
+
+        Args:
+            span (Span): The finished span.
+        """
+        if self.enabled:
+            status = "ok" if span.error is None else "error"
+            self.observe("llm_orchestrator_stage_seconds", span.duration, stage=span.name, **span.labels)
+            self.inc("llm_orchestrator_stage_total", stage=span.name, status=status, **span.labels)
+        for hook in self.hooks:
+            hook(span)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        Increase a counter.
+
+        Args:
+            name (str): The metric name.
+            value (float): The increment. Defaults to 1.
+            **labels: Metric labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Optional[tuple] = None, **labels):
+        """
+        Add an observation to a histogram.
+
+        Args:
+            name (str): The metric name.
+            value (float): The observed value, in seconds for timings.
+            buckets (Optional[tuple]): Upper bounds of the buckets, e.g. COUNT_BUCKETS for
+                counts. Defaults to None (`buckets`, in seconds). A metric must always be
+                observed with the same buckets.
+            **labels: Metric labels.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                bounds = buckets or self.buckets
+                histogram = self._histograms[key] = [[0] * len(bounds), 0, 0.0, bounds]
+            for i, bound in enumerate(histogram[3]):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += 1
+            histogram[2] += value
+
+    def record_usage(self, model: str, usage, purpose: str = "generate"):
+        """
+        Record token usage from a Gemini `usage_metadata`.
+
+        Args:
+            model (str): The model name.
+            usage: The response's `usage_metadata`, may be None.
+            purpose (str): What the call was for. Defaults to "generate".
+        """
+        if not self.enabled or usage is None:
+            return
+        for kind, attribute in (
+            ("prompt", "prompt_token_count"),
+            ("output", "candidates_token_count"),
+            ("cached", "cached_content_token_count"),
+            ("thoughts", "thoughts_token_count"),
+        ):
+            count = getattr(usage, attribute, None)
+            if count:
+                self.inc("llm_orchestrator_llm_tokens_total", count, model=model, kind=kind, purpose=purpose)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """
+        Render all counters and histograms in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics text.
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        for (name, labels), (bucket_counts, count, total, bounds) in histograms:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            for bound, bucket_count in zip(bounds, bucket_counts):
+                lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {bucket_count}")
+            lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {count}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Iterable[tuple], **extra) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -1,4 +1,15 @@
+from typing import Optional
 from pydantic import BaseModel
 class Agent(BaseModel):
+    """
+    An agent to register.
+
+    Attributes:
+        name (str): The agent name.
+        urlAgentFile (str): URL of the agent JSON file.
+        tenant (Optional[str]): The tenant that owns the agent; its tools are only found by
+            queries of that tenant. None shares the agent with every tenant.
+    """
     name: str
-    urlAgentFile: str
\ No newline at end of file
+    urlAgentFile: str
+    tenant: Optional[str] = None
\ No newline at end of file
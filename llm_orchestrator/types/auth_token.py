@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+import typing
+
+class AuthToken(BaseModel):
+    """
+    Credentials of a tool request, as returned by a token provider of `AuthManager`.
+
+    Attributes:
+        access_token (str): The token or API key.
+        expires_at (typing.Optional[float]): Unix time the token expires, None if it doesn't.
+        token_type (str): Scheme before the token in the header; empty to send the token alone.
+        header (str): The request header that carries the token.
+    """
+    access_token: str
+    expires_at: typing.Optional[float] = None
+    token_type: str = "Bearer"
+    header: str = "Authorization"
+
+    def headers(self) -> dict[str, str]:
+        value = f"{self.token_type} {self.access_token}" if self.token_type else self.access_token
+        return {self.header: value}
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from llm_orchestrator.exceptions.llm_exception import LLMException
+
+class EmbeddingClientType(Enum):
+    GEMINI="GEMINI"
+    ONNX="ONNX"
+    HASHING="HASHING"
+
+class BaseEmbedding(ABC):
+    # Dimensi vector dari `embeddings`, harus sama dengan CollectionConfig.size
+    embedding_dimension: int = 1536
+    # Identitas model; vector dari model berbeda tidak bisa dicampur walaupun dimensinya sama
+    model_id: str = ""
+    # AdaptiveRateLimiter dari API embedding, None untuk embedder lokal
+    rate_limiter = None
+
+    @abstractmethod
+    async def embeddings(self, texts: list[str])->list[list[float]]:
+        """
+        Asynchronously generate embeddings for a list of text inputs.
+
+        Args:
+            texts (list[str]): A list of strings for which embeddings need to be generated.
+
+        Returns:
+            list[list[float]]: A list of embeddings, where each embedding is a list of
+            floats representing the vector for the corresponding input text.
+
+        Raises:
+            LLMException: If the method is not implemented.
+        """
+        raise LLMException("Method not implemented")
\ No newline at end of file
@@ -6,6 +6,8 @@ from llm_orchestrator.exceptions.llm_exception import LLMException
 class LLMClientType(Enum):
     GEMINI="GEMINI"    
 class BaseLLM(ABC):
+    # Dimensi vector dari `embeddings`, harus sama dengan CollectionConfig.size
+    embedding_dimension: int = 1536
     
     @abstractmethod
     def set_context(self, context: dict):
@@ -23,7 +25,7 @@ class BaseLLM(ABC):
         raise LLMException("Method not implemented")
     
     @abstractmethod
-    async def ask(self, prompt, config = None, stream = False):
+    async def ask(self, prompt, config = None, stream = False, cached_prefix = None):
         """
         Asynchronously send a prompt to the LLM for processing and return the result.
 
@@ -31,6 +33,10 @@ class BaseLLM(ABC):
             prompt: The input text that needs to be processed by the LLM.
             config: Optional configuration settings for customizing the query.
                     Defaults to None.
+            stream: Return the response as an iterator of chunks. Defaults to False.
+            cached_prefix (CachedPrefix | None): Static text that goes before the prompt.
+                    Clients with context caching may serve it from a cache; others send
+                    it inline. Defaults to None.
 
         Returns:
             A response generated by the LLM based on the provided prompt.
@@ -41,6 +47,28 @@ class BaseLLM(ABC):
 
         raise LLMException("Method not implemented")
     
+    def can_cache(self, prefix: str) -> bool:
+        """
+        Whether `ask` would serve this prefix from a model-side cache. Callers only move
+        large static text into a `cached_prefix` when it pays off. Defaults to False.
+
+        Args:
+            prefix (str): The prefix text.
+
+        Returns:
+            bool: True if the prefix would be cached.
+        """
+        return False
+
+    async def invalidate_cache(self, tag: str | None = None):
+        """
+        Drop the cached prefixes built from `tag` (e.g. an agent name), or all of them.
+        No-op for clients without context caching.
+
+        Args:
+            tag (str | None): The tag. Defaults to None (all).
+        """
+
     @abstractmethod
     async def embeddings(self, texts: list[str])->list[list[float]]:
         """
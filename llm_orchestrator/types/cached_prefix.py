@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+import typing
+
+class CachedPrefix(BaseModel):
+    """
+    Static start of a prompt that the LLM client may cache model-side.
+
+    Attributes:
+        text (str): The prefix, sent before the prompt.
+        tags (list[str]): What the prefix was built from, e.g. agent names; caches are
+            invalidated by tag when an agent changes.
+    """
+    text: str
+    tags: typing.List[str] = []
\ No newline at end of file
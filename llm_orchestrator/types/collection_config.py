@@ -0,0 +1,222 @@
+import math
+import os
+from typing import Literal, Optional, Sequence
+
+from pydantic import BaseModel
+
+
+class CollectionConfig(BaseModel):
+    """
+    Storage and index settings of the 'llm_orchestrator' Qdrant collection.
+
+    Settings left as None keep Qdrant's defaults. They are applied when the collection is
+    created; for an existing collection, HNSW, quantization and on-disk changes are applied
+    with `update_collection` on connect (Qdrant rebuilds the index in the background).
+    Changing the vector layout (size, distance or `search_size`) needs a new collection,
+    see `recreate_on_change`.
+
+    With `search_size` the collection is two-stage: every point has a "compact" vector (the
+    first `search_size` dimensions of the embedding, re-normalized) that is indexed and
+    searched for `candidates` candidates, and a "full" vector without index that rescores
+    them. Gemini embeddings are trained so that their leading dimensions carry most of the
+    meaning, which keeps the compact search accurate. Combine it with `on_disk` so only the
+    compact vectors and their index stay in RAM.
+
+    Attributes:
+        size (int): The embedding dimension, must match the LLM's `embedding_dimension`.
+        distance (str): The distance metric, "Cosine", "Dot", "Euclid" or "Manhattan".
+        search_size (Optional[int]): Dimension of the compact search vector; None searches the full vector.
+        candidates (int): Candidates of the compact search that are rescored with the full vector.
+        recreate_on_change (bool): Drop and re-create the collection when the vector layout
+            changed, instead of raising. The next warm_up re-embeds every tool into it.
+        on_disk (bool): Keep the original (full) vectors on disk (memmap) instead of in RAM.
+        hnsw_m (Optional[int]): Edges per node of the HNSW graph.
+        hnsw_ef_construct (Optional[int]): Neighbours considered while building the graph.
+        hnsw_ef (Optional[int]): Neighbours considered per search, higher is more accurate and slower.
+        quantization (str): "none", "scalar" (int8, 4x smaller) or "binary" (32x smaller).
+        quantization_always_ram (bool): Keep the quantized vectors in RAM, even with `on_disk`.
+        rescore (bool): Re-rank the quantized candidates with the original vectors.
+        oversampling (Optional[float]): Fetch `limit * oversampling` quantized candidates to rescore.
+    """
+    size: int = 1536
+    distance: Literal["Cosine", "Dot", "Euclid", "Manhattan"] = "Cosine"
+    search_size: Optional[int] = None
+    candidates: int = 50
+    recreate_on_change: bool = False
+    on_disk: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    hnsw_ef: Optional[int] = None
+    quantization: Literal["none", "scalar", "binary"] = "none"
+    quantization_always_ram: bool = True
+    rescore: bool = True
+    oversampling: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> 'CollectionConfig':
+        """
+        Build the config from EMBEDDING_DIMENSION, EMBEDDING_SEARCH_DIMENSION,
+        QDRANT_SEARCH_CANDIDATES, QDRANT_RECREATE_ON_CHANGE, QDRANT_ON_DISK, QDRANT_HNSW_M,
+        QDRANT_HNSW_EF_CONSTRUCT, QDRANT_HNSW_EF, QDRANT_QUANTIZATION, QDRANT_RESCORE
+        and QDRANT_OVERSAMPLING; unset variables keep the defaults.
+
+        Returns:
+            CollectionConfig: The config.
+        """
+        env = {
+            "size": os.getenv("EMBEDDING_DIMENSION"),
+            "search_size": os.getenv("EMBEDDING_SEARCH_DIMENSION"),
+            "candidates": os.getenv("QDRANT_SEARCH_CANDIDATES"),
+            "recreate_on_change": os.getenv("QDRANT_RECREATE_ON_CHANGE"),
+            "on_disk": os.getenv("QDRANT_ON_DISK"),
+            "hnsw_m": os.getenv("QDRANT_HNSW_M"),
+            "hnsw_ef_construct": os.getenv("QDRANT_HNSW_EF_CONSTRUCT"),
+            "hnsw_ef": os.getenv("QDRANT_HNSW_EF"),
+            "quantization": os.getenv("QDRANT_QUANTIZATION"),
+            "rescore": os.getenv("QDRANT_RESCORE"),
+            "oversampling": os.getenv("QDRANT_OVERSAMPLING"),
+        }
+        return cls(**{key: value for key, value in env.items() if value not in (None, "")})
+
+    @property
+    def two_stage(self) -> bool:
+        return self.search_size is not None and self.search_size < self.size
+
+    @property
+    def full_vector_name(self) -> str:
+        """
+        Name of the full-dimension vector: "full" in two-stage collections, "" (the unnamed
+        vector) otherwise.
+        """
+        return "full" if self.two_stage else ""
+
+    def vectors_config(self):
+        """
+        Returns:
+            VectorParams | dict[str, VectorParams]: The vector parameters for `create_collection`,
+            named "full" and "compact" vectors in two-stage mode.
+        """
+        from qdrant_client.models import Distance, HnswConfigDiff, VectorParams
+
+        if not self.two_stage:
+            return VectorParams(size=self.size, distance=Distance(self.distance), on_disk=self.on_disk or None)
+        return {
+            # m=0: tanpa index HNSW, vector full hanya dipakai untuk rescoring
+            "full": VectorParams(
+                size=self.size,
+                distance=Distance(self.distance),
+                on_disk=self.on_disk or None,
+                hnsw_config=HnswConfigDiff(m=0),
+            ),
+            "compact": VectorParams(size=self.search_size, distance=Distance(self.distance)),
+        }
+
+    def layout(self) -> dict:
+        """
+        The part of the config that can't be changed on an existing collection.
+
+        Returns:
+            dict: Vector name to (size, distance).
+        """
+        if not self.two_stage:
+            return {"": (self.size, self.distance)}
+        return {"full": (self.size, self.distance), "compact": (self.search_size, self.distance)}
+
+    def point_vector(self, vector: Sequence[float]):
+        """
+        The vector(s) to store for an embedding.
+
+        Args:
+            vector (Sequence[float]): The full-dimension embedding.
+
+        Returns:
+            list[float] | dict[str, list[float]]: The embedding, or the "full" and "compact"
+            vectors in two-stage mode.
+        """
+        vector = [float(v) for v in vector]
+        if not self.two_stage:
+            return vector
+        return {"full": vector, "compact": truncate_vector(vector, self.search_size)}
+
+    def hnsw_config(self):
+        """
+        Returns:
+            Optional[HnswConfigDiff]: The HNSW settings, None to keep Qdrant's defaults.
+        """
+        from qdrant_client.models import HnswConfigDiff
+
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        """
+        Returns:
+            Optional[ScalarQuantization | BinaryQuantization]: The quantization, None when disabled.
+        """
+        from qdrant_client import models
+
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
+            )
+        return None
+
+    def search_params(self):
+        """
+        Returns:
+            Optional[SearchParams]: The query-time settings, None when everything is default.
+        """
+        from qdrant_client.models import QuantizationSearchParams, SearchParams
+
+        quantization = None
+        if self.quantization != "none":
+            quantization = QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        if self.hnsw_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def estimated_ram_bytes(self, points: int) -> int:
+        """
+        Rough RAM needed by `points` vectors: the original float32 vectors (unless on disk),
+        the compact vectors in two-stage mode, the quantized copy of the indexed vectors
+        (if kept in RAM) and the HNSW graph links.
+
+        Args:
+            points (int): Number of points in the collection.
+
+        Returns:
+            int: The estimate in bytes.
+        """
+        indexed = self.search_size if self.two_stage else self.size
+        original = 0 if self.on_disk else points * self.size * 4
+        compact = points * indexed * 4 if self.two_stage else 0
+        quantized = 0
+        if self.quantization != "none" and (self.quantization_always_ram or not self.on_disk):
+            quantized = points * (indexed if self.quantization == "scalar" else (indexed + 7) // 8)
+        links = points * (self.hnsw_m or 16) * 2 * 4
+        return original + compact + quantized + links
+
+
+def truncate_vector(vector: Sequence[float], size: int) -> list[float]:
+    """
+    Keep the first `size` dimensions of an embedding and scale them back to unit length.
+
+    Args:
+        vector (Sequence[float]): The embedding.
+        size (int): The dimensions to keep.
+
+    Returns:
+        list[float]: The truncated, normalized vector.
+    """
+    head = [float(v) for v in vector[:size]]
+    norm = math.sqrt(sum(v * v for v in head)) or 1.0
+    return [v / norm for v in head]
@@ -53,3 +53,67 @@ class AbstractMemoryManager(ABC):
         """
 
         raise MemoryManagerException("Method not implemented")
+
+    async def set_if_absent(self, key: str, value, ttl: int | None = None) -> bool:
+        """
+        Stores a value only if the key has no value yet, e.g. to take a lock shared by
+        several workers. This default is not atomic, managers override it with an atomic
+        operation.
+
+        Args:
+            key (str): The key to store the value with.
+            value: The value to store.
+            ttl (int | None): Seconds after which the value expires, if supported. Defaults to None.
+
+        Returns:
+            bool: True if the value was stored.
+        """
+        if await self.get_memory(key) is not None:
+            return False
+        await self.set_memory(key, value)
+        return True
+
+    async def clear_if_equal(self, key: str, value) -> bool:
+        """
+        Clears the value of a key only if it still equals `value`, e.g. to release a lock
+        only while this worker holds it (compare-and-delete). This default is not atomic,
+        managers override it with an atomic operation.
+
+        Args:
+            key (str): The key to clear.
+            value: The expected value.
+
+        Returns:
+            bool: True if the value was cleared.
+        """
+        if await self.get_memory(key) != value:
+            return False
+        await self.clear_memory(key)
+        return True
+
+    async def set_field(self, key: str, field: str, value) -> None:
+        """
+        Stores one field of a mapping, without rewriting the other fields, so workers updating
+        different fields don't overwrite each other. This default is not atomic, managers
+        override it with an atomic operation.
+
+        Args:
+            key (str): The key of the mapping.
+            field (str): The field to store.
+            value: The value of the field.
+        """
+        fields = dict(await self.get_memory(key) or {})
+        fields[field] = value
+        await self.set_memory(key, fields)
+
+    async def get_fields(self, key: str) -> dict:
+        """
+        Retrieves every field of a mapping stored with `set_field`.
+
+        Args:
+            key (str): The key of the mapping.
+
+        Returns:
+            dict: Field to value, empty if the key has no value.
+        """
+        return dict(await self.get_memory(key) or {})
@@ -5,4 +5,7 @@ class ResponseTool(BaseModel):
     url: str
     method: str
     payload: typing.Any
-    additional_prompt_to_ai: typing.Optional[str] = None
\ No newline at end of file
+    additional_prompt_to_ai: typing.Optional[str] = None
+
+class ToolPlan(BaseModel):
+    calls: typing.List[ResponseTool]
\ No newline at end of file
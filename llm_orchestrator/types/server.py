@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+import typing
+
+from llm_orchestrator.types.agents import Agent
+
+class QueryRequest(BaseModel):
+    """
+    Body of POST /query, the arguments of `LLMOrchestrator.invoke_query`. With `stream` the
+    answer is sent as Server-Sent Events. The user and the tenant come from the
+    authenticated request, see `Identity`, never from the body.
+    """
+    query: str
+    top_k: int = 5
+    stream: bool = False
+    plan: bool = False
+    score_threshold: float = 0.8
+    speculative: bool = False
+    deadline: typing.Optional[float] = None
+    agents: typing.Optional[typing.List[str]] = None
+    raw: bool = False
+    language: typing.Optional[str] = None
+
+class BatchQueryRequest(BaseModel):
+    """
+    Body of POST /query/batch. The queries run concurrently, at most `max_concurrency` at
+    a time; `stream` is ignored.
+    """
+    queries: typing.List[QueryRequest]
+    max_concurrency: int = 8
+
+class RegisterAgentsRequest(BaseModel):
+    """
+    Body of POST /agents.
+    """
+    agents: typing.List[Agent]
+
+class Identity(BaseModel):
+    """
+    The authenticated caller of a request, resolved by the server's `identify` hook. Tool
+    requests are made with the credentials of `user`, and only the tools of `tenant`'s
+    agents and of shared agents are searched.
+    """
+    user: typing.Optional[str] = None
+    tenant: typing.Optional[str] = None